@@ -1,10 +1,9 @@
 # /backend/app/api/matchmaking.py
-import json
-from typing import Any, Dict
 
 from fastapi import APIRouter, status
 from pydantic import BaseModel
 
+from app.core import json_codec
 from app.core.redis import RedisDep
 from app.games.constants import Games
 from app.lib.auth import TokenDep, get_current_user_id
@@ -103,7 +102,7 @@ async def check_match(
     await redis_conn.delete(notification_key)
 
     # Désérialiser
-    match_data = json.loads(_decode_if_bytes(match_notification))
+    match_data = json_codec.loads(_decode_if_bytes(match_notification))
 
     return MatchResponse(
         status="match_found",
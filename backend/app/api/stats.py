@@ -8,6 +8,11 @@ from app.core.db import SessionDep
 from app.models.tables import User
 from app.lib.auth import TokenDep, get_current_user_id
 from app.core.redis import RedisDep
+from app.games.wordsearch.puzzle_pool import PuzzlePool
+from app.games.wordsearch.generation_service import get_generation_service
+from app.games.wordsearch.results_outbox import get_results_outbox
+from app.games.wordsearch.key_sweeper import get_game_key_sweeper
+from app.core.scheduler import get_deadline_scheduler
 
 router = APIRouter(tags=["statistiques"])
 
@@ -68,6 +73,60 @@ async def get_global_stats(redis_conn: RedisDep):
         games_today=games_today
     )
 
+@router.get("/stats/puzzle-pool")
+async def get_puzzle_pool_stats(redis_conn: RedisDep):
+    """
+    Métriques de la réserve de grilles pré-générées :
+    hits/misses à la création de partie, grilles produites, taille par thème.
+    """
+    return await PuzzlePool(redis_conn).get_metrics()
+
+@router.get("/stats/generation")
+async def get_generation_stats():
+    """Métriques du pool de génération : profondeur de file, lots, latences."""
+    service = get_generation_service()
+    if service is None:
+        raise HTTPException(status_code=503, detail="Pool de génération non démarré")
+    return service.get_metrics()
+
+@router.get("/stats/results-outbox")
+async def get_results_outbox_stats():
+    """Métriques de l'outbox des résultats : messages en attente, écritures, échecs."""
+    outbox = get_results_outbox()
+    if outbox is None:
+        raise HTTPException(status_code=503, detail="Consommateur de résultats non démarré")
+    return await outbox.get_metrics()
+
+@router.get("/stats/game-keys")
+async def get_game_keys_stats():
+    """Métriques du balayeur de clés de parties : passages, clés et octets libérés."""
+    sweeper = get_game_key_sweeper()
+    if sweeper is None:
+        raise HTTPException(status_code=503, detail="Balayeur de clés non démarré")
+    return sweeper.get_metrics()
+
+@router.get("/stats/scheduler")
+async def get_scheduler_stats():
+    """Métriques du planificateur d'échéances : en attente, exécutées, retard de la roue."""
+    scheduler = get_deadline_scheduler()
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Planificateur non démarré")
+    return await scheduler.get_metrics()
+
+@router.get("/stats/rooms")
+async def get_rooms_stats():
+    """Envois WebSocket des salles actives : latence, envois hors délai, joueurs lents."""
+    # Import local : les salles sont tenues par la route WebSocket
+    from app.api.websocket import ACTIVE_GAMES
+
+    rooms = {game_id: room.get_send_metrics() for game_id, room in ACTIVE_GAMES.items()}
+    return {
+        "rooms": len(rooms),
+        "timeouts": sum(metrics["timeouts"] for metrics in rooms.values()),
+        "disconnected": sum(metrics["disconnected"] for metrics in rooms.values()),
+        "slow_rooms": {game_id: metrics for game_id, metrics in rooms.items() if metrics["slow_players"]},
+    }
+
 @router.get("/stats/me", response_model=UserStats)
 async def get_my_stats(token: TokenDep, session: SessionDep):
     """
@@ -6,10 +6,11 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status, Query
 from sqlmodel import select
 from redis.asyncio import Redis as AsyncRedis
 from app.models.tables import GameSession
-from app.models.schemas import WordSearchState
+from app.core import json_codec
 from app.core.redis import RedisDep
 from app.core.db import SessionDep
 from app.games.wordsearch.gameRoom import GameRoom
+from app.games.wordsearch.deadlines import follow_room, unfollow_room
 from app.games.constants import GameMessages
 from sqlmodel.ext.asyncio.session import AsyncSession
 from app.games.constants import WS_TOKEN_PREFIX
@@ -59,6 +60,8 @@ def get_or_create_room(game_id: str,db_session:AsyncSession ,redis_conn: AsyncRe
     """Récupère ou crée une salle de jeu avec accès Redis."""
     if game_id not in ACTIVE_GAMES:
         ACTIVE_GAMES[game_id] = GameRoom(game_id=game_id,db_session=db_session, redis_conn=redis_conn)
+        # Échéances réclamées par un autre worker : relayées ici
+        follow_room(game_id)
     return ACTIVE_GAMES[game_id]
 
 
@@ -68,6 +71,7 @@ def cleanup_room_if_empty(game_id: str) -> None:
     room = ACTIVE_GAMES.get(game_id)
     if room and room.is_empty():
         del ACTIVE_GAMES[game_id]
+        unfollow_room(game_id)
         print(f"🗑️ Room {game_id} supprimée (vide)")
 
 
@@ -196,7 +200,7 @@ async def websocket_endpoint(
 
             
             
-            data = await websocket.receive_json()
+            data = json_codec.loads(await websocket.receive_text())
             
             
             
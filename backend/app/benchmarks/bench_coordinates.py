@@ -0,0 +1,126 @@
+"""
+Microbenchmark des coordonnées internes (cases à plat vs modèles pydantic).
+
+Compare, par grille générée et par sélection validée, le temps et les
+allocations (tracemalloc) du chemin actuel avec l'ancien parcours à base
+de `Index` / `WordSolution`.
+
+Usage : python -m app.benchmarks.bench_coordinates [--rounds N]
+"""
+
+import argparse
+import itertools
+import random
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from app.models.schemas import Index, WordSolution
+from app.models.tables import WordList
+from app.games.wordsearch.wordsearch_engine import WordSearchEngine
+from app.games.wordsearch.wordsearch_generator import WordSearchGenerator
+
+WORDS = [
+    "PYTHON", "JAVASCRIPT", "RUST", "KOTLIN", "HASKELL", "PASCAL",
+    "FORTRAN", "COBOL", "SWIFT", "GOLANG", "ERLANG", "ELIXIR",
+]
+
+
+# --- Ancien chemin (référence) ---
+
+def _legacy_place(grid_size: int, words: List[str], seed: int) -> List[List[str]]:
+    """Placement historique : un `Index` par case, bornes testées à chaque essai."""
+    grid = [["." for _ in range(grid_size)] for _ in range(grid_size)]
+    positions = [Index(row=r, col=c) for r, c in itertools.product(range(grid_size), repeat=2)]
+    directions = [d for d in itertools.product((-1, 0, 1), repeat=2) if d != (0, 0)]
+
+    for word in words:
+        rng = random.Random(f"{seed}:{word}")
+        shuffled = positions.copy()
+        rng.shuffle(shuffled)
+        for start in shuffled:
+            placed = False
+            for dr, dc in directions:
+                end = Index(row=start.row + (len(word) - 1) * dr, col=start.col + (len(word) - 1) * dc)
+                if not (0 <= end.row < grid_size and 0 <= end.col < grid_size):
+                    continue
+                cells = [(start.row + i * dr, start.col + i * dc) for i in range(len(word))]
+                if all(grid[r][c] in (".", ch) for (r, c), ch in zip(cells, word)):
+                    for (r, c), ch in zip(cells, word):
+                        grid[r][c] = ch
+                    placed = True
+                    break
+            if placed:
+                break
+    return grid
+
+
+def _legacy_reconstruct(grid: List[List[str]], solution: WordSolution) -> str:
+    """Reconstruction historique : un `Index` par lettre lue."""
+    start, end = solution.start_index, solution.end_index
+    dr = (end.row > start.row) - (end.row < start.row)
+    dc = (end.col > start.col) - (end.col < start.col)
+    steps = max(abs(end.row - start.row), abs(end.col - start.col))
+    letters = []
+    for i in range(steps + 1):
+        pos = Index(row=start.row + i * dr, col=start.col + i * dc)
+        letters.append(grid[pos.row][pos.col])
+    return "".join(letters).upper()
+
+
+# --- Mesure ---
+
+def _measure(fn: Callable[[], object], rounds: int) -> Tuple[float, int]:
+    """(temps moyen en µs, octets alloués en moyenne) par appel."""
+    fn()  # Préchauffage des caches de segments
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed = (time.perf_counter() - started) / rounds * 1e6
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    for _ in range(rounds):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, max(0, peak - before)
+
+
+def _report(label: str, legacy: Tuple[float, int], current: Tuple[float, int]) -> None:
+    ratio = legacy[0] / current[0] if current[0] else float("inf")
+    print(
+        f"{label:<22} ancien {legacy[0]:>9.1f} µs / {legacy[1]:>8} o   "
+        f"actuel {current[0]:>9.1f} µs / {current[1]:>8} o   x{ratio:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--grid-size", type=int, default=15)
+    args = parser.parse_args()
+
+    wordlist = WordList(theme="Bench", words=WORDS)
+    size = args.grid_size
+
+    generator = WordSearchGenerator(wordlist, grid_size=size, seed=42, shuffle=False)
+    _report(
+        "placement / grille",
+        _measure(lambda: _legacy_place(size, WORDS, 42), args.rounds),
+        _measure(generator._search_placements, args.rounds),
+    )
+
+    _, grid, _, solutions = generator.generate()
+    selections = solutions.solutions
+    _report(
+        "validation / sélection",
+        _measure(lambda: [_legacy_reconstruct(grid, s) for s in selections], args.rounds),
+        _measure(lambda: [WordSearchEngine.reconstruct_word(grid, s) for s in selections], args.rounds),
+    )
+
+
+if __name__ == "__main__":
+    main()
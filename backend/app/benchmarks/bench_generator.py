@@ -0,0 +1,183 @@
+"""
+Benchmark du générateur de grilles, avec métriques de qualité.
+
+Pour chaque combinaison (mode, taille de grille, nombre de mots), génère
+des grilles sur tous les thèmes de `app/sql/seeds/wordlist.sql` et mesure :
+  - la latence de generate() (p50 / p95 / p99) ;
+  - les mots placés par rapport aux mots demandés ;
+  - la mémoire allouée (pic tracemalloc) par grille.
+
+Les résultats peuvent être enregistrés comme référence (--write-baseline)
+puis comparés lors des exécutions suivantes : toute dégradation au-delà de
+la tolérance est signalée et le code de sortie vaut 1.
+
+Usage :
+  python -m app.benchmarks.bench_generator --write-baseline
+  python -m app.benchmarks.bench_generator --baseline bench_generator_baseline.json
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import tracemalloc
+import zlib
+from pathlib import Path
+from typing import Dict, List
+
+from app.models.tables import WordList
+from app.games.wordsearch.segments import grid_lines, segment_cells, segment_lookup
+from app.games.wordsearch.theme_index import ThemeIndex
+from app.games.wordsearch.wordsearch_generator import WordSearchGenerator
+
+SEED_FILE = Path(__file__).resolve().parents[1] / "sql" / "seeds" / "wordlist.sql"
+DEFAULT_BASELINE = "bench_generator_baseline.json"
+
+# Écart toléré sur le taux de placement avant de signaler une régression
+PLACED_RATIO_TOLERANCE = 0.05
+
+
+def load_seed_themes(path: Path = SEED_FILE) -> List[ThemeIndex]:
+    """Lit les couples (thème, mots JSON) du script d'initialisation SQL."""
+    sql = path.read_text(encoding="utf-8")
+    rows = re.findall(r"\(\s*'((?:[^']|'')+)'\s*,\s*'(\[.*?\])'\s*\)", sql, re.S)
+    return [ThemeIndex(theme.replace("''", "'"), json.loads(words)) for theme, words in rows]
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile au rang le plus proche (valeurs déjà triées)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def _run_case(
+    themes: List[ThemeIndex], mode: str, grid_size: int, word_count: int, runs: int
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    placed_ratios: List[float] = []
+    repaired: List[int] = []
+    peaks: List[int] = []
+
+    # Préchauffage : tables de segments et de lignes construites hors mesure
+    for length in range(1, grid_size + 1):
+        segment_lookup(grid_size, length)
+        segment_cells(grid_size, length)
+    grid_lines(grid_size)
+
+    for theme in themes:
+        for run in range(runs):
+            # Graine stable d'une exécution à l'autre (hash() est salé par processus)
+            seed = zlib.crc32(f"{theme.theme}:{grid_size}:{word_count}:{run}".encode())
+            words = theme.select(grid_size, word_count, rng=random.Random(seed))
+            generator = WordSearchGenerator(
+                WordList(theme=theme.theme, words=words),
+                grid_size=grid_size,
+                mode=mode,
+                seed=seed,
+                word_count=word_count,
+            )
+
+            started = time.perf_counter()
+            _, _, placed, _ = generator.generate()
+            latencies.append((time.perf_counter() - started) * 1000)
+            placed_ratios.append(len(placed) / word_count)
+            repaired.append(generator.repaired_cells)
+
+        # Mesure mémoire à part : tracemalloc fausserait la latence
+        tracemalloc.start()
+        WordSearchGenerator(
+            WordList(theme=theme.theme, words=words), grid_size=grid_size, mode=mode, seed=seed,
+            word_count=word_count,
+        ).generate()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "placed_ratio": round(sum(placed_ratios) / len(placed_ratios), 3),
+        "min_placed_ratio": round(min(placed_ratios), 3),
+        "repaired_cells": round(sum(repaired) / len(repaired), 2),
+        "peak_alloc_kib": round(max(peaks) / 1024, 1),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """Liste des régressions par rapport à la référence."""
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "peak_alloc_kib"):
+            if current[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {reference[metric]} -> {current[metric]}")
+        if current["placed_ratio"] < reference["placed_ratio"] - PLACED_RATIO_TOLERANCE:
+            regressions.append(
+                f"{key} placed_ratio: {reference['placed_ratio']} -> {current['placed_ratio']}"
+            )
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", default="python,numpy")
+    parser.add_argument("--sizes", type=_int_list, default=[10, 20, 30, 40, 50])
+    parser.add_argument("--counts", type=_int_list, default=[8, 12, 24, 48])
+    parser.add_argument("--runs", type=int, default=5, help="Grilles par thème et par cas")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    themes = load_seed_themes()
+    print(f"{len(themes)} thème(s) chargés depuis {SEED_FILE.name}")
+    print(f"{'cas':<24}{'p50':>9}{'p95':>9}{'p99':>9}{'placés':>9}{'min':>7}{'réparées':>10}{'KiB':>9}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    for mode in args.modes.split(","):
+        for grid_size in args.sizes:
+            for word_count in args.counts:
+                key = f"{mode}/{grid_size}x{grid_size}/{word_count}"
+                row = _run_case(themes, mode, grid_size, word_count, args.runs)
+                results[key] = row
+                print(
+                    f"{key:<24}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+                    f"{row['placed_ratio']:>9.2f}{row['min_placed_ratio']:>7.2f}"
+                    f"{row['repaired_cells']:>10.1f}{row['peak_alloc_kib']:>9.1f}"
+                )
+
+    baseline_path = Path(args.baseline)
+    if args.write_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"✅ Référence écrite dans {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"Pas de référence ({baseline_path}) : relancer avec --write-baseline.")
+        return 0
+
+    regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+    for line in regressions:
+        print(f"❌ {line}")
+    if not regressions:
+        print("✅ Aucune régression par rapport à la référence.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Microbenchmark de l'encodage JSON des messages (module standard vs codec).
+
+Compare, par message, le temps d'encodage et de décodage de `json` (ce que
+faisaient `send_json` / `receive_json`) avec `app.core.json_codec`, sur les
+messages réels d'une partie : données de préparation (grille), mise à jour
+des scores, aperçu de sélection entrant.
+
+Usage : python -m app.benchmarks.bench_json [--rounds N]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict
+
+from app.core import json_codec
+from app.models.schemas import WordSearchState
+from app.models.tables import WordList
+from app.games.wordsearch.wordsearch_generator import WordSearchGenerator
+
+WORDS = [
+    "PYTHON", "JAVASCRIPT", "RUST", "KOTLIN", "HASKELL", "PASCAL",
+    "FORTRAN", "COBOL", "SWIFT", "GOLANG", "ERLANG", "ELIXIR",
+]
+
+
+def _stdlib_dumps(message: Any) -> str:
+    # Encodage de WebSocket.send_json
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def _messages(grid_size: int) -> Dict[str, Dict[str, Any]]:
+    generator = WordSearchGenerator(WordList(theme="Bench", words=WORDS), grid_size=grid_size, seed=42)
+    theme, grid, words, solutions = generator.generate()
+    state = WordSearchState(
+        theme=theme,
+        grid_data=grid,
+        words_to_find=words,
+        words_found=solutions.solutions[:4],
+        realtime_score={"player-1": 40, "player-2": 30},
+        game_duration=180,
+    )
+    return {
+        "prepare_game": {
+            "type": "prepare_game",
+            "game_data": state.model_dump(),
+            "opponent": {"player_id": "player-2", "username": "Invité", "score": 0},
+            "message": "Chargement de la partie...",
+        },
+        "score_update": {"type": "score_update", "scores": {"player-1": 40, "player-2": 30}},
+        "selection_update": {
+            "type": "selection_update",
+            "position": {"start_point": {"x": 3, "y": 4}, "end_point": {"x": 9, "y": 4}},
+        },
+    }
+
+
+def _measure(fn: Callable[[], object], rounds: int) -> float:
+    """Temps moyen par appel, en µs."""
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def _report(label: str, stdlib: float, codec: float) -> None:
+    ratio = stdlib / codec if codec else float("inf")
+    print(
+        f"{label:<34} json {stdlib:>8.2f} µs   {json_codec.CODEC_NAME} {codec:>8.2f} µs   "
+        f"gain {stdlib - codec:>7.2f} µs   x{ratio:.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20_000)
+    parser.add_argument("--grid-size", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"Codec actif : {json_codec.CODEC_NAME}")
+    for name, message in _messages(args.grid_size).items():
+        text = _stdlib_dumps(message)
+        _report(
+            f"encodage {name} ({len(text)} o)",
+            _measure(lambda: _stdlib_dumps(message), args.rounds),
+            _measure(lambda: json_codec.dumps(message), args.rounds),
+        )
+        _report(
+            f"décodage {name}",
+            _measure(lambda: json.loads(text), args.rounds),
+            _measure(lambda: json_codec.loads(text), args.rounds),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# /backend/app/core/json_codec.py
+"""
+Encodage JSON commun aux WebSockets, à l'API REST et aux données Redis.
+
+orjson est utilisé s'il est installé (plusieurs fois plus rapide que le
+module standard) ; sinon on retombe sur `json`, avec le même format de
+sortie compact que Starlette. Lancer `python -m app.benchmarks.bench_json`
+pour mesurer l'écart.
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
+CODEC_NAME = "orjson" if orjson is not None else "json"
+
+# Clés non textuelles ({0: ...}) acceptées comme avec le module standard
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode en JSON compact (UTF-8)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """Encode en JSON compact (texte, pour `send_text` et Redis)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: str | bytes) -> Any:
+    """Décode du JSON ; lève `json.JSONDecodeError` (orjson en hérite)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CodecJSONResponse(JSONResponse):
+    """Réponse REST par défaut de l'application, encodée avec le codec rapide."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
@@ -1,14 +1,15 @@
 # /backend/app/core/matchmaker_service.py
 import asyncio
-import json
 import uuid
 from typing import Optional
 
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core import json_codec
 from app.core.redis import get_redis_client
 from app.core.db import get_db_session
-from app.games.constants import Games
+from app.core.scheduler import schedule_deadline
+from app.games.constants import DeadlineKind, Games
 from app.games.wordsearch.wordsearch_controller import WordSearchController
 
 QUEUE_BASE_NAME = "matchmaking:queue:"
@@ -107,18 +108,27 @@ async def notify_players(
         "game_name": game_name.value,  # Sérialiser l'enum en string
     }
 
+    # L'expiration est traitée par le planificateur (notifications non lues :
+    # partie jamais rejointe) ; le TTL Redis, plus long, n'est qu'un filet
     await asyncio.gather(
         redis_client.set(
             f"match_notification:{player1_id}",
-            json.dumps({**base_data, "opponent_id": player2_id}),
-            ex=MATCH_NOTIFICATION_TTL,
+            json_codec.dumps({**base_data, "opponent_id": player2_id}),
+            ex=MATCH_NOTIFICATION_TTL * 2,
         ),
         redis_client.set(
             f"match_notification:{player2_id}",
-            json.dumps({**base_data, "opponent_id": player1_id}),
-            ex=MATCH_NOTIFICATION_TTL,
+            json_codec.dumps({**base_data, "opponent_id": player1_id}),
+            ex=MATCH_NOTIFICATION_TTL * 2,
         ),
     )
+    await schedule_deadline(
+        redis_client,
+        DeadlineKind.MATCH_NOTIFICATION,
+        game_id,
+        MATCH_NOTIFICATION_TTL,
+        {"players": [player1_id, player2_id]},
+    )
 
 
 async def process_all_queues(db_session: AsyncSession, redis_client) -> None:
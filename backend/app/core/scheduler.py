@@ -0,0 +1,312 @@
+# /backend/app/core/scheduler.py
+
+import asyncio
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core import json_codec
+from app.games.constants import SCHEDULER_DEADLINES_KEY, SCHEDULER_PAYLOADS_KEY
+
+# Un handler reçoit la clé de l'échéance (ex. game_id) et sa charge utile
+DeadlineHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Rappel local, sans argument (compte à rebours d'une salle)
+LocalCallback = Callable[[], Awaitable[None]]
+
+LOCAL_KIND = "local"
+
+
+# Réclamation d'une échéance échue : un seul worker obtient le ZREM.
+#   KEYS : zset des échéances, hash des charges utiles
+#   ARGV : membre, instant courant (ms)
+# Retourne la charge utile (JSON, éventuellement vide) ou nil si l'échéance
+# a été annulée, reprogrammée plus tard ou déjà réclamée ailleurs.
+CLAIM_DEADLINE_SCRIPT = """
+local due = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not due or tonumber(due) > tonumber(ARGV[2]) then
+    return false
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+local payload = redis.call('HGET', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+return payload or ''
+"""
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _member(kind: str, key: str) -> str:
+    # Les types sont des str Enum : on écrit leur valeur, pas leur nom
+    return f"{getattr(kind, 'value', kind)}|{key}"
+
+
+class DeadlineScheduler:
+    """
+    Échéances des parties (fin de partie, compte à rebours, délai de
+    reconnexion, expiration des notifications), pour tout le processus.
+
+    Les échéances vivent dans un sorted set Redis (score = instant en ms) :
+    elles survivent à un redémarrage et n'importe quel worker peut les
+    réclamer. Une seule tâche fait tourner une roue hachée de WHEEL_SLOTS
+    cases de TICK_MS ; elle est rechargée depuis Redis toutes les
+    REFILL_TICKS avec les échéances de la prochaine révolution. Une échéance
+    n'est exécutée que par le worker dont le ZREM réussit.
+
+    La même roue porte des rappels locaux (`call_later`), non persistés :
+    ce qui n'a de sens que dans le processus qui tient la salle.
+    """
+
+    TICK_MS: int = 100
+    WHEEL_SLOTS: int = 64
+    REFILL_TICKS: int = 10
+
+    def __init__(self, redis_client: AsyncRedis):
+        self._redis = redis_client
+        self._claim_script = redis_client.register_script(CLAIM_DEADLINE_SCRIPT)
+        self._handlers: Dict[str, DeadlineHandler] = {}
+
+        # Roue : case -> {membre: échéance en ms} ; _loaded indexe les membres chargés
+        self._slots: List[Dict[str, int]] = [{} for _ in range(self.WHEEL_SLOTS)]
+        self._loaded: Dict[str, int] = {}
+        self._cursor = _now_ms() // self.TICK_MS
+        self._running: Set[asyncio.Task] = set()
+
+        # Rappels locaux : membre -> rappel, et échéance (rechargée au-delà de l'horizon)
+        self._callbacks: Dict[str, LocalCallback] = {}
+        self._local_due: Dict[str, int] = {}
+        self._local_ids = itertools.count()
+
+        # Métriques (par processus)
+        self.fired = 0
+        self.claimed_elsewhere = 0
+        self.handler_errors = 0
+        self.max_lag_ms = 0
+
+    @property
+    def horizon_ms(self) -> int:
+        return self.TICK_MS * self.WHEEL_SLOTS
+
+    def register(self, kind: str, handler: DeadlineHandler) -> None:
+        self._handlers[getattr(kind, "value", kind)] = handler
+
+    def call_later(self, delay_seconds: float, callback: LocalCallback) -> str:
+        """Programme un rappel local ; retourne son identifiant (pour `cancel_local`)."""
+        member = f"{LOCAL_KIND}|{next(self._local_ids)}"
+        due_ms = _now_ms() + int(delay_seconds * 1000)
+        self._callbacks[member] = callback
+        self._local_due[member] = due_ms
+        self.load(member, due_ms)
+        return member
+
+    def cancel_local(self, member: str) -> None:
+        self._callbacks.pop(member, None)
+        self._local_due.pop(member, None)
+        self.unload(member)
+
+    # --- Roue en mémoire ---
+
+    def load(self, member: str, due_ms: int) -> None:
+        """Place une échéance dans la roue si elle tombe dans la prochaine révolution."""
+        if self._loaded.get(member) == due_ms:
+            return
+        self.unload(member)
+        due_tick = due_ms // self.TICK_MS
+        if due_tick > self._cursor + self.WHEEL_SLOTS:
+            return
+        # Échéance déjà passée : elle part au prochain tick
+        tick = max(due_tick, self._cursor + 1)
+        self._slots[tick % self.WHEEL_SLOTS][member] = due_ms
+        self._loaded[member] = due_ms
+
+    def unload(self, member: str) -> None:
+        """Retire une échéance de la roue (annulée ou reprogrammée)."""
+        due_ms = self._loaded.pop(member, None)
+        if due_ms is None:
+            return
+        for slot in self._slots:
+            if slot.pop(member, None) is not None:
+                break
+
+    async def _refill(self) -> None:
+        entries = await self._redis.zrangebyscore(
+            SCHEDULER_DEADLINES_KEY, "-inf", _now_ms() + self.horizon_ms, withscores=True
+        )
+        for member, due_ms in entries:
+            self.load(member, int(due_ms))
+        for member, due_ms in self._local_due.items():
+            self.load(member, due_ms)
+
+    async def _advance(self) -> None:
+        """Traite les cases des ticks écoulés depuis le dernier passage."""
+        now_ms = _now_ms()
+        last_tick = now_ms // self.TICK_MS - 1
+        first = max(self._cursor + 1, last_tick - self.WHEEL_SLOTS + 1)
+
+        for tick in range(first, last_tick + 1):
+            slot = self._slots[tick % self.WHEEL_SLOTS]
+            # Une case ne contient que des échéances de ce tick (horizon d'une révolution)
+            for member in list(slot):
+                del slot[member]
+                self._loaded.pop(member, None)
+                if member in self._callbacks:
+                    self._local_due.pop(member)
+                    self._spawn(member, self._callbacks.pop(member)())
+                else:
+                    await self._claim(member, now_ms)
+        self._cursor = max(self._cursor, last_tick)
+
+    async def _claim(self, member: str, now_ms: int) -> None:
+        payload = await self._claim_script(
+            keys=[SCHEDULER_DEADLINES_KEY, SCHEDULER_PAYLOADS_KEY], args=[member, now_ms]
+        )
+        if payload is None:
+            self.claimed_elsewhere += 1
+            return
+
+        kind, _, key = member.partition("|")
+        handler = self._handlers.get(kind)
+        if handler is None:
+            print(f"⚠️ Échéance {member} sans handler, ignorée")
+            return
+
+        self._spawn(member, handler(key, json_codec.loads(payload) if payload else {}))
+
+    def _spawn(self, member: str, action: Awaitable[None]) -> None:
+        # Le handler tourne à part : un handler lent ne retarde pas la roue
+        task = asyncio.create_task(self._run(member, action))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, member: str, action: Awaitable[None]) -> None:
+        try:
+            await action
+            self.fired += 1
+        except Exception as e:
+            self.handler_errors += 1
+            print(f"❌ Échéance {member} en échec : {e.__class__.__name__}: {e}")
+
+    async def tick(self, refill: bool = True) -> None:
+        """Un pas de la roue (rechargement depuis Redis compris)."""
+        if refill:
+            await self._refill()
+        started = _now_ms()
+        await self._advance()
+        self.max_lag_ms = max(self.max_lag_ms, _now_ms() - started)
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        ticks = 0
+        while not stop_event.is_set():
+            await self.tick(refill=ticks % self.REFILL_TICKS == 0)
+            ticks += 1
+            await asyncio.sleep(self.TICK_MS / 1000)
+
+    async def get_metrics(self) -> dict:
+        return {
+            "pending": await self._redis.zcard(SCHEDULER_DEADLINES_KEY),
+            "loaded": len(self._loaded),
+            "local_callbacks": len(self._callbacks),
+            "running_handlers": len(self._running),
+            "fired": self.fired,
+            "claimed_elsewhere": self.claimed_elsewhere,
+            "handler_errors": self.handler_errors,
+            "max_lag_ms": self.max_lag_ms,
+        }
+
+
+# Planificateur du processus (None tant que la tâche n'est pas démarrée)
+deadline_scheduler: DeadlineScheduler | None = None
+
+
+def get_deadline_scheduler() -> DeadlineScheduler | None:
+    return deadline_scheduler
+
+
+async def schedule_deadline(
+    redis_client: AsyncRedis,
+    kind: str,
+    key: str,
+    delay_seconds: float,
+    payload: Dict[str, Any] | None = None,
+) -> None:
+    """
+    Programme (ou reprogramme) l'échéance `kind` de `key`. Écrite dans Redis,
+    elle est exécutée par le premier worker qui la réclame.
+    """
+    member = _member(kind, key)
+    due_ms = _now_ms() + int(delay_seconds * 1000)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.zadd(SCHEDULER_DEADLINES_KEY, {member: due_ms})
+        pipe.hset(SCHEDULER_PAYLOADS_KEY, member, json_codec.dumps(payload or {}))
+        await pipe.execute()
+
+    # Échéance proche : inutile d'attendre le prochain rechargement
+    if deadline_scheduler is not None:
+        deadline_scheduler.load(member, due_ms)
+
+
+async def cancel_deadline(redis_client: AsyncRedis, kind: str, key: str) -> bool:
+    """Annule une échéance ; False si elle n'existait plus (déjà exécutée)."""
+    member = _member(kind, key)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.zrem(SCHEDULER_DEADLINES_KEY, member)
+        pipe.hdel(SCHEDULER_PAYLOADS_KEY, member)
+        removed, _ = await pipe.execute()
+
+    if deadline_scheduler is not None:
+        deadline_scheduler.unload(member)
+    return bool(removed)
+
+
+# Rappels lancés sans planificateur (références gardées jusqu'à la fin)
+_fallback_tasks: Set[asyncio.Task] = set()
+
+
+def call_later(delay_seconds: float, callback: LocalCallback) -> None:
+    """
+    Rappel local non bloquant : sur la roue du planificateur s'il tourne,
+    sinon directement sur la boucle asyncio (tests, démarrage).
+    """
+    if deadline_scheduler is not None:
+        deadline_scheduler.call_later(delay_seconds, callback)
+        return
+
+    def _start() -> None:
+        task = asyncio.create_task(callback())
+        _fallback_tasks.add(task)
+        task.add_done_callback(_fallback_tasks.discard)
+
+    asyncio.get_running_loop().call_later(delay_seconds, _start)
+
+
+async def run_deadline_scheduler() -> None:
+    """Tâche d'arrière-plan unique qui exécute les échéances des parties."""
+    # Imports locaux pour éviter un cycle avec le service de matchmaking
+    from app.core.matchmaker_service import STOP_EVENT
+    from app.core.redis import get_redis_client
+    from app.games.wordsearch.deadlines import register_deadline_handlers
+
+    global deadline_scheduler
+
+    print("🚀 Démarrage du planificateur d'échéances...")
+
+    redis_client = get_redis_client()
+
+    if redis_client is None:
+        print("❌ Impossible de démarrer: Redis non disponible")
+        return
+
+    scheduler = DeadlineScheduler(redis_client)
+    register_deadline_handlers(scheduler, redis_client)
+    deadline_scheduler = scheduler
+
+    while not STOP_EVENT.is_set():
+        try:
+            await scheduler.run(STOP_EVENT)
+        except Exception as e:
+            print(f"❌ ERREUR PLANIFICATEUR: {e.__class__.__name__}: {e}")
+            await asyncio.sleep(5)
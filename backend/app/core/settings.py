@@ -32,6 +32,31 @@ class Settings(BaseSettings):
     # --- Configuration Cache/Temps Réel (Redis) ---
     REDIS_URL: str
 
+    # --- Configuration du jeu ---
+    # Moteur de placement des mots : "python", "numpy" ou "backtrack"
+    WORDSEARCH_GENERATOR_MODE: str = "python"
+    # Nombre de mots tirés par grille (garantis en mode "backtrack")
+    WORDSEARCH_WORD_COUNT: int = 12
+    WORDSEARCH_TIME_BUDGET_MS: float = 200.0
+    # Profil de longueur des mots tirés : "easy", "medium" ou "hard"
+    WORDSEARCH_DIFFICULTY: str = "medium"
+    # État des parties en mémoire (recopié dans Redis en différé)
+    WORDSEARCH_IN_MEMORY_STATE: bool = False
+    WORDSEARCH_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # Durée de vie des clés Redis d'une partie selon sa phase
+    GAME_KEYS_ACTIVE_TTL_SECONDS: int = 3600
+    GAME_KEYS_FINISHED_TTL_SECONDS: int = 600
+    # Partie jamais finalisée au-delà de cet âge : ses clés sont orphelines
+    GAME_KEYS_ORPHAN_AGE_SECONDS: int = 1800
+    GAME_KEYS_SWEEP_INTERVAL_SECONDS: int = 300
+    # Délai laissé à un joueur déconnecté pour revenir avant l'abandon
+    DISCONNECT_GRACE_SECONDS: int = 30
+    # Cadence maximale de diffusion des aperçus de sélection, par salle
+    PREVIEW_RATE_HZ: float = 20.0
+    # Pool de processus dédié à la génération des grilles
+    GENERATION_WORKERS: int = 2
+    GENERATION_MAX_CONCURRENCY: int = 4
+
     # --- Configuration E-mail (Pour le Magic Code/OTP futur) ---
     SMTP_USERNAME: str | None = None
     SMTP_PASSWORD: SecretStr | None = None
@@ -7,10 +7,45 @@ GAME_STATE_KEY_PREFIX = "game:state:"
 
 SOLUTION_KEY_PREFIX = "game:solution:"
 
+# État d'une partie réparti par champ : descripteur immuable, métadonnées,
+# mots trouvés (solution -> joueur) et scores, modifiés par script Lua
+PUZZLE_KEY_PREFIX = "game:puzzle:"
+
+META_KEY_PREFIX = "game:meta:"
+
+FOUND_KEY_PREFIX = "game:found:"
+
+SCORES_KEY_PREFIX = "game:scores:"
+
+# Outbox des résultats de parties (Redis Stream) et lettres mortes
+RESULTS_OUTBOX_STREAM = "results:outbox"
+
+RESULTS_OUTBOX_GROUP = "results-writers"
+
+RESULTS_DEAD_LETTER_STREAM = "results:dead_letter"
+
+# Échéances des parties (sorted set : membre "type|clé" -> instant en ms)
+SCHEDULER_DEADLINES_KEY = "scheduler:deadlines"
+
+SCHEDULER_PAYLOADS_KEY = "scheduler:payloads"
+
+# Échéance réclamée par un worker sans la salle : relayée (pub/sub) à celui qui la tient
+DEADLINE_RELAY_PREFIX = "deadline_relay:"
+
 MATCH_NOTIFICATION_PREFIX = "match_notification:"
 
 WS_TOKEN_PREFIX = "ws_auth:"
 
+# Réserve de grilles pré-générées (une liste Redis par thème)
+PUZZLE_POOL_KEY_PREFIX = "puzzle_pool:"
+
+PUZZLE_POOL_THEMES_KEY = "puzzle_pool:themes"
+
+PUZZLE_POOL_METRICS_KEY = "puzzle_pool:metrics"
+
+# Compteur de matchs par minute (sert à dimensionner la réserve)
+MATCH_RATE_KEY_PREFIX = "stats:matches_per_minute:"
+
 
 class GameStatus(str, Enum):
     WAITING_FOR_PLAYERS = "waiting_for_players"
@@ -23,6 +58,12 @@ class GameStatus(str, Enum):
     PREPARING="prepare_game"
 
 
+class DeadlineKind(str, Enum):
+    GAME_TIMEOUT = "game_timeout"
+    DISCONNECT_GRACE = "disconnect_grace"
+    MATCH_NOTIFICATION = "match_notification"
+
+
 class Games(str, Enum):
     wordsearch = "wordsearch"
 
@@ -0,0 +1,203 @@
+import asyncio
+from functools import partial
+from typing import Any, Dict, Set
+
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core import json_codec
+from app.core.scheduler import DeadlineScheduler
+from app.games.constants import DEADLINE_RELAY_PREFIX, DeadlineKind, MATCH_NOTIFICATION_PREFIX
+from .wordsearch_controller import WordSearchController
+from .wordsearch_store import evict_games
+
+
+def _local_room(game_id: str):
+    """Salle tenue par ce processus, ou None (autre worker, redémarrage)."""
+    # Import local : les salles sont tenues par la route WebSocket
+    from app.api.websocket import ACTIVE_GAMES
+
+    return ACTIVE_GAMES.get(game_id)
+
+
+async def _with_controller(redis_client: AsyncRedis, game_id: str, action) -> None:
+    """Exécute `action(controller)` sans salle locale, avec une session dédiée."""
+    from app.core.db import get_db_session
+
+    db_session = await get_db_session()
+    try:
+        await action(WordSearchController(game_id, db_session, redis_client))
+    finally:
+        await db_session.close()
+
+
+async def _relay_to_owner(
+    redis_client: AsyncRedis, game_id: str, kind: DeadlineKind, key: str, payload: Dict[str, Any]
+) -> bool:
+    """Publie l'échéance sur le canal de la partie ; True si un worker tient la salle."""
+    message = json_codec.dumps({"kind": kind.value, "key": key, "payload": payload})
+    return await redis_client.publish(f"{DEADLINE_RELAY_PREFIX}{game_id}", message) > 0
+
+
+async def on_game_timeout(
+    redis_client: AsyncRedis, game_id: str, payload: Dict[str, Any], relayed: bool = False
+) -> None:
+    """Fin du temps réglementaire."""
+    room = _local_room(game_id)
+    if room is not None:
+        await room.on_game_timeout()
+        return
+    # Salle tenue ailleurs : c'est ce worker qui prévient les joueurs
+    if not relayed and await _relay_to_owner(redis_client, game_id, DeadlineKind.GAME_TIMEOUT, game_id, payload):
+        return
+    # Personne à prévenir : le résultat est tout de même enregistré
+    await _with_controller(redis_client, game_id, lambda controller: controller.handle_timeout())
+
+
+async def on_disconnect_grace_expired(
+    redis_client: AsyncRedis, key: str, payload: Dict[str, Any], relayed: bool = False
+) -> None:
+    """Le joueur déconnecté n'est pas revenu à temps : abandon."""
+    game_id, player_id = payload["game_id"], payload["player_id"]
+    room = _local_room(game_id)
+    if room is not None:
+        await room.on_disconnect_grace_expired(player_id, payload.get("username"))
+        return
+    if not relayed and await _relay_to_owner(redis_client, game_id, DeadlineKind.DISCONNECT_GRACE, key, payload):
+        return
+    await _with_controller(redis_client, game_id, lambda controller: controller.handle_abandon(player_id))
+
+
+async def on_match_notification_expired(redis_client: AsyncRedis, game_id: str, payload: Dict[str, Any]) -> None:
+    """
+    Notifications de match non lues : elles sont retirées, et si aucun des
+    joueurs n'a lu la sienne, personne ne peut rejoindre la partie.
+    """
+    players = payload.get("players", [])
+    keys = [f"{MATCH_NOTIFICATION_PREFIX}{player_id}" for player_id in players]
+    if not keys:
+        return
+
+    # Une notification plus récente (autre match) n'est pas touchée
+    stale = [
+        key
+        for key, raw in zip(keys, await redis_client.mget(keys))
+        if raw and json_codec.loads(raw).get("game_id") == game_id
+    ]
+    if stale:
+        await redis_client.delete(*stale)
+    if len(stale) == len(keys):
+        evicted = await evict_games(redis_client, [game_id])
+        print(f"🧹 [{game_id}] Match jamais rejoint : {evicted} clé(s) supprimée(s)")
+
+
+def register_deadline_handlers(scheduler: DeadlineScheduler, redis_client: AsyncRedis) -> None:
+    scheduler.register(DeadlineKind.GAME_TIMEOUT, partial(on_game_timeout, redis_client))
+    scheduler.register(DeadlineKind.DISCONNECT_GRACE, partial(on_disconnect_grace_expired, redis_client))
+    scheduler.register(DeadlineKind.MATCH_NOTIFICATION, partial(on_match_notification_expired, redis_client))
+
+
+# Échéances qu'un worker sans la salle relaie à celui qui la tient
+RELAYED_HANDLERS = {
+    DeadlineKind.GAME_TIMEOUT.value: on_game_timeout,
+    DeadlineKind.DISCONNECT_GRACE.value: on_disconnect_grace_expired,
+}
+
+
+class DeadlineRelay:
+    """
+    Reçoit les échéances réclamées par un autre worker pour une salle tenue ici.
+
+    N'importe quel worker peut réclamer une échéance, mais seul celui qui
+    tient la salle (et les sockets, et l'état en mémoire) peut prévenir les
+    joueurs. Chaque salle locale est abonnée au canal de sa partie ; le
+    worker qui réclame publie l'échéance, et ne finalise lui-même depuis
+    Redis que si personne n'écoute (salle fermée, redémarrage).
+    """
+
+    def __init__(self, redis_client: AsyncRedis):
+        self._redis = redis_client
+        self._pubsub = redis_client.pubsub()
+        self._tasks: Set[asyncio.Task] = set()
+        self.delivered = 0
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def follow(self, game_id: str) -> None:
+        """Abonne ce worker aux échéances de la partie (salle créée ici)."""
+        self._spawn(self._pubsub.subscribe(f"{DEADLINE_RELAY_PREFIX}{game_id}"))
+
+    def unfollow(self, game_id: str) -> None:
+        """Désabonne ce worker (salle supprimée)."""
+        self._spawn(self._pubsub.unsubscribe(f"{DEADLINE_RELAY_PREFIX}{game_id}"))
+
+    async def poll(self, timeout: float = 1.0) -> bool:
+        """Traite au plus un message relayé ; False si rien n'est arrivé."""
+        if not self._pubsub.subscribed:
+            await asyncio.sleep(timeout)
+            return False
+
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return False
+
+        data = json_codec.loads(message["data"])
+        handler = RELAYED_HANDLERS.get(data["kind"])
+        if handler is not None:
+            # Sans attendre : une fin de partie ne retient pas les messages suivants
+            self._spawn(handler(self._redis, data["key"], data["payload"], relayed=True))
+            self.delivered += 1
+        return True
+
+    async def close(self) -> None:
+        await self._pubsub.aclose()
+
+
+# Relais du processus (None tant que la tâche n'a pas démarré)
+deadline_relay: DeadlineRelay | None = None
+
+
+def follow_room(game_id: str) -> None:
+    if deadline_relay is not None:
+        deadline_relay.follow(game_id)
+
+
+def unfollow_room(game_id: str) -> None:
+    if deadline_relay is not None:
+        deadline_relay.unfollow(game_id)
+
+
+async def run_deadline_relay() -> None:
+    """Tâche d'arrière-plan qui reçoit les échéances relayées par les autres workers."""
+    # Imports locaux pour éviter un cycle avec le service de matchmaking
+    from app.api.websocket import ACTIVE_GAMES
+    from app.core.matchmaker_service import STOP_EVENT
+    from app.core.redis import get_redis_client
+
+    global deadline_relay
+
+    print("🚀 Démarrage du relais d'échéances...")
+
+    redis_client = get_redis_client()
+
+    if redis_client is None:
+        print("❌ Impossible de démarrer: Redis non disponible")
+        return
+
+    deadline_relay = DeadlineRelay(redis_client)
+    # Salles ouvertes avant le démarrage du relais
+    for game_id in ACTIVE_GAMES:
+        deadline_relay.follow(game_id)
+
+    try:
+        while not STOP_EVENT.is_set():
+            try:
+                await deadline_relay.poll()
+            except Exception as e:
+                print(f"❌ ERREUR RELAIS D'ÉCHÉANCES: {e.__class__.__name__}: {e}")
+                await asyncio.sleep(5)
+    finally:
+        await deadline_relay.close()
+        deadline_relay = None
@@ -1,19 +1,28 @@
 # /backend/app/games/gameRoom.py
 
 import asyncio
+import time
+from collections import Counter
 from typing import Any, Set
 from app.games.constants import GameStatus,GameMessages
-from fastapi import WebSocket, WebSocketDisconnect
+from fastapi import WebSocket
 from redis.asyncio import Redis as AsyncRedis
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.games.constants import GameStatus, GAME_STATE_KEY_PREFIX
+from app.core.scheduler import call_later, cancel_deadline, schedule_deadline
+from app.core.settings import settings
+from app.games.constants import DeadlineKind, GameStatus
+from app.games.wordsearch.player_connection import Frame, PlayerConnection, encode
 from app.games.wordsearch.wordsearch_controller import WordSearchController
 
 
 class GameRoom:
     """Représente une salle de jeu avec ses joueurs connectés."""
 
+    # Temps laissé aux files d'envoi pour se vider avant fermeture
+    DRAIN_TIMEOUT_SECONDS: float = 2.0
+    # Compteurs des connexions agrégés dans les métriques de la salle
+    _COUNTED = ("enqueued", "sent", "dropped", "coalesced", "timeouts", "latency_ms_total")
 
     def __init__(
         self,
@@ -27,7 +36,6 @@ class GameRoom:
         self._state: GameStatus = GameStatus.WAITING_FOR_PLAYERS
         self._max_players = max_players
         self._redis_conn = redis_conn
-        self._timeout_task: asyncio.Task | None = None
         self._db_session = db_session
         self._controller = WordSearchController(game_id, db_session, redis_conn)
 
@@ -39,6 +47,20 @@ class GameRoom:
         self._known_players: Set[str] = set()
         self._start_timestamp: float | None = None
 
+        # Métriques d'envoi (connexions fermées comprises)
+        self._broadcasts = 0
+        self._disconnected = 0
+        self._retired_stats: Counter = Counter()
+
+        # Aperçus de sélection : dernier reçu par joueur, diffusé au plus
+        # PREVIEW_RATE_HZ fois par seconde (un seul minuteur par salle)
+        self._preview_interval = 1 / settings.PREVIEW_RATE_HZ
+        self._pending_previews: dict[str, dict[str, Any]] = {}
+        self._last_preview_positions: dict[str, Any] = {}
+        self._preview_flush: asyncio.TimerHandle | None = None
+        self._last_preview_flush = 0.0
+        self._preview_stats: Counter = Counter()
+
 
     # =========================================================================
     # PROPERTIES
@@ -77,6 +99,8 @@ class GameRoom:
         self._players[player_id] = {
             "websocket": websocket,
             "username": username,
+            # File d'envoi bornée, vidée par sa propre tâche d'écriture
+            "connection": PlayerConnection(player_id, websocket, self._on_connection_dead),
         }
 
         self._known_players.add(player_id)
@@ -99,8 +123,12 @@ class GameRoom:
 
     def remove_player(self, player_id: str) -> bool:
         if player_id in self._players:
-            del self._players[player_id]
+            connection: PlayerConnection = self._players.pop(player_id)["connection"]
+            connection.close()
+            self._retire(connection)
             self._ready_players.discard(player_id)
+            self._pending_previews.pop(player_id, None)
+            self._last_preview_positions.pop(player_id, None)
             print(f"🚪 [{self._game_id}] Joueur {player_id} retiré de la game room")
             return True
         return False
@@ -135,8 +163,7 @@ class GameRoom:
         """
         if not self._start_timestamp:
             return self._controller.GAME_DURATION_SECONDS
-        
-        import time
+
         elapsed = time.time() - self._start_timestamp
         remaining = max(0, self._controller.GAME_DURATION_SECONDS - elapsed)
         return int(remaining)
@@ -145,55 +172,116 @@ class GameRoom:
     # MESSAGING
     # =========================================================================
 
-    async def send_to_player(self, player_id: str, message: dict[str, Any]) -> bool:
-        websocket = self.get_player_socket(player_id)
-        if not websocket:
-            return False
+    def _connection(self, player_id: str) -> PlayerConnection | None:
+        player = self._players.get(player_id)
+        return player.get("connection") if player else None
 
-        try:
-            await websocket.send_json(message)
-            return True
-        except WebSocketDisconnect:
-            self.remove_player(player_id)
-            return False
-        except Exception as e:
-            print(f"⚠️ [{self._game_id}] Erreur envoi à {player_id}: {e}")
-            self.remove_player(player_id)
+    async def send_to_player(self, player_id: str, message: dict[str, Any] | Frame) -> bool:
+        """Met le message dans la file du joueur ; n'attend jamais le réseau."""
+        connection = self._connection(player_id)
+        if not connection:
             return False
+        return connection.send(message)
+
+    def _on_connection_dead(self, player_id: str) -> None:
+        """Connexion coupée par sa file (joueur trop lent ou socket en erreur)."""
+        self._disconnected += 1
+        self.remove_player(player_id)
 
     async def broadcast(self, message: dict[str, Any]) -> list[str]:
-        failed: list[str] = []
-        for player_id in list(self._players.keys()):
-            if not await self.send_to_player(player_id, message):
-                failed.append(player_id)
-        return failed
+        return await self.broadcast_except(message, exclude=None)
 
-    async def broadcast_except(self, message: dict[str, Any], exclude: str) -> list[str]:
+    async def broadcast_except(self, message: dict[str, Any], exclude: str | None) -> list[str]:
+        self._broadcasts += 1
+        # Encodé une seule fois, quel que soit le nombre de destinataires
+        frame = Frame(message)
         failed: list[str] = []
         for player_id in list(self._players.keys()):
             if player_id != exclude:
-                if not await self.send_to_player(player_id, message):
+                if not await self.send_to_player(player_id, frame):
                     failed.append(player_id)
         return failed
 
+    def _retire(self, connection: PlayerConnection) -> None:
+        for name in self._COUNTED:
+            self._retired_stats[name] += getattr(connection, name)
+        self._retired_stats["latency_ms_max"] = max(
+            self._retired_stats["latency_ms_max"], connection.latency_ms_max
+        )
+
     # =========================================================================
-    # GAME STATE
+    # APERÇUS DE SÉLECTION
     # =========================================================================
 
-    async def _get_game_state(self) -> dict | None:
-        from app.models.schemas import WordSearchState
-
-        state_key = GAME_STATE_KEY_PREFIX + self._game_id
-        json_state = await self._redis_conn.get(state_key)
-
-        if not json_state:
-            return None
+    def _queue_preview(self, player_id: str, data: dict[str, Any]) -> None:
+        """Garde le dernier aperçu du joueur ; les sélections inchangées sont ignorées."""
+        self._preview_stats["received"] += 1
+        position = data.get("position")
+        pending = self._pending_previews.get(player_id)
+        # Comparée à l'aperçu en attente, à défaut au dernier transmis
+        if pending is not None:
+            unchanged = position == pending.get("position")
+        else:
+            unchanged = (
+                player_id in self._last_preview_positions
+                and position == self._last_preview_positions[player_id]
+            )
+        if unchanged:
+            self._preview_stats["identical"] += 1
+            return
+        if pending is not None:
+            self._preview_stats["coalesced"] += 1
+
+        self._pending_previews[player_id] = data
+        if self._preview_flush is None:
+            delay = max(0.0, self._last_preview_flush + self._preview_interval - time.monotonic())
+            self._preview_flush = asyncio.get_running_loop().call_later(delay, self._flush_previews)
+
+    def _flush_previews(self) -> None:
+        self._preview_flush = None
+        self._last_preview_flush = time.monotonic()
+        pending, self._pending_previews = self._pending_previews, {}
+
+        for player_id, data in pending.items():
+            self._last_preview_positions[player_id] = data.get("position")
+            opponent = self._connection(self.get_opponent_id(player_id) or "")
+            if opponent:
+                opponent.send({**data, "from": self.get_username(player_id)})
+                self._preview_stats["sent"] += 1
+
+    def get_send_metrics(self) -> dict:
+        connections = {
+            player_id: player["connection"] for player_id, player in self._players.items()
+        }
+        totals = Counter(self._retired_stats)
+        for connection in connections.values():
+            for name in self._COUNTED:
+                totals[name] += getattr(connection, name)
+        latency_max = max(
+            [totals["latency_ms_max"], *(c.latency_ms_max for c in connections.values())]
+        )
+        return {
+            "broadcasts": self._broadcasts,
+            "enqueued": totals["enqueued"],
+            "sends": totals["sent"],
+            "timeouts": totals["timeouts"],
+            "dropped": totals["dropped"],
+            "coalesced": totals["coalesced"],
+            "disconnected": self._disconnected,
+            "avg_latency_ms": round(totals["latency_ms_total"] / totals["sent"], 2) if totals["sent"] else 0,
+            "max_latency_ms": round(latency_max, 2),
+            "previews": dict(self._preview_stats),
+            "queue_depths": {player_id: c.depth for player_id, c in connections.items()},
+            "slow_players": [player_id for player_id, c in connections.items() if c.is_slow],
+        }
 
-        if isinstance(json_state, bytes):
-            json_state = json_state.decode("utf-8")
+    # =========================================================================
+    # GAME STATE
+    # =========================================================================
 
-        state = WordSearchState.model_validate_json(json_state)
-        return state.model_dump()
+    async def _get_game_state(self) -> dict | None:
+        state = await self._controller.get_game_state()
+        return state.model_dump() if state else None
 
     # =========================================================================
     # FLOW PRINCIPAL
@@ -233,6 +321,9 @@ class GameRoom:
             """
             username = self.get_username(player_id)
 
+            # Revenu à temps : plus d'abandon programmé
+            await cancel_deadline(self._redis_conn, DeadlineKind.DISCONNECT_GRACE, self._grace_key(player_id))
+
             # Récupérer l'état actuel du jeu
             game_data = await self._get_game_state()
             opponent_info = self.get_opponent_info(player_id)
@@ -285,16 +376,17 @@ class GameRoom:
             await self.broadcast({"type": "error", "message": "Erreur: données de jeu introuvables"})
             return
 
-        # Envoyer à chaque joueur ses données + info adversaire
+        # Envoyer à chaque joueur ses données + info adversaire ; la grille,
+        # commune et volumineuse, n'est encodée qu'une fois
+        game_data = encode(self._game_data)
         for player_id in self._players:
             opponent_info = self.get_opponent_info(player_id)
 
-            await self.send_to_player(player_id, {
+            await self.send_to_player(player_id, Frame({
                 "type": "prepare_game",
-                "game_data": self._game_data,
                 "opponent": {**opponent_info,"score":0},
                 "message": "Chargement de la partie...",
-            })
+            }, game_data=game_data))
 
         print(f"📤 [{self._game_id}] Données envoyées, en attente des confirmations...")
 
@@ -324,24 +416,31 @@ class GameRoom:
     async def _start_countdown_phase(self, countdown_seconds: int = 3) -> None:
         """
         Phase 2: Countdown avant le début de la partie.
+        Chaque seconde est un rappel programmé : le handler qui a déclenché
+        la phase rend la main aussitôt, les messages continuent d'arriver.
         """
         print(f"⏳ [{self._game_id}] Tous les joueurs sont prêts, countdown...")
 
         self._state = GameStatus.STARTING_COUNTDOWN
+        await self._countdown_tick(countdown_seconds)
 
-        for remaining in range(countdown_seconds, 0, -1):
-            await self.broadcast({
-                "type": GameStatus.STARTING_COUNTDOWN.value,
-                "seconds": remaining,
-            })
-            await asyncio.sleep(1)
+    async def _countdown_tick(self, remaining: int) -> None:
+        # Salle fermée ou phase changée entre deux rappels
+        if self._state != GameStatus.STARTING_COUNTDOWN:
+            return
+
+        if remaining == 0:
+            await self._start_game_phase()
+            return
 
-        await self._start_game_phase()
+        await self.broadcast({
+            "type": GameStatus.STARTING_COUNTDOWN.value,
+            "seconds": remaining,
+        })
+        call_later(1, lambda: self._countdown_tick(remaining - 1))
 
     async def _start_game_phase(self) -> None:
         """Phase 3: Démarrage effectif de la partie."""
-        import time
-
         self._state = GameStatus.GAME_IN_PROGRESS
         self._start_timestamp = time.time()
 
@@ -353,23 +452,16 @@ class GameRoom:
 
         print(f"🚀 [{self._game_id}] Partie démarrée!")
 
+        # Fin de partie confiée au planificateur (aucune tâche par partie)
+        await self._controller.start_game()
 
+    async def on_game_timeout(self) -> None:
+        """Échéance de fin de partie (appelée par le planificateur)."""
+        result = await self._controller.handle_timeout()
+        if result:
+            print(f"⏱️ [{self._game_id}] Timeout result: {result}")
+            await self._end_game(result)
 
-        # 🎯 CORRECTION: Lancer le timeout en arrière-plan avec asyncio.create_task
-        self._timeout_task = asyncio.create_task(self._handle_timeout())
-
-    async def _handle_timeout(self) -> None:
-        """Gère le timeout de fin de partie en arrière-plan."""
-        try:
-            result = await self._controller.start_game()
-            if result:
-                print(f"⏱️ [{self._game_id}] Timeout result: {result}")
-                await self._end_game(result)
-        except asyncio.CancelledError:
-            print(f"⏹️ [{self._game_id}] Timeout annulé")
-        except Exception as e:
-            print(f"❌ [{self._game_id}] Erreur timeout: {e}")
-    
     # =========================================================================
     # GAME END
     # =========================================================================
@@ -381,8 +473,7 @@ class GameRoom:
 
         self._state = GameStatus.GAME_FINISHED
 
-        if self._timeout_task and not self._timeout_task.done():
-            self._timeout_task.cancel()
+        await self._controller.cancel_timeout()
 
         winner_id = result.get('winner_id')
         loser_id = result.get('loser_id')
@@ -408,6 +499,24 @@ class GameRoom:
 
         print(f"🏆 [{self._game_id}] Partie terminée. Raison: {reason}, Gagnant: {winner_username or 'match nul'}")
 
+    async def _abandon(self, player_id: str, username: str | None = None) -> None:
+        """
+        Le joueur perd par abandon (volontaire ou déconnexion prolongée).
+        Un joueur déjà retiré de la salle n'y a plus de nom : il est alors fourni.
+        """
+        username = username or self.get_username(player_id)
+        result = await self._controller.handle_abandon(player_id)
+
+        print(f"obtention du resultat de l'abandon {result}")
+
+        if result and result.get("status") == GameStatus.GAME_FINISHED:
+            print("fin de la game")
+            await self._end_game({
+                **result,
+                "abandon_player_id": player_id,
+                "abandon_username": username,
+            })
+
     async def handle_player_message(
             self, 
             player_id: str, 
@@ -435,19 +544,7 @@ class GameRoom:
 
                     print('abandon reçu ')
 
-                    result = await self._controller.handle_abandon(player_id)
-
-                    print(f"obtention du resultat de l'abandon {result}")
-            
-                    if result.get("status") == GameStatus.GAME_FINISHED:
-                        print("fin de la game")
-                        await self._end_game({
-                            **result,
-                            "abandon_player_id": player_id,
-                            "abandon_username": self.get_username(player_id),
-                        })
-
-                    pass
+                    await self._abandon(player_id)
 
                 case 'player_ready':
                     await self.on_player_ready(player_id)
@@ -455,13 +552,8 @@ class GameRoom:
 
                 # Gérer les différents types de messages
                 case  "selection_update":
-                    # Transmettre la sélection à l'adversaire (aperçu en temps réel)
-                    opponent_id = self.get_opponent_id(player_id)
-                    if opponent_id:
-                        await self.send_to_player(opponent_id, {
-                            **data,
-                            "from": self.get_username(player_id),
-                        })
+                    # Aperçu en temps réel : fusionné et transmis à cadence fixe
+                    self._queue_preview(player_id, data)
                 
                 case  "submit_selection":
                     solution = data.get("solution")
@@ -507,6 +599,8 @@ class GameRoom:
 
     async def handle_player_disconnect( self,player_id: str, game_id: str) -> None:
         """Gère la déconnexion d'un joueur."""
+        # Lu avant le retrait : l'abandon éventuel l'annoncera
+        username = self.get_username(player_id)
         self.remove_player(player_id)
 
         print(f"player {player_id} removed from the room ")
@@ -517,24 +611,49 @@ class GameRoom:
             await self.send_to_player(opponent_id, {
                 "type": "opponent_disconnected",
                 "message": "Votre adversaire s'est déconnecté.",
+                "grace_seconds": settings.DISCONNECT_GRACE_SECONDS,
             })
 
-        # # Si la partie était en cours, la terminer
-        # if state == GameStatus.GAME_IN_PROGRESS and opponent_id:
-        #     await self.end_game(winner_id=opponent_id, reason="opponent_disconnected")
+        # Partie en cours : abandon si le joueur ne revient pas à temps
+        if self._state == GameStatus.GAME_IN_PROGRESS and opponent_id:
+            await schedule_deadline(
+                self._redis_conn,
+                DeadlineKind.DISCONNECT_GRACE,
+                self._grace_key(player_id),
+                settings.DISCONNECT_GRACE_SECONDS,
+                {"game_id": self._game_id, "player_id": player_id, "username": username},
+            )
+
+    def _grace_key(self, player_id: str) -> str:
+        return f"{self._game_id}:{player_id}"
+
+    async def on_disconnect_grace_expired(self, player_id: str, username: str | None = None) -> None:
+        """Délai de reconnexion écoulé (appelé par le planificateur)."""
+        if player_id in self._players or self._state != GameStatus.GAME_IN_PROGRESS:
+            return
+        print(f"⌛ [{self._game_id}] {player_id} n'est pas revenu : abandon")
+        await self._abandon(player_id, username)
 
 
 
 
     async def close_all_connections(self) -> None:
         """Ferme toutes les connexions WebSocket."""
+        # Les rappels encore programmés (compte à rebours) n'ont plus d'effet
+        self._state = GameStatus.GAME_CLOSED
+        if self._preview_flush is not None:
+            self._preview_flush.cancel()
+            self._preview_flush = None
         for player_id in list(self._players.keys()):
-            websocket = self.get_player_socket(player_id)
-            if websocket:
+            connection = self._connection(player_id)
+            if connection:
+                # Les derniers messages (game_finished) partent avant la fermeture
+                await connection.drain(self.DRAIN_TIMEOUT_SECONDS)
                 try:
-                    await websocket.close()
+                    await connection.websocket.close()
                 except Exception:
                     pass
             self.remove_player(player_id)
 
+        await self._controller.close()
         print(f"🔌 [{self._game_id}] Toutes les connexions fermées")
\ No newline at end of file
@@ -0,0 +1,223 @@
+import asyncio
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from app.core.settings import settings
+from app.models.schemas import WordSearchPuzzle
+from app.models.tables import WordList
+from .theme_index import ThemeIndex
+from .wordsearch_backtracking import BacktrackingPlacement
+from .wordsearch_generator import GeneratorMode, WordSearchGenerator
+
+
+def build_puzzle(
+    wordlist: WordList,
+    grid_size: int = 10,
+    mode: str | None = None,
+) -> WordSearchPuzzle:
+    """Génère une grille complète à partir d'une liste de mots (synchrone)."""
+    generator = WordSearchGenerator(
+        wordlist,
+        grid_size=grid_size,
+        mode=mode or settings.WORDSEARCH_GENERATOR_MODE,
+        word_count=settings.WORDSEARCH_WORD_COUNT,
+        time_budget_ms=settings.WORDSEARCH_TIME_BUDGET_MS,
+    )
+    theme, grid_data, words_to_find, solutions = generator.generate()
+    return WordSearchPuzzle(
+        theme=theme,
+        grid_data=grid_data,
+        words_to_find=words_to_find,
+        solutions=solutions,
+        descriptor=generator.describe(),
+    )
+
+
+def select_words(index: ThemeIndex, grid_size: int = 10, mode: str | None = None) -> List[str]:
+    """
+    Sous-ensemble de mots à placer : uniquement des mots qui tiennent dans
+    la grille, selon le profil de difficulté configuré. Le mode "backtrack"
+    reçoit quelques mots de réserve pour remplacer ceux qu'il écarte.
+    """
+    count = settings.WORDSEARCH_WORD_COUNT
+    if (mode or settings.WORDSEARCH_GENERATOR_MODE) == GeneratorMode.BACKTRACK:
+        count += BacktrackingPlacement.spare_words(count)
+    return index.select(grid_size, count, settings.WORDSEARCH_DIFFICULTY)
+
+
+def _generate_batch_in_worker(
+    theme: str, word_subsets: List[List[str]], grid_size: int, mode: str
+) -> List[dict]:
+    """Point d'entrée exécuté dans un processus du pool (données picklables)."""
+    return [
+        build_puzzle(WordList(theme=theme, words=words), grid_size, mode).model_dump()
+        for words in word_subsets
+    ]
+
+
+class GenerationService:
+    """
+    Génération de grilles déportée dans un ProcessPoolExecutor borné,
+    pour que le CPU consommé ne bloque jamais la boucle asyncio
+    qui sert les WebSockets.
+    """
+
+    def __init__(self, max_workers: int = 2, max_concurrency: int = 4):
+        self._max_workers = max_workers
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor: ProcessPoolExecutor | None = None
+
+        # Métriques
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._batches = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        # "spawn" : pas de fork d'un processus qui fait tourner la boucle asyncio
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(
+        self, theme: str, word_subsets: List[List[str]], grid_size: int, mode: str
+    ) -> List[WordSearchPuzzle]:
+        """Soumet un lot au pool en respectant la limite de concurrence."""
+        enqueued_at = time.perf_counter()
+        self._queued += 1
+        acquired = False
+        try:
+            async with self._semaphore:
+                acquired = True
+                self._queued -= 1
+                self._running += 1
+                started_at = time.perf_counter()
+                self._total_wait += started_at - enqueued_at
+                try:
+                    loop = asyncio.get_running_loop()
+                    raw = await loop.run_in_executor(
+                        self._executor,
+                        _generate_batch_in_worker,
+                        theme,
+                        word_subsets,
+                        grid_size,
+                        mode,
+                    )
+                    self._completed += len(word_subsets)
+                except Exception:
+                    self._failed += len(word_subsets)
+                    raise
+                finally:
+                    self._running -= 1
+                    self._batches += 1
+                    self._total_run += time.perf_counter() - started_at
+        finally:
+            # Annulé avant d'avoir obtenu le sémaphore
+            if not acquired:
+                self._queued -= 1
+
+        return [WordSearchPuzzle.model_validate(p) for p in raw]
+
+    async def generate(
+        self, index: ThemeIndex, grid_size: int = 10, mode: str | None = None
+    ) -> WordSearchPuzzle:
+        puzzles = await self.generate_many(index, 1, grid_size, mode)
+        return puzzles[0]
+
+    async def generate_many(
+        self,
+        index: ThemeIndex,
+        n: int,
+        grid_size: int = 10,
+        mode: str | None = None,
+    ) -> List[WordSearchPuzzle]:
+        """
+        Génère n grilles, réparties en lots sur les processus du pool.
+        Les sous-ensembles de mots sont tirés ici : seuls eux transitent
+        vers les processus.
+        """
+        if n <= 0:
+            return []
+
+        mode = mode or settings.WORDSEARCH_GENERATOR_MODE
+        subsets = [select_words(index, grid_size, mode) for _ in range(n)]
+        chunk = math.ceil(n / self._max_workers)
+
+        batches = await asyncio.gather(
+            *(
+                self._submit(index.theme, subsets[i : i + chunk], grid_size, mode)
+                for i in range(0, n, chunk)
+            )
+        )
+        return [puzzle for batch in batches for puzzle in batch]
+
+    def get_metrics(self) -> dict:
+        batches = max(1, self._batches)
+        return {
+            "workers": self._max_workers,
+            "queue_depth": self._queued,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "batches": self._batches,
+            "avg_batch_wait_ms": round(self._total_wait / batches * 1000, 2),
+            "avg_batch_run_ms": round(self._total_run / batches * 1000, 2),
+        }
+
+
+# Instance globale (initialisée au démarrage, comme le client Redis)
+generation_service: GenerationService | None = None
+
+
+def startup_generation_service() -> None:
+    """Démarre le pool de processus de génération."""
+    global generation_service
+    generation_service = GenerationService(
+        max_workers=settings.GENERATION_WORKERS,
+        max_concurrency=settings.GENERATION_MAX_CONCURRENCY,
+    )
+    generation_service.start()
+    print(f"✅ Pool de génération démarré ({settings.GENERATION_WORKERS} processus).")
+
+
+def shutdown_generation_service() -> None:
+    """Arrête le pool de processus de génération."""
+    global generation_service
+    if generation_service:
+        generation_service.shutdown()
+        generation_service = None
+        print("🔌 Pool de génération arrêté.")
+
+
+def get_generation_service() -> GenerationService | None:
+    return generation_service
+
+
+async def generate_puzzles(index: ThemeIndex, n: int = 1) -> List[WordSearchPuzzle]:
+    """
+    Génère n grilles via le pool de processus.
+    Sans pool démarré (tests, scripts), la génération se fait sur place.
+    """
+    service = get_generation_service()
+    if service is None or not service.started:
+        return [
+            build_puzzle(WordList(theme=index.theme, words=select_words(index)))
+            for _ in range(n)
+        ]
+    return await service.generate_many(index, n)
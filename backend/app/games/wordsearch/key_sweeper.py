@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import ResponseError
+
+from app.core.settings import settings
+from app.games.constants import GAME_STATE_KEY_PREFIX, META_KEY_PREFIX
+from .wordsearch_store import GAME_KEY_PREFIXES
+
+
+class GameKeySweeper:
+    """
+    Ramasse les clés de parties orphelines, que le cycle de vie normal
+    (TTL par phase, suppression après écriture en base) ne libère pas :
+      - une clé sans TTL (écrite avant le cycle de vie, ancien `game:state:*`) ;
+      - une partie jamais finalisée après GAME_KEYS_ORPHAN_AGE_SECONDS
+        (match que personne n'a rejoint).
+    """
+
+    SCAN_COUNT: int = 500
+
+    def __init__(self, redis_client: AsyncRedis, orphan_age_seconds: int | None = None):
+        self._redis = redis_client
+        self._orphan_age = orphan_age_seconds or settings.GAME_KEYS_ORPHAN_AGE_SECONDS
+        self._prefixes = (*GAME_KEY_PREFIXES, GAME_STATE_KEY_PREFIX)
+
+        # Métriques (par processus)
+        self.runs = 0
+        self.keys_reclaimed = 0
+        self.bytes_reclaimed = 0
+        self.last_run: dict = {}
+
+    def _game_id(self, key: str) -> str | None:
+        for prefix in self._prefixes:
+            if key.startswith(prefix):
+                return key[len(prefix):]
+        return None
+
+    async def _keys_by_game(self) -> Dict[str, List[str]]:
+        games: Dict[str, List[str]] = defaultdict(list)
+        async for key in self._redis.scan_iter("game:*", count=self.SCAN_COUNT):
+            game_id = self._game_id(key)
+            if game_id is not None:
+                games[game_id].append(key)
+        return games
+
+    async def _orphans(self, games: Dict[str, List[str]]) -> List[str]:
+        game_ids = list(games)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for game_id in game_ids:
+                for key in games[game_id]:
+                    pipe.ttl(key)
+                pipe.hmget(f"{META_KEY_PREFIX}{game_id}", "created_at", "finalized")
+            replies = await pipe.execute()
+
+        now = time.time()
+        orphans: List[str] = []
+        position = 0
+        for game_id in game_ids:
+            keys = games[game_id]
+            ttls = replies[position:position + len(keys)]
+            created_at, finalized = replies[position + len(keys)]
+            position += len(keys) + 1
+
+            no_expiry = any(ttl == -1 for ttl in ttls)
+            abandoned = (
+                created_at is not None
+                and finalized is None
+                and now - int(created_at) > self._orphan_age
+            )
+            if no_expiry or abandoned:
+                orphans.extend(keys)
+        return orphans
+
+    async def _memory_usage(self, keys: List[str]) -> int:
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.memory_usage(key)
+                sizes = await pipe.execute()
+        except ResponseError:
+            # MEMORY USAGE indisponible (Redis compatible sans cette commande)
+            return 0
+        return sum(size or 0 for size in sizes)
+
+    async def sweep_once(self) -> dict:
+        """Un passage complet ; retourne le nombre de parties, clés et octets libérés."""
+        started = time.perf_counter()
+        games = await self._keys_by_game()
+        orphans = await self._orphans(games) if games else []
+
+        reclaimed_bytes = 0
+        reclaimed_keys = 0
+        if orphans:
+            reclaimed_bytes = await self._memory_usage(orphans)
+            reclaimed_keys = await self._redis.delete(*orphans)
+
+        self.runs += 1
+        self.keys_reclaimed += reclaimed_keys
+        self.bytes_reclaimed += reclaimed_bytes
+        self.last_run = {
+            "games_scanned": len(games),
+            "keys_reclaimed": reclaimed_keys,
+            "bytes_reclaimed": reclaimed_bytes,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        return self.last_run
+
+    def get_metrics(self) -> dict:
+        return {
+            "runs": self.runs,
+            "keys_reclaimed": self.keys_reclaimed,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "last_run": self.last_run,
+        }
+
+
+# Balayeur du processus (métriques exposées par l'API)
+game_key_sweeper: GameKeySweeper | None = None
+
+
+def get_game_key_sweeper() -> GameKeySweeper | None:
+    return game_key_sweeper
+
+
+async def run_game_key_sweeper() -> None:
+    """Tâche d'arrière-plan qui supprime périodiquement les clés de parties orphelines."""
+    # Imports locaux pour éviter un cycle avec le service de matchmaking
+    from app.core.matchmaker_service import STOP_EVENT
+    from app.core.redis import get_redis_client
+
+    global game_key_sweeper
+
+    print("🚀 Démarrage du balayeur de clés de parties...")
+
+    redis_client = get_redis_client()
+
+    if redis_client is None:
+        print("❌ Impossible de démarrer: Redis non disponible")
+        return
+
+    game_key_sweeper = GameKeySweeper(redis_client)
+
+    while not STOP_EVENT.is_set():
+        try:
+            report = await game_key_sweeper.sweep_once()
+            if report["keys_reclaimed"]:
+                print(
+                    f"🧹 {report['keys_reclaimed']} clé(s) orpheline(s) supprimée(s), "
+                    f"{report['bytes_reclaimed']} octet(s) libéré(s)"
+                )
+        except Exception as e:
+            print(f"❌ ERREUR BALAYEUR DE CLÉS: {e.__class__.__name__}: {e}")
+            await asyncio.sleep(5)
+            continue
+
+        await asyncio.sleep(settings.GAME_KEYS_SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,230 @@
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from fastapi import WebSocket
+
+from app.core.json_codec import dumps
+from app.games.constants import GameMessages
+
+
+class MessageClass(str, Enum):
+    # Jamais perdu : résultats, scores, phases de la partie
+    RELIABLE = "reliable"
+    # Perdu si la file est pleine ou le joueur lent (chat)
+    DROPPABLE = "droppable"
+    # Aperçu : seul le dernier en attente par émetteur est envoyé
+    COALESCIBLE = "coalescible"
+
+
+MESSAGE_CLASSES: Dict[str, MessageClass] = {
+    GameMessages.SELECTION_UPDATE.value: MessageClass.COALESCIBLE,
+    "chat_message": MessageClass.DROPPABLE,
+}
+
+
+def encode(message: Dict[str, Any]) -> str:
+    # Codec rapide de l'application (orjson s'il est installé)
+    return dumps(message)
+
+
+class Frame:
+    """
+    Message encodé une seule fois, envoyé tel quel à tous ses destinataires.
+
+    `raw` contient des champs déjà encodés (la grille, par exemple), insérés
+    sans réencodage : seule la partie propre au joueur est encodée.
+    """
+
+    __slots__ = ("type", "text")
+
+    def __init__(self, message: Dict[str, Any], **raw: str):
+        self.type = message.get("type")
+        text = encode(message)
+        if raw:
+            fields = ",".join(f"{encode(name)}:{value}" for name, value in raw.items())
+            text = f"{text[:-1]}{',' if message else ''}{fields}}}"
+        self.text = text
+
+
+def classify(message: Dict[str, Any] | Frame) -> MessageClass:
+    message_type = message.type if isinstance(message, Frame) else message.get("type")
+    return MESSAGE_CLASSES.get(message_type, MessageClass.RELIABLE)
+
+
+class PlayerConnection:
+    """
+    File d'envoi bornée d'un joueur, vidée par une tâche d'écriture dédiée.
+
+    `send` ne fait qu'empiler : la logique de jeu n'attend jamais le réseau.
+    L'écrivain envoie avec un délai SEND_TIMEOUT_SECONDS ; un envoi hors
+    délai marque le joueur lent (aperçus et chat ne lui sont plus envoyés ;
+    un message fiable est remis en tête de file et retenté), et MAX_SLOW_STRIKES ratés d'affilée, ou un message fiable refusé par une
+    file pleine, coupent la connexion (`on_dead`).
+    """
+
+    MAX_QUEUE: int = 64
+    SEND_TIMEOUT_SECONDS: float = 1.0
+    MAX_SLOW_STRIKES: int = 3
+
+    def __init__(
+        self,
+        player_id: str,
+        websocket: WebSocket,
+        on_dead: Callable[[str], None],
+        max_queue: int | None = None,
+    ):
+        self._player_id = player_id
+        self._websocket = websocket
+        self._on_dead = on_dead
+        self._max_queue = max_queue or self.MAX_QUEUE
+
+        # File : (classe, message) ; un aperçu y figure une fois par émetteur,
+        # sa dernière version étant gardée à part
+        self._queue: Deque[Tuple[MessageClass, Any]] = deque()
+        self._previews: Dict[str, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._sending = False
+        self._writer = asyncio.create_task(self._write_loop())
+        self.slow_strikes = 0
+
+        # Métriques
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.max_depth = 0
+        self.latency_ms_total = 0.0
+        self.latency_ms_max = 0.0
+
+    @property
+    def websocket(self) -> WebSocket:
+        return self._websocket
+
+    @property
+    def is_slow(self) -> bool:
+        return self.slow_strikes > 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def send(self, message: Dict[str, Any] | Frame) -> bool:
+        """
+        Empile un message sans attendre ; False si la connexion est fermée.
+        Un `Frame` (diffusion) est envoyé tel quel, un dict est encodé à l'envoi.
+        """
+        if self._closed:
+            return False
+
+        message_class = classify(message)
+        if message_class is MessageClass.COALESCIBLE and not isinstance(message, Frame):
+            sender = str(message.get("from"))
+            if sender in self._previews:
+                self._previews[sender] = message
+                self.coalesced += 1
+                return True
+            if self.is_slow or len(self._queue) >= self._max_queue:
+                self.dropped += 1
+                return True
+            self._previews[sender] = message
+            self._enqueue(message_class, sender)
+            return True
+
+        if len(self._queue) >= self._max_queue or (self.is_slow and message_class is MessageClass.DROPPABLE):
+            if message_class is MessageClass.RELIABLE:
+                # Le joueur ne suit plus : mieux vaut couper que perdre un résultat
+                print(f"🚫 [{self._player_id}] File d'envoi pleine, connexion coupée")
+                self._die()
+                return False
+            self.dropped += 1
+            return True
+
+        self._enqueue(message_class, message)
+        return True
+
+    def _enqueue(self, message_class: MessageClass, item: Any) -> None:
+        self._queue.append((message_class, item))
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._wakeup.set()
+
+    async def _write_loop(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            message_class, item = self._queue.popleft()
+            if message_class is MessageClass.COALESCIBLE:
+                item = self._previews.pop(item)
+                if self.is_slow:
+                    self.dropped += 1
+                    continue
+
+            text = item.text if isinstance(item, Frame) else encode(item)
+            started = time.perf_counter()
+            self._sending = True
+            try:
+                await asyncio.wait_for(self._websocket.send_text(text), self.SEND_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self.slow_strikes += 1
+                self.timeouts += 1
+                print(f"🐢 [{self._player_id}] Envoi hors délai ({self.slow_strikes}/{self.MAX_SLOW_STRIKES})")
+                if self.slow_strikes >= self.MAX_SLOW_STRIKES:
+                    self._die()
+                    return
+                if message_class is MessageClass.RELIABLE:
+                    # Jamais perdu : retenté en premier au prochain tour
+                    self._queue.appendleft((message_class, item))
+                else:
+                    self.dropped += 1
+                continue
+            except Exception as e:
+                print(f"⚠️ [{self._player_id}] Erreur envoi: {e}")
+                self._die()
+                return
+            finally:
+                self._sending = False
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.sent += 1
+            self.latency_ms_total += latency_ms
+            self.latency_ms_max = max(self.latency_ms_max, latency_ms)
+            self.slow_strikes = 0
+
+    def _die(self) -> None:
+        if self._closed:
+            return
+        self._close_queue()
+        self._on_dead(self._player_id)
+        asyncio.create_task(self._close_socket())
+
+    def _close_queue(self) -> None:
+        self._closed = True
+        self._queue.clear()
+        self._previews.clear()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    async def _close_socket(self) -> None:
+        try:
+            await asyncio.wait_for(self._websocket.close(), self.SEND_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+
+    async def drain(self, timeout: float) -> None:
+        """Attend que la file soit vide et le dernier envoi terminé (fin de partie), dans la limite de `timeout`."""
+        deadline = time.monotonic() + timeout
+        while (self._queue or self._sending) and not self._closed and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+
+    def close(self) -> None:
+        """Arrête l'écrivain ; les messages encore en file sont abandonnés."""
+        if not self._closed:
+            self._close_queue()
@@ -0,0 +1,218 @@
+import asyncio
+import math
+import random
+import time
+from typing import Optional
+
+from redis.asyncio import Redis as AsyncRedis
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.schemas import WordSearchPuzzle
+from app.games.constants import (
+    MATCH_RATE_KEY_PREFIX,
+    PUZZLE_POOL_KEY_PREFIX,
+    PUZZLE_POOL_METRICS_KEY,
+    PUZZLE_POOL_THEMES_KEY,
+)
+from .generation_service import generate_puzzles
+from .wordsearch_generator import GENERATOR_VERSION
+from .theme_index import ThemeIndex, build_theme_indexes, theme_indexes
+
+
+class PuzzlePool:
+    """
+    Réserve bornée de grilles pré-générées, une liste Redis par thème.
+
+    La taille cible de chaque réserve suit le rythme récent des matchs :
+    on garde de quoi couvrir LEAD_MINUTES minutes de parties, bornée
+    entre MIN_SIZE et MAX_SIZE.
+    """
+
+    MIN_SIZE: int = 2
+    MAX_SIZE: int = 50
+    LEAD_MINUTES: int = 2
+    RATE_WINDOW_MINUTES: int = 5
+    MAX_REFILL_PER_TICK: int = 5
+
+    def __init__(self, redis_client: AsyncRedis):
+        self._redis = redis_client
+
+    @staticmethod
+    def _pool_key(theme: str) -> str:
+        # Versionnée : après un changement du générateur, les anciennes grilles
+        # (et leurs descripteurs) ne sont plus servies
+        return f"{PUZZLE_POOL_KEY_PREFIX}v{GENERATOR_VERSION}:{theme}"
+
+    @staticmethod
+    def _minute_bucket(timestamp: float) -> int:
+        return int(timestamp // 60)
+
+    # =========================================================================
+    # CONSOMMATION
+    # =========================================================================
+
+    async def pop(self, theme: str | None = None) -> Optional[WordSearchPuzzle]:
+        """
+        Retire une grille prête de la réserve (O(1)).
+        Sans thème imposé, les thèmes connus sont essayés dans un ordre
+        aléatoire : une réserve vide ne masque pas celles qui sont pleines.
+        Retourne None si aucune grille n'est disponible (miss).
+        """
+        if theme is not None:
+            themes = [theme]
+        else:
+            themes = list(await self._redis.smembers(PUZZLE_POOL_THEMES_KEY))
+            random.shuffle(themes)
+
+        raw = None
+        for candidate in themes:
+            raw = await self._redis.lpop(self._pool_key(candidate))
+            if raw:
+                break
+
+        if not raw:
+            await self._redis.hincrby(PUZZLE_POOL_METRICS_KEY, "misses", 1)
+            return None
+
+        await self._redis.hincrby(PUZZLE_POOL_METRICS_KEY, "hits", 1)
+        return WordSearchPuzzle.model_validate_json(raw)
+
+    async def record_match(self) -> None:
+        """Comptabilise un match dans le compteur de la minute courante."""
+        key = f"{MATCH_RATE_KEY_PREFIX}{self._minute_bucket(time.time())}"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, (self.RATE_WINDOW_MINUTES + 1) * 60)
+            await pipe.execute()
+
+    # =========================================================================
+    # DIMENSIONNEMENT
+    # =========================================================================
+
+    async def match_rate(self) -> float:
+        """Nombre moyen de matchs par minute sur la fenêtre récente."""
+        current = self._minute_bucket(time.time())
+        keys = [
+            f"{MATCH_RATE_KEY_PREFIX}{current - i}"
+            for i in range(self.RATE_WINDOW_MINUTES)
+        ]
+        counts = await self._redis.mget(keys)
+        total = sum(int(c) for c in counts if c)
+        return total / self.RATE_WINDOW_MINUTES
+
+    def target_size(self, match_rate: float, theme_count: int) -> int:
+        """Taille cible d'une réserve de thème pour le rythme donné."""
+        per_theme = match_rate * self.LEAD_MINUTES / max(1, theme_count)
+        return max(self.MIN_SIZE, min(self.MAX_SIZE, math.ceil(per_theme)))
+
+    # =========================================================================
+    # REMPLISSAGE
+    # =========================================================================
+
+    async def push(self, puzzle: WordSearchPuzzle) -> None:
+        """Ajoute une grille à la réserve de son thème (bornée à MAX_SIZE)."""
+        key = self._pool_key(puzzle.theme)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, puzzle.model_dump_json())
+            pipe.ltrim(key, -self.MAX_SIZE, -1)
+            pipe.sadd(PUZZLE_POOL_THEMES_KEY, puzzle.theme)
+            await pipe.execute()
+
+    async def refill(self, indexes: list[ThemeIndex]) -> int:
+        """
+        Complète chaque réserve jusqu'à sa taille cible.
+        Retourne le nombre de grilles générées.
+        """
+        if not indexes:
+            return 0
+
+        target = self.target_size(await self.match_rate(), len(indexes))
+        generated = 0
+
+        for index in indexes:
+            current = await self._redis.llen(self._pool_key(index.theme))
+            missing = min(target - current, self.MAX_REFILL_PER_TICK)
+
+            if missing <= 0:
+                continue
+
+            # Génération par lots dans le pool de processus
+            for puzzle in await generate_puzzles(index, missing):
+                await self.push(puzzle)
+                generated += 1
+
+        if generated:
+            await self._redis.hincrby(PUZZLE_POOL_METRICS_KEY, "refills", generated)
+
+        return generated
+
+    # =========================================================================
+    # MÉTRIQUES
+    # =========================================================================
+
+    async def get_metrics(self) -> dict:
+        """Retourne hits/misses/refills et la taille de chaque réserve."""
+        raw = await self._redis.hgetall(PUZZLE_POOL_METRICS_KEY)
+        hits = int(raw.get("hits", 0))
+        misses = int(raw.get("misses", 0))
+
+        themes = await self._redis.smembers(PUZZLE_POOL_THEMES_KEY)
+        sizes = {theme: await self._redis.llen(self._pool_key(theme)) for theme in themes}
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "refills": int(raw.get("refills", 0)),
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "match_rate_per_minute": await self.match_rate(),
+            "pool_sizes": sizes,
+        }
+
+
+async def run_puzzle_pool_producer(
+    interval_seconds: float = 2.0,
+    wordlist_refresh_seconds: float = 300.0,
+) -> None:
+    """
+    Tâche d'arrière-plan qui maintient les réserves de grilles à niveau.
+    """
+    # Imports locaux pour éviter un cycle avec le service de matchmaking
+    from app.core.db import get_db_session
+    from app.core.matchmaker_service import STOP_EVENT
+    from app.core.redis import get_redis_client
+
+    print("🚀 Démarrage du producteur de grilles...")
+
+    redis_client = get_redis_client()
+
+    if redis_client is None:
+        print("❌ Impossible de démarrer: Redis non disponible")
+        return
+
+    pool = PuzzlePool(redis_client)
+    loaded_at = time.time()
+
+    while not STOP_EVENT.is_set():
+        db_session: Optional[AsyncSession] = None
+
+        try:
+            # Les listes de mots changent rarement : index reconstruits périodiquement
+            if not theme_indexes() or time.time() - loaded_at > wordlist_refresh_seconds:
+                db_session = await get_db_session()
+                await build_theme_indexes(db_session)
+                loaded_at = time.time()
+
+            generated = await pool.refill(theme_indexes())
+            if generated:
+                print(f"🧩 {generated} grille(s) ajoutée(s) à la réserve")
+
+        except Exception as e:
+            print(f"❌ ERREUR RÉSERVE DE GRILLES: {e.__class__.__name__}: {e}")
+            await asyncio.sleep(5)
+            continue
+
+        finally:
+            if db_session:
+                await db_session.close()
+
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,414 @@
+import asyncio
+import os
+import socket
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import ResponseError
+from sqlalchemy import JSON, Integer, String, case, column, update, values
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.schemas import GameResult
+from app.models.tables import GameSession, User
+from app.games.constants import (
+    GameStatus,
+    RESULTS_DEAD_LETTER_STREAM,
+    RESULTS_OUTBOX_GROUP,
+    RESULTS_OUTBOX_STREAM,
+)
+from .wordsearch_store import evict_games
+
+
+async def persist_result(session: AsyncSession, result: GameResult) -> bool:
+    """
+    Écrit le résultat d'une partie en base (idempotent), sans charger d'objets ORM.
+    Retourne False si la partie était déjà terminée en base : rien n'est recompté.
+    """
+    # 1. Clôture conditionnelle : une seule des écritures concurrentes obtient la ligne
+    closed = (
+        await session.exec(
+            update(GameSession)
+            .where(GameSession.game_id == result.game_id)
+            .where(GameSession.status != GameStatus.GAME_FINISHED)
+            .values(
+                status=GameStatus.GAME_FINISHED,
+                winner_id=result.winner_id,
+                game_data=result.game_data,
+            )
+            .returning(GameSession.game_id)
+            .execution_options(synchronize_session=False)
+        )
+    ).first()
+
+    if closed is None:
+        await session.rollback()
+        exists = (
+            await session.exec(select(GameSession.game_id).where(GameSession.game_id == result.game_id))
+        ).first()
+        if exists is None:
+            raise ValueError("GameSession non trouvée.")
+        return False
+
+    # 2. Stats joueurs incrémentées en SQL (match nul : rien à compter)
+    player_ids = [user_id for user_id in (result.winner_id, result.loser_id) if user_id]
+    if player_ids:
+        updated = (
+            await session.exec(
+                update(User)
+                .where(User.user_id.in_(player_ids))
+                .values(
+                    victories=User.victories + case((User.user_id == result.winner_id, 1), else_=0),
+                    defeats=User.defeats + case((User.user_id == result.loser_id, 1), else_=0),
+                )
+                .returning(User.user_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+        if len(updated) < len(player_ids):
+            raise ValueError("Utilisateurs non trouvés.")
+
+    await session.commit()
+    return True
+
+
+async def persist_results(session: AsyncSession, results: List[GameResult]) -> Set[str]:
+    """
+    Écrit un lot de résultats en deux requêtes ensemblistes et une transaction.
+    Retourne les game_id réellement appliqués : les parties déjà terminées en
+    base (ou en double dans le lot) sont ignorées par le filtre SQL sur le statut.
+    """
+    by_game: Dict[str, GameResult] = {}
+    for result in results:
+        by_game.setdefault(result.game_id, result)
+    if not by_game:
+        return set()
+
+    # 1. Clôture des parties encore ouvertes ; RETURNING donne celles qui comptent
+    games = values(
+        column("game_id", String),
+        column("winner_id", String),
+        column("game_data", JSON),
+        name="finished_games",
+    ).data([(r.game_id, r.winner_id, r.game_data) for r in by_game.values()]).cte()
+
+    applied = set(
+        (
+            await session.exec(
+                update(GameSession)
+                .where(GameSession.game_id == games.c.game_id)
+                .where(GameSession.status != GameStatus.GAME_FINISHED)
+                .values(
+                    status=GameStatus.GAME_FINISHED,
+                    winner_id=games.c.winner_id,
+                    game_data=games.c.game_data,
+                )
+                .returning(GameSession.game_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).scalars()
+    )
+    if not applied:
+        await session.commit()
+        return applied
+
+    # 2. Compteurs joueurs agrégés sur le lot (match nul : rien à compter)
+    wins: Counter = Counter()
+    losses: Counter = Counter()
+    for game_id in applied:
+        result = by_game[game_id]
+        if result.winner_id:
+            wins[result.winner_id] += 1
+        if result.loser_id:
+            losses[result.loser_id] += 1
+
+    user_ids = wins.keys() | losses.keys()
+    if user_ids:
+        deltas = values(
+            column("user_id", String),
+            column("wins", Integer),
+            column("losses", Integer),
+            name="user_deltas",
+        ).data([(user_id, wins[user_id], losses[user_id]) for user_id in user_ids]).cte()
+
+        updated = (
+            await session.exec(
+                update(User)
+                .where(User.user_id == deltas.c.user_id)
+                .values(
+                    victories=User.victories + deltas.c.wins,
+                    defeats=User.defeats + deltas.c.losses,
+                )
+                .returning(User.user_id)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+        if len(updated) < len(user_ids):
+            raise ValueError("Utilisateurs non trouvés.")
+
+    await session.commit()
+    return applied
+
+
+class ResultsOutbox:
+    """
+    Outbox des résultats de parties, sur un Redis Stream.
+
+    La fin de partie n'attend plus Postgres : le résultat est ajouté au
+    stream, puis un consommateur (groupe Redis) l'écrit en base. Un message
+    n'est acquitté qu'après l'écriture ; en cas d'échec il reste en attente
+    et est repris après RETRY_IDLE_MS, jusqu'à MAX_ATTEMPTS livraisons avant
+    d'être déplacé dans le stream des lettres mortes.
+
+    Les messages arrivés pendant BATCH_WINDOW_MS sont écrits ensemble
+    (`persist_results`) ; si le lot échoue, ils sont rejoués un par un pour
+    isoler le message fautif. Une fois le résultat en base (appliqué ou
+    doublon), les clés Redis de la partie sont supprimées, et le message
+    est retiré du stream (XACK + XDEL) : seuls les résultats en attente y
+    occupent de la mémoire. Les lettres mortes sont bornées à
+    DEAD_LETTER_MAXLEN entrées (environ).
+    """
+
+    BATCH_SIZE: int = 50
+    BATCH_WINDOW_MS: int = 50
+    RETRY_IDLE_MS: int = 5_000
+    MAX_ATTEMPTS: int = 10
+    DEAD_LETTER_MAXLEN: int = 10_000
+
+    def __init__(self, redis_client: AsyncRedis, consumer_name: str | None = None):
+        self._redis = redis_client
+        self._consumer = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+
+        # Métriques du consommateur (par processus)
+        self.applied = 0
+        self.duplicates = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.evicted_keys = 0
+        self.batches = 0
+        self.batched_results = 0
+        self.max_batch_size = 0
+        self.flush_ms_total = 0.0
+        self.flush_ms_max = 0.0
+
+    async def enqueue(self, result: GameResult) -> str:
+        """Ajoute un résultat à l'outbox (durable dès le retour)."""
+        return await self._redis.xadd(
+            RESULTS_OUTBOX_STREAM,
+            {"game_id": result.game_id, "payload": result.model_dump_json()},
+        )
+
+    async def ensure_group(self) -> None:
+        try:
+            await self._redis.xgroup_create(
+                RESULTS_OUTBOX_STREAM, RESULTS_OUTBOX_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _next_messages(self, block_ms: int) -> List[Tuple[str, dict]]:
+        # 1. Messages en échec (ou d'un consommateur disparu) à reprendre
+        _, claimed, *_ = await self._redis.xautoclaim(
+            RESULTS_OUTBOX_STREAM,
+            RESULTS_OUTBOX_GROUP,
+            self._consumer,
+            min_idle_time=self.RETRY_IDLE_MS,
+            start_id="0-0",
+            count=self.BATCH_SIZE,
+        )
+        if claimed:
+            return claimed
+
+        # 2. Nouveaux messages
+        response = await self._redis.xreadgroup(
+            RESULTS_OUTBOX_GROUP,
+            self._consumer,
+            {RESULTS_OUTBOX_STREAM: ">"},
+            count=self.BATCH_SIZE,
+            block=block_ms,
+        )
+        return response[0][1] if response else []
+
+    async def _collect(self, block_ms: int) -> List[Tuple[str, dict]]:
+        """Premier message (bloquant), puis ceux qui arrivent pendant la fenêtre."""
+        messages = await self._next_messages(block_ms)
+        if not messages:
+            return messages
+
+        deadline = time.monotonic() + self.BATCH_WINDOW_MS / 1000
+        while len(messages) < self.BATCH_SIZE:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            response = await self._redis.xreadgroup(
+                RESULTS_OUTBOX_GROUP,
+                self._consumer,
+                {RESULTS_OUTBOX_STREAM: ">"},
+                count=self.BATCH_SIZE - len(messages),
+                block=remaining_ms,
+            )
+            if not response:
+                break
+            messages.extend(response[0][1])
+        return messages
+
+    async def _attempts(self, message_id: str) -> int:
+        pending = await self._redis.xpending_range(
+            RESULTS_OUTBOX_STREAM, RESULTS_OUTBOX_GROUP, min=message_id, max=message_id, count=1
+        )
+        return pending[0]["times_delivered"] if pending else 1
+
+    async def process_once(
+        self,
+        session_factory: Callable[[], Awaitable[AsyncSession]],
+        block_ms: int = 1_000,
+    ) -> int:
+        """Traite un lot de messages ; retourne le nombre de messages acquittés."""
+        messages = await self._collect(block_ms)
+        if not messages:
+            return 0
+
+        parsed: List[Tuple[str, dict, GameResult]] = []
+        to_ack: List[str] = []
+        durable: List[str] = []
+        for message_id, fields in messages:
+            try:
+                parsed.append((message_id, fields, GameResult.model_validate_json(fields["payload"])))
+            except Exception as e:
+                # Message illisible : aucune relivraison ne le corrigera
+                await self._dead_letter(fields, e)
+                to_ack.append(message_id)
+
+        if parsed:
+            started = time.perf_counter()
+            session = await session_factory()
+            try:
+                applied = await persist_results(session, [result for _, _, result in parsed])
+                self.applied += len(applied)
+                self.duplicates += len(parsed) - len(applied)
+                to_ack.extend(message_id for message_id, _, _ in parsed)
+                durable.extend(result.game_id for _, _, result in parsed)
+            except Exception as e:
+                await session.rollback()
+                print(f"⚠️ Écriture groupée de {len(parsed)} résultat(s) échouée ({e}), reprise unitaire")
+                to_ack.extend(await self._process_one_by_one(session, parsed, durable))
+            finally:
+                await session.close()
+            self._record_flush(len(parsed), (time.perf_counter() - started) * 1000)
+
+        if durable:
+            self.evicted_keys += await evict_games(self._redis, durable)
+        if to_ack:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.xack(RESULTS_OUTBOX_STREAM, RESULTS_OUTBOX_GROUP, *to_ack)
+                pipe.xdel(RESULTS_OUTBOX_STREAM, *to_ack)
+                await pipe.execute()
+        return len(to_ack)
+
+    async def _process_one_by_one(
+        self,
+        session: AsyncSession,
+        parsed: List[Tuple[str, dict, GameResult]],
+        durable: List[str],
+    ) -> List[str]:
+        """
+        Rejoue un lot en échec message par message ; retourne les ids à
+        acquitter et complète `durable` avec les parties écrites en base.
+        """
+        to_ack: List[str] = []
+        for message_id, fields, result in parsed:
+            try:
+                if await persist_result(session, result):
+                    self.applied += 1
+                else:
+                    self.duplicates += 1
+                durable.append(result.game_id)
+            except Exception as e:
+                await session.rollback()
+                self.failures += 1
+                print(f"❌ Écriture du résultat {fields.get('game_id')} échouée : {e}")
+
+                if await self._attempts(message_id) < self.MAX_ATTEMPTS:
+                    continue
+                # Abandon : conservé pour analyse, retiré de la file
+                await self._dead_letter(fields, e)
+            to_ack.append(message_id)
+        return to_ack
+
+    async def _dead_letter(self, fields: dict, error: Exception) -> None:
+        await self._redis.xadd(
+            RESULTS_DEAD_LETTER_STREAM,
+            {**fields, "error": str(error)},
+            maxlen=self.DEAD_LETTER_MAXLEN,
+            approximate=True,
+        )
+        self.dead_lettered += 1
+
+    def _record_flush(self, size: int, elapsed_ms: float) -> None:
+        self.batches += 1
+        self.batched_results += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.flush_ms_total += elapsed_ms
+        self.flush_ms_max = max(self.flush_ms_max, elapsed_ms)
+
+    async def get_metrics(self) -> dict:
+        pending = await self._redis.xpending(RESULTS_OUTBOX_STREAM, RESULTS_OUTBOX_GROUP)
+        return {
+            "stream_length": await self._redis.xlen(RESULTS_OUTBOX_STREAM),
+            "pending": pending["pending"],
+            "dead_letters": await self._redis.xlen(RESULTS_DEAD_LETTER_STREAM),
+            "applied": self.applied,
+            "duplicates": self.duplicates,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+            "evicted_keys": self.evicted_keys,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_results / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_batch_size,
+            "avg_flush_ms": round(self.flush_ms_total / self.batches, 2) if self.batches else 0,
+            "max_flush_ms": round(self.flush_ms_max, 2),
+        }
+
+
+# Consommateur du processus (métriques exposées par l'API)
+results_outbox: ResultsOutbox | None = None
+
+
+def get_results_outbox() -> ResultsOutbox | None:
+    return results_outbox
+
+
+async def run_results_outbox_consumer() -> None:
+    """Tâche d'arrière-plan qui écrit en base les résultats de l'outbox."""
+    # Imports locaux pour éviter un cycle avec le service de matchmaking
+    from app.core.db import get_db_session
+    from app.core.matchmaker_service import STOP_EVENT
+    from app.core.redis import get_redis_client
+
+    global results_outbox
+
+    print("🚀 Démarrage du consommateur de résultats...")
+
+    redis_client = get_redis_client()
+
+    if redis_client is None:
+        print("❌ Impossible de démarrer: Redis non disponible")
+        return
+
+    results_outbox = ResultsOutbox(redis_client)
+
+    group_ready = False
+    while not STOP_EVENT.is_set():
+        try:
+            if not group_ready:
+                await results_outbox.ensure_group()
+                group_ready = True
+            await results_outbox.process_once(get_db_session)
+        except Exception as e:
+            # Le groupe a pu disparaître (FLUSHDB, redémarrage de Redis)
+            group_ready = False
+            print(f"❌ ERREUR OUTBOX DES RÉSULTATS: {e.__class__.__name__}: {e}")
+            await asyncio.sleep(5)
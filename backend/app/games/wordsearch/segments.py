@@ -0,0 +1,141 @@
+"""
+Tables précalculées des segments d'une grille carrée.
+
+Un segment est un placement possible d'un mot de `length` lettres :
+une case de départ et une des 8 directions, sans sortir de la grille.
+Les cases sont codées à plat (`row * grid_size + col`) et les tables sont
+mises en cache par (taille de grille, longueur) pour être partagées par
+le générateur, le moteur de validation et le solveur.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+# Ordre canonique : l'index d'une direction est stable (codage des placements)
+DIRECTIONS: Tuple[Tuple[int, int], ...] = tuple(
+    (dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)
+)
+
+DIRECTION_INDEX: Dict[Tuple[int, int], int] = {d: i for i, d in enumerate(DIRECTIONS)}
+
+# (mot, case de départ à plat, index de direction)
+Placement = Tuple[str, int, int]
+
+
+class SegmentTable(NamedTuple):
+    starts: np.ndarray  # (S,) case de départ à plat
+    directions: np.ndarray  # (S,) index dans DIRECTIONS
+    cells: np.ndarray  # (S, length) cases à plat, dans l'ordre des lettres
+
+
+@lru_cache(maxsize=512)
+def segment_table(grid_size: int, length: int) -> SegmentTable:
+    """Tous les segments valides de `length` cases (tableaux en lecture seule)."""
+    steps = np.arange(length, dtype=np.int32)
+    rows, cols = np.divmod(np.arange(grid_size * grid_size, dtype=np.int32), grid_size)
+
+    all_starts, all_dirs, all_cells = [], [], []
+    for index, (dr, dc) in enumerate(DIRECTIONS):
+        end_r = rows + (length - 1) * dr
+        end_c = cols + (length - 1) * dc
+        valid = (end_r >= 0) & (end_r < grid_size) & (end_c >= 0) & (end_c < grid_size)
+        r0, c0 = rows[valid], cols[valid]
+
+        all_starts.append(r0 * grid_size + c0)
+        all_dirs.append(np.full(len(r0), index, dtype=np.int8))
+        all_cells.append((r0[:, None] + steps * dr) * grid_size + (c0[:, None] + steps * dc))
+
+    table = SegmentTable(
+        starts=np.concatenate(all_starts),
+        directions=np.concatenate(all_dirs),
+        cells=np.concatenate(all_cells).reshape(-1, length),
+    )
+    for array in table:
+        array.setflags(write=False)
+    return table
+
+
+@lru_cache(maxsize=512)
+def segment_cells(grid_size: int, length: int) -> List[Tuple[int, ...]]:
+    """Même table sous forme de tuples Python (boucles pures, sans NumPy)."""
+    return [tuple(row) for row in segment_table(grid_size, length).cells.tolist()]
+
+
+@lru_cache(maxsize=512)
+def segment_lookup(grid_size: int, length: int) -> Dict[Tuple[int, int], int]:
+    """(case de départ, index de direction) -> index du segment."""
+    table = segment_table(grid_size, length)
+    return {
+        (start, direction): i
+        for i, (start, direction) in enumerate(
+            zip(table.starts.tolist(), table.directions.tolist())
+        )
+    }
+
+
+@lru_cache(maxsize=512)
+def segment_incidence(grid_size: int, length: int) -> List[np.ndarray]:
+    """Pour chaque case, les indices des segments qui la traversent."""
+    cells = segment_table(grid_size, length).cells
+    flat = cells.ravel()
+    segment_ids = np.repeat(np.arange(len(cells)), length)
+    order = np.argsort(flat, kind="stable")
+    counts = np.bincount(flat, minlength=grid_size * grid_size)
+    return np.split(segment_ids[order], np.cumsum(counts)[:-1])
+
+
+def line_cells(grid_size: int, start: int, direction: int, length: int) -> Tuple[int, ...] | None:
+    """Cases d'un segment, ou None s'il sort de la grille."""
+    segment = segment_lookup(grid_size, length).get((start, direction))
+    if segment is None:
+        return None
+    return segment_cells(grid_size, length)[segment]
+
+
+def segment_between(grid_size: int, start: int, end: int) -> Tuple[int, int] | None:
+    """
+    (index de direction, longueur) du segment allant de `start` à `end`,
+    ou None si les deux cases ne sont pas alignées (ou confondues).
+    """
+    r0, c0 = divmod(start, grid_size)
+    r1, c1 = divmod(end, grid_size)
+    dr, dc = r1 - r0, c1 - c0
+    if (dr, dc) == (0, 0) or (dr and dc and abs(dr) != abs(dc)):
+        return None
+
+    step = ((dr > 0) - (dr < 0), (dc > 0) - (dc < 0))
+    return DIRECTION_INDEX[step], max(abs(dr), abs(dc)) + 1
+
+
+@lru_cache(maxsize=64)
+def grid_lines(grid_size: int) -> Tuple[List[Tuple[int, ...]], List[Tuple[int, ...]]]:
+    """
+    Lignes maximales de la grille sur les 4 axes (horizontal, vertical, deux
+    diagonales), lues dans un seul sens : un mot et son inverse suffisent à
+    couvrir les 8 directions.
+
+    Retourne (lines, lines_by_cell) : les cases de chaque ligne, et pour
+    chaque case les indices des lignes qui la traversent.
+    """
+    lines: List[Tuple[int, ...]] = []
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for r in range(grid_size):
+            for c in range(grid_size):
+                # Une ligne commence sur une case dont la précédente sort de la grille
+                pr, pc = r - dr, c - dc
+                if 0 <= pr < grid_size and 0 <= pc < grid_size:
+                    continue
+                line = []
+                rr, cc = r, c
+                while 0 <= rr < grid_size and 0 <= cc < grid_size:
+                    line.append(rr * grid_size + cc)
+                    rr, cc = rr + dr, cc + dc
+                lines.append(tuple(line))
+
+    lines_by_cell: List[List[int]] = [[] for _ in range(grid_size * grid_size)]
+    for line_id, line in enumerate(lines):
+        for cell in line:
+            lines_by_cell[cell].append(line_id)
+    return lines, [tuple(ids) for ids in lines_by_cell]
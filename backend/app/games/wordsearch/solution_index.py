@@ -0,0 +1,65 @@
+from typing import Dict, Iterable, List, Tuple
+
+from app.models.schemas import WordSolution
+
+
+class SolutionIndex:
+    """
+    Index des solutions d'une partie, construit une seule fois.
+
+    Une sélection est identifiée par ses deux extrémités (cases à plat),
+    dans un sens comme dans l'autre : sa validation est une seule recherche
+    dans un dictionnaire. Les mots trouvés sont suivis par un masque de bits.
+    """
+
+    def __init__(self, solutions: List[WordSolution], grid_size: int):
+        self.grid_size = grid_size
+        self._words: List[str] = []
+        self._directions: List[Tuple[int, int]] = []
+        self._by_endpoints: Dict[Tuple[int, int], int] = {}
+        self._found_mask = 0
+        self.found_count = 0
+
+        for solution_id, solution in enumerate(solutions):
+            start, end = solution.start_index, solution.end_index
+            a = start.row * grid_size + start.col
+            b = end.row * grid_size + end.col
+            self._by_endpoints[(a, b)] = solution_id
+            self._by_endpoints[(b, a)] = solution_id
+
+            dr, dc = end.row - start.row, end.col - start.col
+            self._directions.append(((dr > 0) - (dr < 0), (dc > 0) - (dc < 0)))
+            self._words.append(solution.word.upper())
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def lookup(self, start: int, end: int) -> int | None:
+        """Identifiant de la solution entre ces deux cases, ou None."""
+        return self._by_endpoints.get((start, end))
+
+    def word(self, solution_id: int) -> str:
+        return self._words[solution_id]
+
+    def direction(self, solution_id: int) -> Tuple[int, int]:
+        """Direction (dr, dc) dans laquelle le mot est écrit."""
+        return self._directions[solution_id]
+
+    def is_found(self, solution_id: int) -> bool:
+        return bool(self._found_mask >> solution_id & 1)
+
+    def mark_found(self, solution_id: int) -> None:
+        if not self.is_found(solution_id):
+            self._found_mask |= 1 << solution_id
+            self.found_count += 1
+
+    def sync(self, found_ids: Iterable[int]) -> None:
+        """
+        Recale le masque sur les solutions persistées (champs de game:found).
+        Par identifiant et non par mot : un mot peut figurer deux fois dans la grille.
+        """
+        self._found_mask = 0
+        self.found_count = 0
+        for solution_id in found_ids:
+            if 0 <= solution_id < len(self._words):
+                self.mark_found(solution_id)
@@ -0,0 +1,143 @@
+import random
+from enum import Enum
+from typing import Dict, List
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.tables import WordList
+
+MIN_WORD_LENGTH = 3
+
+# Part maximale de la grille occupée par les lettres des mots
+MAX_FILL_RATIO = 0.6
+
+
+class Difficulty(str, Enum):
+    EASY = "easy"
+    MEDIUM = "medium"
+    HARD = "hard"
+
+
+# Répartition visée entre mots courts (≤ 5), moyens (6-7) et longs (≥ 8)
+DIFFICULTY_PROFILES: Dict[Difficulty, tuple[float, float, float]] = {
+    Difficulty.EASY: (0.6, 0.3, 0.1),
+    Difficulty.MEDIUM: (0.4, 0.4, 0.2),
+    Difficulty.HARD: (0.2, 0.4, 0.4),
+}
+
+
+def _band(length: int) -> int:
+    if length <= 5:
+        return 0
+    if length <= 7:
+        return 1
+    return 2
+
+
+class ThemeIndex:
+    """
+    Mots d'un thème, normalisés en majuscules et regroupés par longueur.
+    Construit une seule fois (au démarrage) pour que la génération ne
+    traite que des mots qui tiennent réellement dans la grille.
+    """
+
+    def __init__(self, theme: str, words: List[str]):
+        self.theme = theme
+        self._by_length: Dict[int, List[str]] = {}
+
+        for word in dict.fromkeys(w.strip().upper() for w in words):
+            if len(word) >= MIN_WORD_LENGTH:
+                self._by_length.setdefault(len(word), []).append(word)
+
+    @property
+    def word_count(self) -> int:
+        return sum(len(bucket) for bucket in self._by_length.values())
+
+    def lengths(self) -> List[int]:
+        return sorted(self._by_length)
+
+    def select(
+        self,
+        grid_size: int,
+        count: int,
+        difficulty: Difficulty = Difficulty.MEDIUM,
+        rng: random.Random | None = None,
+    ) -> List[str]:
+        """
+        Tire `count` mots qui tiennent dans la grille, en suivant la
+        répartition de longueurs du profil de difficulté et sans dépasser
+        MAX_FILL_RATIO des cases.
+        """
+        rng = rng or random.Random()
+        letter_budget = int(grid_size * grid_size * MAX_FILL_RATIO)
+
+        bands: List[List[str]] = [[], [], []]
+        for length, bucket in self._by_length.items():
+            if length <= grid_size:
+                bands[_band(length)].extend(bucket)
+        for band in bands:
+            rng.shuffle(band)
+
+        weights = DIFFICULTY_PROFILES[Difficulty(difficulty)]
+        quotas = [round(count * weight) for weight in weights]
+
+        selected: List[str] = []
+        letters = 0
+        # Quotas du profil d'abord, puis complément avec ce qui reste
+        for pass_quotas in (quotas, [count] * 3):
+            for band, quota in zip(bands, pass_quotas):
+                taken = 0
+                while band and taken < quota and len(selected) < count:
+                    word = band.pop()
+                    if letters + len(word) > letter_budget:
+                        continue
+                    selected.append(word)
+                    letters += len(word)
+                    taken += 1
+
+        rng.shuffle(selected)
+        return selected
+
+
+# Index par thème, construits au démarrage
+_theme_indexes: Dict[str, ThemeIndex] = {}
+
+
+def register_wordlists(wordlists: List[WordList]) -> None:
+    global _theme_indexes
+    _theme_indexes = {wl.theme: ThemeIndex(wl.theme, wl.words) for wl in wordlists}
+
+
+async def build_theme_indexes(session: AsyncSession) -> int:
+    """Charge toutes les listes de mots et (re)construit les index."""
+    result = await session.exec(select(WordList))
+    register_wordlists(list(result.all()))
+    return len(_theme_indexes)
+
+
+def get_theme_index(theme: str) -> ThemeIndex | None:
+    return _theme_indexes.get(theme)
+
+
+def theme_indexes() -> List[ThemeIndex]:
+    return list(_theme_indexes.values())
+
+
+def random_theme_index() -> ThemeIndex | None:
+    if not _theme_indexes:
+        return None
+    return random.choice(list(_theme_indexes.values()))
+
+
+async def startup_theme_indexes() -> None:
+    """Construit les index de thèmes au démarrage de l'application."""
+    # Import local : les processus de génération n'ont pas besoin de la DB
+    from app.core.db import get_db_session
+
+    db_session = await get_db_session()
+    try:
+        count = await build_theme_indexes(db_session)
+        print(f"✅ Index de mots construit ({count} thème(s)).")
+    finally:
+        await db_session.close()
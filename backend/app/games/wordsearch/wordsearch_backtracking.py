@@ -0,0 +1,178 @@
+import time
+import zlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from .segments import Placement, segment_incidence, segment_table
+from .wordsearch_vectorized import EMPTY
+
+
+class PlacementReport(BaseModel):
+    """Bilan d'une génération par contraintes."""
+
+    requested: int
+    placed: int
+    success_rate: float
+    overlap_count: int  # Cases partagées par au moins deux mots
+    backtracks: int
+    elapsed_ms: float
+    timed_out: bool
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class BacktrackingPlacement:
+    """
+    Placement garanti d'un nombre de mots demandé, par recherche en profondeur :
+      - à chaque nœud, on place d'abord le mot le plus contraint
+        (celui qui a le moins de placements encore possibles) ;
+      - en cas d'impasse, on revient sur le placement précédent ;
+      - un mot sans aucun placement est écarté au profit d'un autre candidat.
+    La recherche s'arrête au budget de temps : on garde alors la meilleure
+    solution partielle trouvée.
+    """
+
+    MAX_BRANCHING: int = 12
+    MIN_SPARE_WORDS: int = 4  # Candidats de réserve au-delà du nombre demandé
+
+    def __init__(
+        self,
+        grid_size: int,
+        seed: int,
+        word_count: int,
+        time_budget_ms: float = 200.0,
+    ):
+        self._grid_size = grid_size
+        self._seed = seed
+        self._word_count = word_count
+        self._time_budget = time_budget_ms / 1000
+
+        self._grid = np.zeros(grid_size * grid_size, dtype=np.uint8)
+        self._codes: dict[str, int] = {}
+        self._path: List[Tuple[str, int]] = []
+        self._best: List[Tuple[str, int]] = []
+        self._backtracks = 0
+        self._deadline = 0.0
+
+    @classmethod
+    def spare_words(cls, word_count: int) -> int:
+        """Nombre de candidats de réserve à fournir en plus des mots demandés."""
+        return max(cls.MIN_SPARE_WORDS, word_count // 2)
+
+    def _rng(self, salt: str) -> np.random.Generator:
+        return np.random.default_rng([self._seed, zlib.crc32(salt.encode("utf-8"))])
+
+    def _letters(self, word: str) -> np.ndarray:
+        return np.fromiter((self._codes[ch] for ch in word), dtype=np.uint8, count=len(word))
+
+    def _initial_mask(self, word: str) -> np.ndarray:
+        """Segments où le mot peut être posé sur la grille actuelle."""
+        cells = segment_table(self._grid_size, len(word)).cells
+        current = self._grid[cells]
+        return ((current == EMPTY) | (current == self._letters(word))).all(axis=1)
+
+    def _update_masks(
+        self, masks: Dict[str, np.ndarray], placed_cells: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Masques après un placement : seuls les segments qui traversent
+        les cases posées peuvent devenir infaisables.
+        """
+        affected_by_length: Dict[int, np.ndarray] = {}
+        updated = {}
+        for word, mask in masks.items():
+            length = len(word)
+            if length not in affected_by_length:
+                incidence = segment_incidence(self._grid_size, length)
+                affected_by_length[length] = np.unique(
+                    np.concatenate([incidence[c] for c in placed_cells])
+                )
+            affected = affected_by_length[length]
+            candidates = affected[mask[affected]]
+
+            cells = segment_table(self._grid_size, length).cells
+            current = self._grid[cells[candidates]]
+            ok = ((current == EMPTY) | (current == self._letters(word))).all(axis=1)
+
+            new_mask = mask.copy()
+            new_mask[candidates[~ok]] = False
+            updated[word] = new_mask
+        return updated
+
+    def _search(self, masks: Dict[str, np.ndarray]) -> bool:
+        if len(self._path) > len(self._best):
+            self._best = list(self._path)
+        if len(self._path) >= self._word_count:
+            return True
+        if time.perf_counter() > self._deadline:
+            raise _BudgetExceeded
+
+        # Most-constrained-first : on écarte les mots devenus impossibles
+        counts = {word: int(mask.sum()) for word, mask in masks.items()}
+        masks = {word: mask for word, mask in masks.items() if counts[word]}
+        if len(self._path) + len(masks) < self._word_count:
+            return False
+
+        word = min(masks, key=counts.__getitem__)
+        rest = {w: mask for w, mask in masks.items() if w != word}
+
+        feasible = np.flatnonzero(masks[word])
+        order = self._rng(f"{word}:{len(self._path)}").permutation(feasible)
+        cells = segment_table(self._grid_size, len(word)).cells
+        letters = self._letters(word)
+
+        for segment in order[: self.MAX_BRANCHING]:
+            target = cells[segment]
+            saved = self._grid[target].copy()
+            self._grid[target] = letters
+            self._path.append((word, int(segment)))
+
+            if self._search(self._update_masks(rest, target)):
+                return True
+
+            self._path.pop()
+            self._grid[target] = saved
+            self._backtracks += 1
+
+        # Aucun placement de ce mot ne mène à une solution : on l'écarte
+        return self._search(rest)
+
+    def solve(self, words: List[str]) -> Tuple[List[Placement], PlacementReport]:
+        started = time.perf_counter()
+        self._deadline = started + self._time_budget
+
+        fitting = [w for w in dict.fromkeys(words) if 0 < len(w) <= self._grid_size]
+        candidates = fitting[: self._word_count + self.spare_words(self._word_count)]
+        alphabet = sorted({ch for word in candidates for ch in word})
+        if len(alphabet) > 255:
+            raise ValueError("Trop de caractères distincts pour une grille uint8.")
+        self._codes = {ch: i + 1 for i, ch in enumerate(alphabet)}
+
+        timed_out = False
+        try:
+            self._search({word: self._initial_mask(word) for word in candidates})
+        except _BudgetExceeded:
+            timed_out = True
+
+        placements: List[Placement] = []
+        # Nombre de mots couvrant chaque case (un segment ne repasse jamais par la même case)
+        coverage = np.zeros(self._grid_size * self._grid_size, dtype=np.int32)
+        for word, segment in self._best:
+            table = segment_table(self._grid_size, len(word))
+            placements.append((word, int(table.starts[segment]), int(table.directions[segment])))
+            coverage[table.cells[segment]] += 1
+
+        report = PlacementReport(
+            requested=self._word_count,
+            placed=len(placements),
+            success_rate=round(len(placements) / max(1, self._word_count), 3),
+            overlap_count=int((coverage >= 2).sum()),
+            backtracks=self._backtracks,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+            timed_out=timed_out,
+        )
+        return placements, report
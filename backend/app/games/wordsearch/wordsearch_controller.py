@@ -1,4 +1,3 @@
-import asyncio
 import datetime
 import time
 from typing import Any, Dict, Optional
@@ -8,12 +7,15 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import func
 
+from app.core.scheduler import cancel_deadline, schedule_deadline
 from app.models.schemas import WordSearchState, WordSolution
 from app.models.tables import GameSession, WordList
-from app.games.constants import GameStatus
+from app.games.constants import DeadlineKind, GameStatus
 from .wordsearch_engine import WordSearchEngine
-from .wordsearch_generator import WordSearchGenerator
-from app.games.constants import GAME_STATE_KEY_PREFIX,SOLUTION_KEY_PREFIX
+from .puzzle_pool import PuzzlePool
+from .generation_service import generate_puzzles
+from .theme_index import ThemeIndex, random_theme_index
+from .wordsearch_store import WordSearchStore
 
 async def get_random_wordlist(session: AsyncSession) -> Optional[WordList]:
     query = select(WordList).order_by(func.random()).limit(1)
@@ -34,7 +36,6 @@ class WordSearchController:
         self._db_session = db_session
         self._redis_client = redis_client
         self._engine = WordSearchEngine(game_id, db_session, redis_client)
-        self._timeout_task: asyncio.Task | None = None
         self.start_time = time.time()
 
     @classmethod
@@ -47,16 +48,25 @@ class WordSearchController:
         db_session: AsyncSession,
         redis_client: AsyncRedis,
     ) -> dict | None:
-        wordlist_record = await get_random_wordlist(db_session)
-        if not wordlist_record:
-            return None
-
-        theme, grid_data,words_to_find, solutions = WordSearchGenerator(wordlist_record).generate()
+        pool = PuzzlePool(redis_client)
+        await pool.record_match()
+
+        # Grille pré-générée si disponible, sinon génération immédiate
+        puzzle = await pool.pop()
+        if puzzle is None:
+            index = random_theme_index()
+            if index is None:
+                # Index pas encore construit : lecture directe en base
+                wordlist_record = await get_random_wordlist(db_session)
+                if not wordlist_record:
+                    return None
+                index = ThemeIndex(wordlist_record.theme, wordlist_record.words)
+            [puzzle] = await generate_puzzles(index)
 
         initial_state = WordSearchState(
-            theme=theme,
-            grid_data=grid_data,
-            words_to_find=words_to_find,
+            theme=puzzle.theme,
+            grid_data=puzzle.grid_data,
+            words_to_find=puzzle.words_to_find,
             current_status=GameStatus.GAME_INITIALIZED,
             game_duration=cls.GAME_DURATION_SECONDS,
             realtime_score={p1_id:0,p2_id:0}
@@ -73,8 +83,8 @@ class WordSearchController:
         try:
             db_session.add(new_session)
             await db_session.commit()
-            await redis_client.set(f"{GAME_STATE_KEY_PREFIX}{game_id}", initial_state.model_dump_json())
-            await redis_client.set(f"{SOLUTION_KEY_PREFIX}{game_id}",solutions.model_dump_json())
+            # Redis ne garde que le descripteur de grille (quelques octets)
+            await WordSearchStore(game_id, redis_client).create(puzzle, initial_state)
             # Compteur pour le lobby (la partie du jour)
             today = datetime.date.today().isoformat()
             await redis_client.incr(f"stats:games_count:{today}")
@@ -86,17 +96,24 @@ class WordSearchController:
 
         return initial_state.model_dump()
 
-    async def _schedule_timeout(self):
-        try:
-            await asyncio.sleep(self.GAME_DURATION_SECONDS)
-            result = await self._engine.finalize_game()
-            return result 
-        except asyncio.CancelledError:
-            pass
+    async def start_game(self) -> None:
+        """Programme la fin de partie (échéance partagée, aucune tâche par partie)."""
+        await schedule_deadline(
+            self._redis_client,
+            DeadlineKind.GAME_TIMEOUT,
+            self._game_id,
+            self.GAME_DURATION_SECONDS,
+        )
 
-    def start_game(self) -> asyncio.Task[Dict[str, Any] | None]:
-        task = asyncio.create_task(self._schedule_timeout())
-        return task  
+    async def cancel_timeout(self) -> None:
+        await cancel_deadline(self._redis_client, DeadlineKind.GAME_TIMEOUT, self._game_id)
+
+    async def handle_timeout(self) -> Dict[str, Any] | None:
+        """Fin du temps réglementaire (appelé par le planificateur)."""
+        return await self._engine.finalize_game(duration=self.GAME_DURATION_SECONDS)
+
+    async def get_game_state(self) -> WordSearchState | None:
+        return await self._engine.get_game_state()
 
     async def process_player_action(
         self, player_id: str, selected_data: Dict[str, Any]
@@ -116,3 +133,7 @@ class WordSearchController:
         duration = int(time.time() - self.start_time)
         print(f"Abandon détecté. Durée calculée : {duration} secondes")
         return await self._engine.finalize_game(abandon_player_id=player_id,reason='abandon', duration=duration)
+
+    async def close(self) -> None:
+        """Libère les ressources de la partie (recopie finale de l'état en mémoire)."""
+        await self._engine.close()
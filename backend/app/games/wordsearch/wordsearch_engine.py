@@ -1,13 +1,16 @@
 from typing import Any, Dict, List
 
 from redis.asyncio import Redis as AsyncRedis
-from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.schemas import WordSearchState, WordSolution, Index,WordSearchSolutionData
-from app.models.tables import GameSession, User
+from app.core.settings import settings
+from app.models.schemas import GameResult, WordSearchState, WordSolution, Index,WordSearchSolutionData
 from app.games.constants import GameStatus
-from app.games.constants import GAME_STATE_KEY_PREFIX,SOLUTION_KEY_PREFIX
+from .results_outbox import ResultsOutbox, persist_result
+from .segments import DIRECTIONS, line_cells, segment_between
+from .solution_index import SolutionIndex
+from .wordsearch_live_state import LiveGameState
+from .wordsearch_store import WordSearchStore, evict_games
 
 
 class WordSearchEngine:
@@ -24,16 +27,35 @@ class WordSearchEngine:
         self._game_id = game_id
         self._db_session = db_session
         self._redis = redis_client
+        self._store = WordSearchStore(game_id, redis_client)
         self._solution_data_cache: WordSearchSolutionData | None = None
+        self._solution_index: SolutionIndex | None = None
+
+        # Mode opt-in : l'état fait autorité en mémoire, Redis n'est qu'une copie
+        self._live: LiveGameState | None = None
+        if settings.WORDSEARCH_IN_MEMORY_STATE:
+            self._live = LiveGameState(self._store, settings.WORDSEARCH_FLUSH_INTERVAL_SECONDS)
 
     async def _get_solution_data(self) -> WordSearchSolutionData:
-        """Récupère les solutions depuis Redis (avec cache)."""
+        """Récupère les solutions, reconstruites depuis le descripteur (avec cache)."""
         if self._solution_data_cache is None:
-            json_data = await self._redis.get(f"{SOLUTION_KEY_PREFIX}{self._game_id}")
-            if not json_data:
+            solution_data = await self._store.solutions()
+            if solution_data is None:
                 raise ValueError(f"Solutions non trouvées pour {self._game_id}.")
-            self._solution_data_cache = WordSearchSolutionData.model_validate_json(json_data)
+            self._solution_data_cache = solution_data
         return self._solution_data_cache
+
+    async def _get_solution_index(self) -> SolutionIndex:
+        """Index des solutions, construit au premier chargement des solutions."""
+        if self._solution_index is None:
+            solution_data = await self._get_solution_data()
+            index = SolutionIndex(solution_data.solutions, self._store.grid_size)
+            if self._live is not None:
+                # En mémoire, le masque des mots trouvés doit refléter l'état repris
+                if await self._live.state() is not None:
+                    index.sync(self._live.found_ids())
+            self._solution_index = index
+        return self._solution_index
     
     def _get_points(self, dr: int, dc: int, length: int) -> int:
         """Calcule les points : direction + bonus longueur."""
@@ -49,68 +71,69 @@ class WordSearchEngine:
     # --- MÉTHODES DE GESTION DE L'ÉTAT (I/O) ---
 
     async def _get_game_state(self) -> WordSearchState:
-        """Récupère l'état actuel de la partie depuis Redis."""
-        json_state = await self._redis.get(f"{GAME_STATE_KEY_PREFIX}{self._game_id}")
+        """Récupère l'état actuel de la partie (mémoire ou Redis)."""
+        state = await self.get_game_state()
 
-        if not json_state:
+        if state is None:
             raise ValueError(f"État de partie {self._game_id} non trouvé dans Redis.")
 
-        return WordSearchState.model_validate_json(json_state)
+        return state
+
+    async def get_game_state(self) -> WordSearchState | None:
+        """État complet de la partie, ou None s'il n'existe pas."""
+        if self._live is not None:
+            return await self._live.state()
+        return await self._store.load()
 
     async def _save_game_state(self, state: WordSearchState) -> None:
-        """Sauvegarde l'état actuel de la partie dans Redis."""
-        json_state = state.model_dump_json()
-        await self._redis.set(f"{GAME_STATE_KEY_PREFIX}{self._game_id}", json_state)
+        """Sauvegarde l'état actuel de la partie dans Redis (en différé en mode mémoire)."""
+        if self._live is not None:
+            self._live.mark_dirty()
+            return
+        await self._store.save(state)
+
+    async def close(self) -> None:
+        """Dernière recopie de l'état en mémoire et arrêt de la tâche de fond."""
+        if self._live is not None:
+            await self._live.close()
+
+    # --- COORDONNÉES (cases à plat, sans modèle pydantic) ---
+
+    @staticmethod
+    def _to_cell(index: Index, size: int) -> int:
+        """Case à plat `row * size + col` ; lève ValueError hors de la grille."""
+        if not (0 <= index.row < size and 0 <= index.col < size):
+            raise ValueError("Débordement de grille.")
+        return index.row * size + index.col
 
     @staticmethod
-    def _calculate_direction(start: Index, end: Index) -> tuple[int, int, int]:
+    def _read_selection(grid: List[List[str]], start: int, end: int) -> tuple[str, tuple[int, int]]:
         """
-        Calcule la direction et le nombre de pas entre deux positions.
-        Retourne (dr, dc, steps).
-        Lève ValueError si la sélection n'est pas colinéaire.
+        Lit le mot entre deux cases à plat.
+        Retourne (mot, (dr, dc)) ; lève ValueError si la sélection n'est pas colinéaire.
         """
-        delta_r = end.row - start.row
-        delta_c = end.col - start.col
-        abs_delta_r = abs(delta_r)
-        abs_delta_c = abs(delta_c)
+        size = len(grid)
 
-        # Vérification de colinéarité (horizontal, vertical ou diagonal)
-        is_horizontal = abs_delta_r == 0
-        is_vertical = abs_delta_c == 0
-        is_diagonal = abs_delta_r == abs_delta_c
+        # Cas d'une seule lettre
+        if start == end:
+            return grid[start // size][start % size].upper(), (0, 0)
 
-        if not (is_horizontal or is_vertical or is_diagonal):
+        segment = segment_between(size, start, end)
+        if segment is None:
             raise ValueError("Sélection invalide: non colinéaire.")
 
-        steps = max(abs_delta_r, abs_delta_c)
-        dr = (delta_r // abs_delta_r) if delta_r != 0 else 0
-        dc = (delta_c // abs_delta_c) if delta_c != 0 else 0
-
-        return dr, dc, steps
+        direction, length = segment
+        cells = line_cells(size, start, direction, length)
+        word = "".join([grid[cell // size][cell % size] for cell in cells])
+        return word.upper(), DIRECTIONS[direction]
 
     @staticmethod
     def reconstruct_word(grid: List[List[str]], solution: WordSolution) -> str:
         """Reconstruit le mot à partir de la grille et des coordonnées."""
-        start = solution.start_index
-        end = solution.end_index
-
-        # Cas d'une seule lettre
-        if start.row == end.row and start.col == end.col:
-            return grid[start.row][start.col].upper()
-
-        dr, dc, steps = WordSearchEngine._calculate_direction(start, end)
-
-        letters = []
-        for i in range(steps + 1):
-            row = start.row + i * dr
-            col = start.col + i * dc
-
-            if not (0 <= row < len(grid) and 0 <= col < len(grid[0])):
-                raise ValueError("Débordement de grille.")
-
-            letters.append(grid[row][col])
-
-        return "".join(letters).upper()
+        size = len(grid)
+        start = WordSearchEngine._to_cell(solution.start_index, size)
+        end = WordSearchEngine._to_cell(solution.end_index, size)
+        return WordSearchEngine._read_selection(grid, start, end)[0]
     
 
 
@@ -121,74 +144,105 @@ class WordSearchEngine:
     async def check_all_solutions_found(self, duration : int = 300):
         print("appelle de check_all_solution_found dans engine")
         """Vérifie si toutes les solutions ont été trouvées."""
-        state = await self._get_game_state()
-        solution_data = await self._get_solution_data()
+        index = await self._get_solution_index()
 
-        # 🎯 FIX: words_found est une liste plate de WordSolution
-        total_found = len(state.words_found)
+        # Compteur seul : ni l'état complet ni la grille ne sont relus
+        if self._live is not None:
+            total_found = index.found_count
+        else:
+            total_found = await self._store.found_count()
         print(f"{total_found} solution(s) trouvée(s)")
         
-        if total_found >= len(solution_data.solutions):
+        if total_found >= len(index):
             return await self.finalize_game(reason="completed" , duration=duration)
         
         return None
 
     async def validate_selection(self, player_id: str, selected_obj: WordSolution) -> Dict[str, Any]:
-        state = await self._get_game_state()
-        solution_data = await self._get_solution_data()
+        index = await self._get_solution_index()
 
-        # 1. Analyse direction et reconstruction
+        # 1. Extrémités de la sélection (cases à plat)
         try:
-            dr, dc, steps = self._calculate_direction(selected_obj.start_index, selected_obj.end_index)
-            word = self.reconstruct_word(state.grid_data, selected_obj)
+            start = self._to_cell(selected_obj.start_index, index.grid_size)
+            end = self._to_cell(selected_obj.end_index, index.grid_size)
         except ValueError as e:
             return {"success": False, "reason": str(e)}
 
-        # 2. Vérifications mot correct et non trouvé
-        if not any(word == sol.word.upper() for sol in solution_data.solutions):
+        # 2. Rejets sans aller-retour Redis : mot absent ou déjà vu comme trouvé
+        solution_id = index.lookup(start, end)
+        if solution_id is None:
+            if start != end and segment_between(index.grid_size, start, end) is None:
+                return {"success": False, "reason": "Sélection invalide: non colinéaire."}
             return {"success": False, "reason": "Mot incorrect"}
-        if any(word == found.word.upper() for found in state.words_found):
+        if index.is_found(solution_id):
             return {"success": False, "reason": "Déjà trouvé"}
 
-        # 3. Calcul des points et mise à jour score
+        word = index.word(solution_id)
+        dr, dc = index.direction(solution_id)
         pts = self._get_points(dr, dc, len(word))
-        new_score = state.realtime_score.get(player_id, 0) + pts
-        state.realtime_score[player_id] = new_score
+
+        # 3. Attribution : en mémoire (aucune E/S) ou atomique côté Redis
+        if self._live is not None:
+            await self._get_game_state()
+            new_score = self._live.claim(solution_id, player_id, pts, selected_obj)
+        else:
+            claim = await self._store.claim(player_id, start, end, pts)
+            if not claim.success:
+                if claim.reason == "Déjà trouvé":
+                    index.mark_found(solution_id)
+                return {"success": False, "reason": claim.reason}
+            new_score = claim.new_score
+        index.mark_found(solution_id)
 
         # 4. Préparation pour le Frontend (indices pour le vert)
         selected_obj.word = word
         selected_obj.found_by = player_id
-        # selected_obj.indices = [{"row": selected_obj.start_index.row + i*dr, "col": selected_obj.start_index.col + i*dc} for i in range(steps + 1)]
-
-        state.words_found.append(selected_obj)
-        await self._save_game_state(state)
 
-        return {"success": True, "new_solution": selected_obj.model_dump(), "score_update": pts, "new_score": new_score}
+        return {
+            "success": True,
+            "new_solution": selected_obj.model_dump(),
+            "score_update": pts,
+            "new_score": new_score,
+        }
 
 
 
-    async def finalize_game(self, abandon_player_id: str | None = None,reason = 'timeout', duration: int = 300) -> Dict[str, Any]:
+    async def finalize_game(self, abandon_player_id: str | None = None,reason = 'timeout', duration: int = 300) -> Dict[str, Any] | None:
 
         print(f"appelle de finalize game reason : {reason}")
         """
-        Finalise la partie et enregistre les résultats en base.
+        Finalise la partie : calcule le résultat et le confie à l'outbox,
+        sans attendre l'écriture en base.
         
         Args:
             abandon_player_id: Si fourni, ce joueur a abandonné et perd automatiquement.
+
+        Retourne None si la partie a déjà été finalisée (timeout, fin et
+        abandon peuvent se croiser) : le résultat n'est diffusé qu'une fois.
         """
         # 1. Récupérer l'état final
         try:
             final_state = await self._get_game_state()
         except ValueError:
             return {"status": "error", "detail": "État de jeu non trouvé."}
-        final_state.game_duration = duration
-        await self._save_game_state(final_state)
+
         final_scores = final_state.realtime_score
         player_ids = list(final_scores.keys())
 
         if len(player_ids) < 2:
             return {"status": "error", "detail": "Pas assez de joueurs."}
 
+        # Validé : la partie ne peut plus être finalisée qu'une fois
+        if not await self._store.mark_finalized():
+            print(f"[{self._game_id}] Partie déjà finalisée ({reason} ignoré)")
+            return None
+        final_state.game_duration = duration
+        await self._save_game_state(final_state)
+        # Changement de phase : l'état final est recopié sans attendre,
+        # puis les clés ne vivent plus que le temps d'écrire le résultat
+        await self.close()
+        await self._store.expire(settings.GAME_KEYS_FINISHED_TTL_SECONDS)
+
         player_a_id, player_b_id = player_ids[0], player_ids[1]
         score_a = final_scores.get(player_a_id, 0)
         score_b = final_scores.get(player_b_id, 0)
@@ -204,21 +258,32 @@ class WordSearchEngine:
                 player_a_id, score_a, player_b_id, score_b
             )
 
-        # # 3. Transaction DB
+        # 3. Écriture en base différée (outbox Redis, consommateur idempotent)
+        result = GameResult(
+            game_id=self._game_id,
+            player_a_id=player_a_id,
+            player_b_id=player_b_id,
+            winner_id=winner_id,
+            loser_id=loser_id,
+            game_data=final_state.model_dump(),
+        )
         try:
-            await self._persist_results(
-                player_a_id=player_a_id,
-                player_b_id=player_b_id,
-                winner_id=winner_id,
-                loser_id=loser_id,
-                final_state=final_state,
-            )
+            await ResultsOutbox(self._redis).enqueue(result)
         except Exception as e:
-            await self._db_session.rollback()
-            return {"status": "error", "detail": f"Échec DB: {e}"}
-
-        # # 4. Nettoyage Redis
-        # await self._redis.delete(f"{GAME_STATE_KEY_PREFIX}{self._game_id}")
+            # Outbox indisponible : écriture directe pour ne pas perdre le résultat
+            print(f"❌ [{self._game_id}] Outbox indisponible ({e}), écriture directe")
+            try:
+                await persist_result(self._db_session, result)
+            except Exception as e:
+                await self._db_session.rollback()
+                # Résultat non enregistré : une nouvelle finalisation reste possible
+                await self._store.clear_finalized()
+                return {"status": "error", "detail": f"Échec DB: {e}"}
+            # 4. Résultat en base : les clés Redis ne servent plus (sinon le TTL s'en charge)
+            try:
+                await evict_games(self._redis, [self._game_id])
+            except Exception as e:
+                print(f"⚠️ [{self._game_id}] Clés Redis non supprimées : {e}")
 
         return {
             "status": GameStatus.GAME_FINISHED,
@@ -247,49 +312,6 @@ class WordSearchEngine:
             return player_b_id, player_a_id
         return None, None  # Match nul
 
-    async def _persist_results(
-        self,
-        player_a_id: str,
-        player_b_id: str,
-        winner_id: str | None,
-        loser_id: str | None,
-        final_state: WordSearchState,
-    ) -> None:
-        """Persiste les résultats en base de données."""
-        # Récupérer la session de jeu
-        result = await self._db_session.exec(
-            select(GameSession).where(GameSession.game_id == self._game_id)
-        )
-        game_session = result.first()
-
-        if not game_session:
-            raise ValueError("GameSession non trouvée.")
-
-        # Récupérer les utilisateurs
-        user_result = await self._db_session.exec(
-            select(User).where(User.user_id.in_([player_a_id, player_b_id]))
-        )
-        users = {user.user_id: user for user in user_result.all()}
-
-        if len(users) < 2:
-            raise ValueError("Utilisateurs non trouvés.")
-
-        # Mise à jour de la GameSession
-        game_session.status = GameStatus.GAME_FINISHED
-        game_session.game_data = final_state.model_dump()
-        game_session.winner_id = winner_id
-
-        # Mise à jour des stats joueurs
-        for user_id, user in users.items():
-
-            if user_id == winner_id:
-                user.victories += 1
-            elif user_id == loser_id:
-                user.defeats += 1
-            # Match nul: seuls les points sont ajoutés
-
-        await self._db_session.commit()
-
 
        
 
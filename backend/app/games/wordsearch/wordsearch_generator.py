@@ -1,133 +1,226 @@
-import itertools
 import random
 import string
+from enum import Enum
 from typing import List, Tuple
 
-from app.models.schemas import WordSearchSolutionData, WordSolution, Index
+from app.models.schemas import PuzzleDescriptor, WordSearchSolutionData, WordSolution, Index
 from app.models.tables import WordList
+from .segments import Placement, line_cells, segment_cells, segment_table
+from .wordsearch_occurrences import OccurrenceRepair
+
+
+# Version de la correspondance graine -> grille, enregistrée dans chaque
+# descripteur. À incrémenter dès que la même graine donne une autre grille :
+# les descripteurs d'une autre version sont refusés plutôt que mal rejoués.
+#   1 : placement python sur les segments partagés
+#   2 : mélange paresseux des segments par mot, réparation des copies fortuites
+GENERATOR_VERSION = 2
+
+
+def check_descriptor_version(descriptor: PuzzleDescriptor) -> None:
+    """ValueError si le descripteur vient d'une autre version du générateur."""
+    if descriptor.version != GENERATOR_VERSION:
+        raise ValueError(
+            f"Descripteur de version {descriptor.version}, "
+            f"générateur en version {GENERATOR_VERSION} : grille non reproductible."
+        )
+
+
+class GeneratorMode(str, Enum):
+    """Moteur de placement utilisé par le générateur."""
+
+    PYTHON = "python"  # Parcours des segments précalculés, case par case
+    NUMPY = "numpy"  # Masques vectorisés sur une grille uint8
+    BACKTRACK = "backtrack"  # Placement garanti par contraintes (budget de temps)
 
 
 class WordSearchGenerator:
-    """Gère la création de la grille et le placement des mots."""
+    """
+    Gère la création de la grille et le placement des mots.
+
+    La génération est déterministe pour une graine donnée : chaque mot tire
+    ses placements dans un RNG qui lui est propre, si bien qu'un mot non placé
+    n'influence pas les suivants. Rejouer uniquement les mots placés, dans le
+    même ordre et sans mélange (shuffle=False), reproduit la même grille.
+    """
 
-    def __init__(self, wordlist: WordList, grid_size: int = 10):
+    def __init__(
+        self,
+        wordlist: WordList,
+        grid_size: int = 10,
+        mode: GeneratorMode = GeneratorMode.PYTHON,
+        seed: int | None = None,
+        shuffle: bool = True,
+        word_count: int | None = None,
+        time_budget_ms: float = 200.0,
+    ):
         self._theme = wordlist.theme
         self._words = [word.upper() for word in wordlist.words]
         self._grid_size = grid_size
+        self._mode = GeneratorMode(mode)
+        self._seed = seed if seed is not None else random.getrandbits(63)
+        self._shuffle = shuffle
+        self._word_count = word_count
+        self._time_budget_ms = time_budget_ms
         self._grid: List[List[str]] = []
         self._solutions: List[WordSolution] = []
         self._words_found: List[str] = []
 
-    def _reset_grid(self) -> None:
-        self._grid = [
-            ["." for _ in range(self._grid_size)] 
-            for _ in range(self._grid_size)
-        ]
+        # Placements retenus (rejouables) et bilan du mode BACKTRACK
+        self._placements: List[Placement] | None = None
+        self._replay: List[int] | None = None
+        self.report = None
+        self.repaired_cells = 0
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    def describe(self) -> PuzzleDescriptor:
+        """Descripteur compact permettant de reconstruire la dernière grille générée."""
+        return PuzzleDescriptor(
+            theme=self._theme,
+            words=list(self._words_found),
+            seed=self._seed,
+            grid_size=self._grid_size,
+            mode=self._mode.value,
+            placements=self._packed_placements(),
+            version=GENERATOR_VERSION,
+        )
 
-    def _get_end_position(
-        self,
-        word: str,
-        start: Index,
-        direction: Tuple[int, int],
-    ) -> Index:
-        length = len(word)
-        dr, dc = direction
-        return Index(
-            row=start.row + (length - 1) * dr,
-            col=start.col + (length - 1) * dc,
+    @classmethod
+    def from_descriptor(cls, descriptor: PuzzleDescriptor) -> "WordSearchGenerator":
+        """Générateur qui rejoue exactement la grille décrite."""
+        check_descriptor_version(descriptor)
+        generator = cls(
+            WordList(theme=descriptor.theme, words=descriptor.words),
+            grid_size=descriptor.grid_size,
+            mode=descriptor.mode,
+            seed=descriptor.seed,
+            shuffle=False,
         )
+        # Le résultat d'une recherche bornée en temps n'est pas rejouable :
+        # on repose directement les placements enregistrés.
+        generator._replay = descriptor.placements
+        return generator
+
+    def _packed_placements(self) -> List[int] | None:
+        """
+        Placements codés en `case_de_départ * 8 + index_direction`.
+        Seul le mode BACKTRACK en a besoin : les autres se rejouent par la graine.
+        """
+        if self._placements is None or self._mode != GeneratorMode.BACKTRACK:
+            return None
+        return [start * 8 + direction for _, start, direction in self._placements]
+
+    def _unpack_placements(self, packed: List[int]) -> List[Placement]:
+        if len(packed) != len(self._words):
+            raise ValueError(
+                f"Descripteur invalide : {len(packed)} placement(s) pour {len(self._words)} mot(s)."
+            )
+        return [(word, *divmod(code, 8)) for word, code in zip(self._words, packed)]
+
+    def _word_rng(self, word: str) -> random.Random:
+        return random.Random(f"{self._seed}:{word}")
+
+    def _ordered_words(self) -> List[str]:
+        words = self._words.copy()
+        if self._shuffle:
+            random.Random(self._seed).shuffle(words)
+        return words
+
+    def _fill_empty_cells(self, cells: List[str]) -> None:
+        rng = random.Random(f"{self._seed}:fill")
+        for i, letter in enumerate(cells):
+            if letter == ".":
+                cells[i] = rng.choice(string.ascii_uppercase)
+
+    def _search_placements(self) -> List[Placement]:
+        """
+        Placement glouton : pour chaque mot, les segments précalculés de sa
+        longueur sont parcourus dans un ordre tiré par le RNG du mot, et le
+        premier compatible avec la grille est retenu. Aucun objet n'est créé
+        dans la boucle : cases à plat et tuples précalculés uniquement.
+        """
+        size = self._grid_size
+        cells = ["."] * (size * size)
+        placements: List[Placement] = []
+
+        for word in self._ordered_words():
+            if not 0 < len(word) <= size:
+                continue
+
+            segments = segment_cells(size, len(word))
+            count = len(segments)
+            order = list(range(count))
+            rng = self._word_rng(word)
+
+            # Mélange de Fisher-Yates paresseux : on s'arrête au premier segment libre
+            for i in range(count):
+                j = rng.randrange(i, count)
+                order[i], order[j] = order[j], order[i]
+                segment = order[i]
+                target = segments[segment]
+                if all(cells[cell] == "." or cells[cell] == letter for cell, letter in zip(target, word)):
+                    for cell, letter in zip(target, word):
+                        cells[cell] = letter
+                    table = segment_table(size, len(word))
+                    placements.append(
+                        (word, int(table.starts[segment]), int(table.directions[segment]))
+                    )
+                    break
 
-    def _is_within_bounds(self, pos: Index) -> bool:
-        return 0 <= pos.row < self._grid_size and 0 <= pos.col < self._grid_size
+        return placements
 
-    def _can_place_word(
-        self,
-        word: str,
-        start: Index,
-        direction: Tuple[int, int],
-    ) -> bool:
-        end = self._get_end_position(word, start, direction)
-        
-        if not self._is_within_bounds(end):
-            return False
-
-        dr, dc = direction
-        for i, letter in enumerate(word):
-            r = start.row + i * dr
-            c = start.col + i * dc
-            cell = self._grid[r][c]
-            
-            if cell != "." and cell != letter:
-                return False
-        
-        return True
-
-    def _place_word(
-        self,
-        word: str,
-        start: Index,
-        direction: Tuple[int, int],
-    ) -> None:
-        dr, dc = direction
-        for i, letter in enumerate(word):
-            r = start.row + i * dr
-            c = start.col + i * dc
-            self._grid[r][c] = letter
-
-    def _fill_empty_cells(self) -> None:
-        for r in range(self._grid_size):
-            for c in range(self._grid_size):
-                if self._grid[r][c] == ".":
-                    self._grid[r][c] = random.choice(string.ascii_uppercase)
-
-    def _get_all_directions(self) -> List[Tuple[int, int]]:
-        directions = list(itertools.product((-1, 0, 1), repeat=2))
-        directions.remove((0, 0))
-        return directions
-
-    def _get_all_positions(self) -> List[Index]:
-        return [
-            Index(row=r, col=c)
-            for r, c in itertools.product(range(self._grid_size), repeat=2)
-        ]
+    def _search_placements_vectorized(self) -> List[Placement]:
+        from .wordsearch_vectorized import VectorizedPlacement
 
-    def generate(self) -> Tuple[str, List[List[str]], List[str], WordSearchSolutionData]:
-        self._reset_grid()
-        self._solutions.clear()
-        self._words_found.clear()
+        placement = VectorizedPlacement(self._grid_size, seed=self._seed)
+        return placement.find_placements(self._ordered_words())
 
-        words = self._words.copy()
-        random.shuffle(words)
-
-        positions = self._get_all_positions()
-        directions = self._get_all_directions()
-
-        for word in words:
-            random.shuffle(positions)
-            random.shuffle(directions)
-            
-            placed = False
-            for start in positions:
-                if placed:
-                    break
-                    
-                for direction in directions:
-                    if self._can_place_word(word, start, direction):
-                        self._place_word(word, start, direction)
-                        end = self._get_end_position(word, start, direction)
-                        
-                        self._solutions.append(
-                            WordSolution(
-                                word=word,
-                                start_index=start,
-                                end_index=end,
-                            )
-                        )
-                        self._words_found.append(word)
-                        placed = True
-                        break
-
-        self._fill_empty_cells()
+    def _search_placements_backtracking(self) -> List[Placement]:
+        from .wordsearch_backtracking import BacktrackingPlacement
+
+        solver = BacktrackingPlacement(
+            self._grid_size,
+            seed=self._seed,
+            word_count=self._word_count or len(self._words),
+            time_budget_ms=self._time_budget_ms,
+        )
+        placements, self.report = solver.solve(self._ordered_words())
+        return placements
+
+    def _apply_placements(
+        self, placements: List[Placement]
+    ) -> Tuple[str, List[List[str]], List[str], WordSearchSolutionData]:
+        """Pose une liste de placements fixés puis complète la grille."""
+        size = self._grid_size
+        cells = ["."] * (size * size)
+        self._solutions = []
+        self._words_found = []
+        self._placements = placements
+
+        for word, start, direction in placements:
+            target = line_cells(size, start, direction, len(word))
+            if target is None:
+                raise ValueError(f"Descripteur invalide : le placement de {word} sort de la grille.")
+            for i, letter in zip(target, word):
+                cells[i] = letter
+            self._solutions.append(
+                WordSolution(
+                    word=word,
+                    start_index=Index(row=target[0] // size, col=target[0] % size),
+                    end_index=Index(row=target[-1] // size, col=target[-1] % size),
+                )
+            )
+            self._words_found.append(word)
+
+        self._fill_empty_cells(cells)
+        # Le remplissage peut recréer un mot ailleurs : on casse ces doublons
+        repair = OccurrenceRepair(size, placements, self._seed)
+        repair.repair(cells)
+        self.repaired_cells = repair.repaired
+        self._grid = [cells[r * size : (r + 1) * size] for r in range(size)]
 
         return (
             self._theme,
@@ -136,6 +229,17 @@ class WordSearchGenerator:
             WordSearchSolutionData(solutions=self._solutions),
         )
 
+    def generate(self) -> Tuple[str, List[List[str]], List[str], WordSearchSolutionData]:
+        if self._replay is not None:
+            placements = self._unpack_placements(self._replay)
+        elif self._mode == GeneratorMode.BACKTRACK:
+            placements = self._search_placements_backtracking()
+        elif self._mode == GeneratorMode.NUMPY:
+            placements = self._search_placements_vectorized()
+        else:
+            placements = self._search_placements()
+        return self._apply_placements(placements)
+
     def print_grid(self) -> None:
         separator = "-" * (self._grid_size * 3 + 1)
         print(separator)
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Dict, Iterable
+
+from app.models.schemas import WordSearchState, WordSolution
+from .wordsearch_store import WordSearchStore
+
+
+class LiveGameState:
+    """
+    État d'une partie faisant autorité en mémoire (mode opt-in).
+
+    Une salle ne vit que dans un seul processus : les coups y sont appliqués
+    sans aucune entrée/sortie réseau. Un instantané est recopié dans Redis à
+    intervalle court et à chaque changement de phase, pour pouvoir reprendre
+    la partie après un incident.
+    """
+
+    def __init__(self, store: WordSearchStore, flush_interval: float = 1.0):
+        self._store = store
+        self._flush_interval = flush_interval
+        self._state: WordSearchState | None = None
+        self._found: Dict[int, str] = {}
+        self._dirty = False
+        self._flush_task: asyncio.Task | None = None
+
+    async def state(self) -> WordSearchState | None:
+        """État courant ; lu dans Redis au premier accès seulement."""
+        if self._state is None:
+            self._state = await self._store.load()
+            if self._state is not None:
+                self._found = await self._store.found()
+                self._flush_task = asyncio.create_task(self._flush_loop())
+        return self._state
+
+    def found_ids(self) -> Iterable[int]:
+        """Identifiants des solutions trouvées (état courant)."""
+        return self._found.keys()
+
+    def claim(self, solution_id: int, player_id: str, points: int, solution: WordSolution) -> int:
+        """Attribue un mot (déjà validé) et retourne le nouveau score du joueur."""
+        if self._state is None:
+            raise ValueError("État de partie non chargé : appeler state() avant claim().")
+        self._found[solution_id] = player_id
+        score = self._state.realtime_score.get(player_id, 0) + points
+        self._state.realtime_score[player_id] = score
+        self._state.words_found.append(solution)
+        self._dirty = True
+        return score
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+
+    async def flush(self) -> None:
+        """Recopie l'état dans Redis s'il a changé depuis la dernière écriture."""
+        if not self._dirty or self._state is None:
+            return
+        # Remis à zéro avant l'écriture : un coup joué pendant l'await sera recopié au prochain tour
+        self._dirty = False
+        try:
+            await self._store.write_snapshot(self._state, dict(self._found))
+        except Exception:
+            self._dirty = True
+            raise
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Échec de la recopie de l'état dans Redis : {e}")
+
+    async def close(self) -> None:
+        """Arrête la recopie périodique après une dernière écriture."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
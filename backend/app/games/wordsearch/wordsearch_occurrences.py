@@ -0,0 +1,149 @@
+import random
+import string
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .segments import Placement, grid_lines, line_cells
+
+# (index du mot, cases occupées dans l'ordre de lecture de la ligne)
+Occurrence = Tuple[int, Tuple[int, ...]]
+
+
+class WordAutomaton:
+    """
+    Automate d'Aho-Corasick sur les mots d'une grille et leurs inverses :
+    une seule lecture de chaque ligne trouve toutes les occurrences,
+    dans les 8 directions.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = list(words)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int]]] = [[]]  # (index du mot, longueur)
+
+        for word_id, word in enumerate(self.words):
+            # Un mot d'une lettre apparaîtrait partout : on l'ignore
+            if len(word) < 2:
+                continue
+            for pattern in dict.fromkeys((word, word[::-1])):
+                self._insert(pattern, word_id)
+        self._link()
+
+    def _insert(self, pattern: str, word_id: int) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((word_id, len(pattern)))
+
+    def _link(self) -> None:
+        # Parcours en largeur : les états de profondeur 1 échouent vers la racine
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                if state:
+                    self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, cells: List[str], line: Tuple[int, ...]) -> List[Occurrence]:
+        """Occurrences de tous les mots (et inverses) sur une ligne de la grille."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: List[Occurrence] = []
+        state = 0
+        for position, cell in enumerate(line):
+            ch = cells[cell]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for word_id, length in out[state]:
+                found.append((word_id, line[position - length + 1 : position + 1]))
+        return found
+
+
+@lru_cache(maxsize=256)
+def word_automaton(words: Tuple[str, ...]) -> WordAutomaton:
+    return WordAutomaton(words)
+
+
+class OccurrenceRepair:
+    """
+    Détecte les occurrences involontaires des mots à trouver (créées par le
+    remplissage aléatoire) et les casse en modifiant uniquement des cases de
+    remplissage. Les cases des mots placés ne sont jamais touchées : une
+    occurrence formée entièrement de mots placés est laissée et comptée.
+    """
+
+    def __init__(self, grid_size: int, placements: List[Placement], seed: int):
+        self._grid_size = grid_size
+        self._rng = random.Random(f"{seed}:repair")
+        self._automaton = word_automaton(tuple(word for word, _, _ in placements))
+        self._lines, self._lines_by_cell = grid_lines(grid_size)
+
+        self._intended: Set[Tuple[int, Tuple[int, ...]]] = set()
+        self._fixed: Set[int] = set()
+        for word_id, (word, start, direction) in enumerate(placements):
+            target = line_cells(grid_size, start, direction, len(word))
+            self._intended.add((word_id, tuple(sorted(target))))
+            self._fixed.update(target)
+
+        self.repaired = 0
+        self.unresolved = 0
+
+    def _accidental(self, cells: List[str], line_ids: Iterable[int]) -> List[Occurrence]:
+        return [
+            (word_id, occ_cells)
+            for line_id in line_ids
+            for word_id, occ_cells in self._automaton.scan(cells, self._lines[line_id])
+            if (word_id, tuple(sorted(occ_cells))) not in self._intended
+        ]
+
+    def _still_present(self, cells: List[str], occurrence: Occurrence) -> bool:
+        word_id, occ_cells = occurrence
+        letters = "".join([cells[c] for c in occ_cells])
+        word = self._automaton.words[word_id]
+        return letters == word or letters == word[::-1]
+
+    def repair(self, cells: List[str]) -> List[str]:
+        """Corrige `cells` (grille à plat) en place et la retourne."""
+        pending = self._accidental(cells, range(len(self._lines)))
+        # Garde-fou : chaque réparation peut en théorie en déclencher d'autres
+        budget = 4 * self._grid_size * self._grid_size
+
+        while pending and budget:
+            occurrence = pending.pop()
+            if not self._still_present(cells, occurrence):
+                continue
+
+            free = [c for c in occurrence[1] if c not in self._fixed]
+            if not free:
+                self.unresolved += 1
+                continue
+
+            budget -= 1
+            cell = self._rng.choice(free)
+            current = cells[cell]
+            new_matches: List[Occurrence] = []
+            for letter in self._rng.sample(string.ascii_uppercase, 26):
+                if letter == current:
+                    continue
+                cells[cell] = letter
+                new_matches = self._accidental(cells, self._lines_by_cell[cell])
+                if not new_matches:
+                    break
+            pending.extend(new_matches)
+            self.repaired += 1
+
+        return cells
@@ -0,0 +1,328 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple
+
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core import json_codec
+from app.core.settings import settings
+from app.models.schemas import (
+    PuzzleDescriptor,
+    WordSearchPuzzle,
+    WordSearchSolutionData,
+    WordSearchState,
+    WordSolution,
+)
+from app.games.constants import (
+    FOUND_KEY_PREFIX,
+    META_KEY_PREFIX,
+    PUZZLE_KEY_PREFIX,
+    SCORES_KEY_PREFIX,
+    SOLUTION_KEY_PREFIX,
+)
+from .wordsearch_generator import WordSearchGenerator, check_descriptor_version
+
+
+class PuzzleCache:
+    """
+    Cache LRU en mémoire : descripteur -> grille reconstruite.
+    Les grilles renvoyées sont partagées : ne jamais les modifier.
+    """
+
+    def __init__(self, max_size: int = 512):
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple, WordSearchPuzzle] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(descriptor: PuzzleDescriptor) -> tuple:
+        return (
+            descriptor.theme,
+            tuple(descriptor.words),
+            descriptor.seed,
+            descriptor.grid_size,
+            descriptor.mode,
+            tuple(descriptor.placements or ()),
+            descriptor.version,
+        )
+
+    def put(self, puzzle: WordSearchPuzzle) -> None:
+        key = self._key(puzzle.descriptor)
+        self._entries[key] = puzzle
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, descriptor: PuzzleDescriptor) -> WordSearchPuzzle:
+        """Grille du descripteur ; ValueError s'il vient d'une autre version du générateur."""
+        check_descriptor_version(descriptor)
+        key = self._key(descriptor)
+        puzzle = self._entries.get(key)
+
+        if puzzle is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return puzzle
+
+        self.misses += 1
+        generator = WordSearchGenerator.from_descriptor(descriptor)
+        theme, grid_data, words_to_find, solutions = generator.generate()
+        puzzle = WordSearchPuzzle(
+            theme=theme,
+            grid_data=grid_data,
+            words_to_find=words_to_find,
+            solutions=solutions,
+            descriptor=descriptor,
+        )
+        self.put(puzzle)
+        return puzzle
+
+
+# Cache partagé par toutes les parties du processus
+puzzle_cache = PuzzleCache()
+
+
+# Préfixes de toutes les clés d'une partie (voir WordSearchStore)
+GAME_KEY_PREFIXES = (
+    PUZZLE_KEY_PREFIX,
+    META_KEY_PREFIX,
+    SCORES_KEY_PREFIX,
+    FOUND_KEY_PREFIX,
+    SOLUTION_KEY_PREFIX,
+)
+
+
+def game_keys(game_id: str) -> List[str]:
+    """Toutes les clés Redis d'une partie."""
+    return [f"{prefix}{game_id}" for prefix in GAME_KEY_PREFIXES]
+
+
+async def evict_games(redis_client: AsyncRedis, game_ids: Iterable[str]) -> int:
+    """Supprime les clés de parties dont le résultat est en base ; retourne le nombre de clés supprimées."""
+    keys = [key for game_id in game_ids for key in game_keys(game_id)]
+    if not keys:
+        return 0
+    return await redis_client.delete(*keys)
+
+
+# Validation d'une sélection en un seul aller-retour, sans course possible :
+#   KEYS : solutions (extrémités -> solution), mots trouvés, scores
+#   ARGV : "début:fin" (cases à plat), joueur, points
+# Retourne {1, solution, nouveau score} ou {0, raison}.
+CLAIM_WORD_SCRIPT = """
+local solution_id = redis.call('HGET', KEYS[1], ARGV[1])
+if not solution_id then
+    return {0, 'Mot incorrect'}
+end
+if redis.call('HSETNX', KEYS[2], solution_id, ARGV[2]) == 0 then
+    return {0, 'Déjà trouvé'}
+end
+-- Premier mot trouvé : le hash naît sans TTL, il hérite de celui de la partie
+if redis.call('PTTL', KEYS[2]) == -1 then
+    local ttl = redis.call('PTTL', KEYS[1])
+    if ttl > 0 then
+        redis.call('PEXPIRE', KEYS[2], ttl)
+    end
+end
+local score = redis.call('HINCRBY', KEYS[3], ARGV[2], ARGV[3])
+return {1, tonumber(solution_id), score}
+"""
+
+
+class ClaimResult(NamedTuple):
+    success: bool
+    reason: str | None = None
+    solution_id: int | None = None
+    new_score: int | None = None
+
+
+class WordSearchStore:
+    """
+    Accès Redis à l'état d'une partie, réparti par champ :
+      - game:puzzle:{id}   descripteur de grille, écrit une seule fois ;
+      - game:meta:{id}     hash des métadonnées (ordre des joueurs, durée) ;
+      - game:scores:{id}   hash joueur -> score (HINCRBY) ;
+      - game:found:{id}    hash solution -> joueur (HSETNX) ;
+      - game:solution:{id} hash extrémités -> solution, pour le script Lua.
+    Un coup ne réécrit que quelques octets ; l'état complet (grille comprise)
+    n'est assemblé que lorsqu'un instantané est demandé.
+
+    Toutes les clés expirent : TTL long pendant la partie, court une fois
+    finalisée (`expire`), suppression dès que le résultat est en base.
+    """
+
+    def __init__(self, game_id: str, redis_client: AsyncRedis):
+        self._game_id = game_id
+        self._redis = redis_client
+        self._descriptor: PuzzleDescriptor | None = None
+        self._claim_script = redis_client.register_script(CLAIM_WORD_SCRIPT)
+
+    def _key(self, prefix: str) -> str:
+        return f"{prefix}{self._game_id}"
+
+    @property
+    def keys(self) -> List[str]:
+        """Toutes les clés Redis de la partie."""
+        return game_keys(self._game_id)
+
+    @property
+    def grid_size(self) -> int | None:
+        return self._descriptor.grid_size if self._descriptor else None
+
+    async def create(self, puzzle: WordSearchPuzzle, state: WordSearchState) -> None:
+        """Enregistre une nouvelle partie : clés immuables, métadonnées et scores initiaux."""
+        puzzle_cache.put(puzzle)
+        self._descriptor = puzzle.descriptor
+        size = puzzle.descriptor.grid_size
+
+        # Extrémités dans les deux sens -> identifiant de solution
+        endpoints = {}
+        for solution_id, solution in enumerate(puzzle.solutions.solutions):
+            a = solution.start_index.row * size + solution.start_index.col
+            b = solution.end_index.row * size + solution.end_index.col
+            endpoints[f"{a}:{b}"] = solution_id
+            endpoints[f"{b}:{a}"] = solution_id
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(PUZZLE_KEY_PREFIX), self._descriptor.model_dump_json(), nx=True)
+            pipe.hset(
+                self._key(META_KEY_PREFIX),
+                mapping={
+                    "players": json_codec.dumps(list(state.realtime_score)),
+                    "game_duration": state.game_duration,
+                    "created_at": int(time.time()),
+                },
+            )
+            if endpoints:
+                pipe.hset(self._key(SOLUTION_KEY_PREFIX), mapping=endpoints)
+            if state.realtime_score:
+                pipe.hset(self._key(SCORES_KEY_PREFIX), mapping=state.realtime_score)
+            for key in self.keys:
+                pipe.expire(key, settings.GAME_KEYS_ACTIVE_TTL_SECONDS)
+            await pipe.execute()
+
+    async def claim(self, player_id: str, start: int, end: int, points: int) -> ClaimResult:
+        """Valide et attribue un mot de façon atomique (un seul aller-retour)."""
+        result = await self._claim_script(
+            keys=[
+                self._key(SOLUTION_KEY_PREFIX),
+                self._key(FOUND_KEY_PREFIX),
+                self._key(SCORES_KEY_PREFIX),
+            ],
+            args=[f"{start}:{end}", player_id, points],
+        )
+        if int(result[0]) == 0:
+            return ClaimResult(success=False, reason=result[1])
+        return ClaimResult(success=True, solution_id=int(result[1]), new_score=int(result[2]))
+
+    async def _load_descriptor(self) -> PuzzleDescriptor | None:
+        if self._descriptor is None:
+            raw = await self._redis.get(self._key(PUZZLE_KEY_PREFIX))
+            if raw:
+                self._descriptor = PuzzleDescriptor.model_validate_json(raw)
+        return self._descriptor
+
+    def _replay(self) -> WordSearchPuzzle | None:
+        """Grille du descripteur chargé, ou None s'il vient d'une autre version du générateur."""
+        try:
+            return puzzle_cache.get(self._descriptor)
+        except ValueError as e:
+            # Partie créée avant un changement du générateur : grille perdue
+            print(f"⚠️ Partie {self._game_id} non rejouable: {e}")
+            return None
+
+    async def load(self) -> WordSearchState | None:
+        """
+        Instantané complet (grille comprise) ou None si la partie est inconnue
+        (ou créée par une autre version du générateur).
+        Toutes les clés sont lues en un seul aller-retour.
+        """
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(self._key(PUZZLE_KEY_PREFIX))
+            pipe.hgetall(self._key(META_KEY_PREFIX))
+            pipe.hgetall(self._key(SCORES_KEY_PREFIX))
+            pipe.hgetall(self._key(FOUND_KEY_PREFIX))
+            raw_puzzle, meta, scores, found = await pipe.execute()
+
+        if not raw_puzzle or not meta:
+            return None
+        if self._descriptor is None:
+            self._descriptor = PuzzleDescriptor.model_validate_json(raw_puzzle)
+        puzzle = self._replay()
+        if puzzle is None:
+            return None
+
+        # L'ordre des joueurs est celui de l'état initial
+        realtime_score = {
+            player_id: int(scores.get(player_id, 0))
+            for player_id in json_codec.loads(meta["players"])
+        }
+        solutions = puzzle.solutions.solutions
+        words_found = [
+            WordSolution(
+                word=solutions[int(solution_id)].word,
+                start_index=solutions[int(solution_id)].start_index,
+                end_index=solutions[int(solution_id)].end_index,
+                found_by=player_id,
+            )
+            for solution_id, player_id in sorted(found.items(), key=lambda item: int(item[0]))
+        ]
+
+        return WordSearchState(
+            theme=puzzle.theme,
+            grid_data=puzzle.grid_data,
+            words_to_find=puzzle.words_to_find,
+            words_found=words_found,
+            realtime_score=realtime_score,
+            game_duration=int(meta["game_duration"]),
+        )
+
+    async def save(self, state: WordSearchState) -> None:
+        """
+        Sauvegarde les métadonnées modifiables (durée). Les scores et les
+        mots trouvés ne sont modifiés que par `claim`.
+        """
+        await self._redis.hset(self._key(META_KEY_PREFIX), "game_duration", state.game_duration)
+
+    async def mark_finalized(self) -> bool:
+        """Marque la partie comme finalisée ; False si elle l'était déjà."""
+        return bool(await self._redis.hsetnx(self._key(META_KEY_PREFIX), "finalized", 1))
+
+    async def clear_finalized(self) -> None:
+        """Retire la marque de finalisation (résultat finalement non enregistré)."""
+        await self._redis.hdel(self._key(META_KEY_PREFIX), "finalized")
+
+    async def expire(self, ttl_seconds: int) -> None:
+        """Applique le TTL d'une phase à toutes les clés de la partie."""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key in self.keys:
+                pipe.expire(key, ttl_seconds)
+            await pipe.execute()
+
+    async def found(self) -> Dict[int, str]:
+        """Mots trouvés : identifiant de solution -> joueur."""
+        found = await self._redis.hgetall(self._key(FOUND_KEY_PREFIX))
+        return {int(solution_id): player_id for solution_id, player_id in found.items()}
+
+    async def found_count(self) -> int:
+        """Nombre de mots trouvés (HLEN, sans reconstruire l'état)."""
+        return await self._redis.hlen(self._key(FOUND_KEY_PREFIX))
+
+    async def write_snapshot(self, state: WordSearchState, found: Dict[int, str]) -> None:
+        """Recopie un état tenu en mémoire (scores, mots trouvés, durée) en une transaction."""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            if state.realtime_score:
+                pipe.hset(self._key(SCORES_KEY_PREFIX), mapping=state.realtime_score)
+            if found:
+                pipe.hset(self._key(FOUND_KEY_PREFIX), mapping=found)
+                pipe.expire(self._key(FOUND_KEY_PREFIX), settings.GAME_KEYS_ACTIVE_TTL_SECONDS, nx=True)
+            pipe.hset(self._key(META_KEY_PREFIX), "game_duration", state.game_duration)
+            await pipe.execute()
+
+    async def solutions(self) -> WordSearchSolutionData | None:
+        """Solutions de la grille, reconstruites depuis le descripteur."""
+        if await self._load_descriptor() is None:
+            return None
+        puzzle = self._replay()
+        return puzzle.solutions if puzzle is not None else None
@@ -0,0 +1,54 @@
+import zlib
+from typing import List
+
+import numpy as np
+
+from .segments import Placement, segment_table
+
+EMPTY = 0
+
+
+class VectorizedPlacement:
+    """
+    Moteur de placement NumPy : la grille est un tableau uint8 à plat et,
+    pour chaque mot, tous les placements (départ, direction) compatibles
+    sont évalués d'un coup par masque sur les segments précalculés.
+    """
+
+    def __init__(self, grid_size: int, seed: int):
+        self._grid_size = grid_size
+        self._seed = seed
+
+    def _rng(self, salt: str) -> np.random.Generator:
+        """RNG déterministe propre à un mot."""
+        return np.random.default_rng([self._seed, zlib.crc32(salt.encode("utf-8"))])
+
+    def find_placements(self, words: List[str]) -> List[Placement]:
+        # Alphabet local : chaque caractère distinct reçoit un code 1..255
+        alphabet = sorted({ch for word in words for ch in word})
+        codes = {ch: i + 1 for i, ch in enumerate(alphabet)}
+        if len(codes) > 255:
+            raise ValueError("Trop de caractères distincts pour une grille uint8.")
+
+        grid = np.zeros(self._grid_size * self._grid_size, dtype=np.uint8)
+        placements: List[Placement] = []
+
+        for word in words:
+            length = len(word)
+            if length == 0 or length > self._grid_size:
+                continue
+
+            table = segment_table(self._grid_size, length)
+            letters = np.fromiter((codes[ch] for ch in word), dtype=np.uint8, count=length)
+
+            current = grid[table.cells]
+            feasible = ((current == EMPTY) | (current == letters)).all(axis=1)
+            candidates = np.flatnonzero(feasible)
+            if candidates.size == 0:
+                continue
+
+            choice = candidates[self._rng(word).integers(candidates.size)]
+            grid[table.cells[choice]] = letters
+            placements.append((word, int(table.starts[choice]), int(table.directions[choice])))
+
+        return placements
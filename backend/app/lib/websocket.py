@@ -8,7 +8,7 @@ from app.core.db import SessionDep
 from app.games.wordsearch.gameRoom import GameRoom
 from app.games.constants import GameMessages
 from sqlmodel.ext.asyncio.session import AsyncSession
-from app.games.constants import GAME_STATE_KEY_PREFIX
+from app.games.wordsearch.wordsearch_store import WordSearchStore
 from app.games.constants import WS_TOKEN_PREFIX
 
 
@@ -72,17 +72,7 @@ async def get_game_state_from_redis(
     Récupère l'état du jeu depuis Redis.
     Retourne None si l'état n'existe pas.
     """
-    state_key = GAME_STATE_KEY_PREFIX + game_id
-    json_state = await redis_conn.get(state_key)
-    
-    if not json_state:
-        return None
-    
-    # Décoder si bytes
-    if isinstance(json_state, bytes):
-        json_state = json_state.decode("utf-8")
-    
-    return WordSearchState.model_validate_json(json_state)
+    return await WordSearchStore(game_id, redis_conn).load()
 
 
 async def send_game_state_to_player(
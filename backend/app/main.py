@@ -8,8 +8,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.auth import router as guest_router
 from app.core.db import check_db_connection
+from app.core.json_codec import CodecJSONResponse
 from app.core.matchmaker_service import run_matchmaking_consumer
 from app.core.redis import  shutdown_redis, startup_redis
+from app.core.scheduler import run_deadline_scheduler
 from app.core.settings import settings
 from app.api.matchmaking import (
     router as matchmaking_router,
@@ -21,6 +23,15 @@ from app.api.ws_auth import ( router as ws_auth_router)
 from app.api.health import (router as health_router)
 
 from app.core.matchmaker_service import STOP_EVENT
+from app.games.wordsearch.puzzle_pool import run_puzzle_pool_producer
+from app.games.wordsearch.results_outbox import run_results_outbox_consumer
+from app.games.wordsearch.key_sweeper import run_game_key_sweeper
+from app.games.wordsearch.deadlines import run_deadline_relay
+from app.games.wordsearch.theme_index import startup_theme_indexes
+from app.games.wordsearch.generation_service import (
+    shutdown_generation_service,
+    startup_generation_service,
+)
 from app.api.stats import router as stats_router
 
 
@@ -39,21 +50,37 @@ async def lifespan(app: FastAPI):
     # Startup
     await check_db_connection()
     await startup_redis()
+    await startup_theme_indexes()
+    startup_generation_service()
 
     matchmaker_task = asyncio.create_task(run_matchmaking_consumer())
+    puzzle_pool_task = asyncio.create_task(run_puzzle_pool_producer())
+    results_outbox_task = asyncio.create_task(run_results_outbox_consumer())
+    key_sweeper_task = asyncio.create_task(run_game_key_sweeper())
+    scheduler_task = asyncio.create_task(run_deadline_scheduler())
+    deadline_relay_task = asyncio.create_task(run_deadline_relay())
 
     yield 
 
     # Shutdown
     STOP_EVENT.set()
 
-    # Si la tâche n'est pas déjà terminée, on la cancel proprement
-    if not matchmaker_task.done():
-        matchmaker_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await matchmaker_task
-
-
+    # Si les tâches ne sont pas déjà terminées, on les cancel proprement
+    for task in (
+        matchmaker_task,
+        puzzle_pool_task,
+        results_outbox_task,
+        key_sweeper_task,
+        scheduler_task,
+        deadline_relay_task,
+    ):
+        if not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+    shutdown_generation_service()
     await shutdown_redis()
     print("Arrêt de l'API.")
 
@@ -64,6 +91,7 @@ app = FastAPI(
     version="0.1.0",
     debug=settings.DEBUG,
     lifespan=lifespan,
+    default_response_class=CodecJSONResponse,
 )
 
 
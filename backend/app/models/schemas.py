@@ -30,6 +30,33 @@ class WordSearchSolutionData(SQLModel):
     
     # ⚠️ Ce modèle n'est JAMAIS envoyé au frontend.
 
+
+class PuzzleDescriptor(SQLModel):
+    """
+    Descripteur compact d'une grille : suffit à la régénérer à l'identique.
+    ⚠️ Donnée privée (permet de retrouver les solutions).
+    """
+
+    theme: str
+    words: List[str]  # Mots placés, dans l'ordre de placement
+    seed: int
+    grid_size: int = 10
+    mode: str = "python"
+    # Mode "backtrack" uniquement : placement fixé de chaque mot
+    placements: List[int] | None = None
+    # Version du générateur (graine -> grille) ; 0 : descripteur non versionné
+    version: int = 0
+
+
+class WordSearchPuzzle(SQLModel):
+    """Grille prête à jouer (stockée dans la réserve Redis)."""
+
+    theme: str
+    grid_data: List[List[str]]
+    words_to_find: List[str]
+    solutions: WordSearchSolutionData
+    descriptor: PuzzleDescriptor
+
 class GameBaseState(SQLModel):
     """
     Classe parent agnostique au tour. Définit l'état commun à tous les jeux.
@@ -52,3 +79,17 @@ class WordSearchState(GameBaseState):
     
     words_found: List[WordSolution] = Field(default_factory=list)
 
+
+
+class GameResult(SQLModel):
+    """
+    Résultat d'une partie terminée, à écrire en base.
+    Transite par l'outbox Redis : l'écriture est différée et rejouable.
+    """
+
+    game_id: str
+    player_a_id: str
+    player_b_id: str
+    winner_id: str | None = None
+    loser_id: str | None = None
+    game_data: Dict[str, Any] = Field(default_factory=dict)
@@ -7,7 +7,7 @@ Ce fichier définit le contrat de communication entre le backend et le frontend.
 from enum import Enum
 from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
-from app.models.schemas import GameBaseData
+from app.models.schemas import GameBaseState
 
 # =============================================================================
 # ÉNUMÉRATIONS - STATUTS ET TYPES DE MESSAGES
@@ -144,7 +144,7 @@ class GameStateMessage(BaseMessage):
     
     # État du jeu
     status: GameStatus
-    GAME_STATE:GameBaseData            # {player_id: score}
+    GAME_STATE:GameBaseState            # {player_id: score}
     
     # Timing
     time_remaining: Optional[int] = None
@@ -15,9 +15,12 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.db import get_session
 from app.core.redis import redis_generator
+from app.games.wordsearch.generation_service import build_puzzle
 from app.games.wordsearch.wordsearch_generator import WordSearchGenerator
-from app.auth.lib import create_access_token
+from app.games.wordsearch.wordsearch_store import WordSearchStore
+from app.lib.auth import create_access_token
 from app.main import app
+from app.models.schemas import WordSearchState
 from app.models.tables import User, GameSession, WordList
 
 
@@ -178,6 +181,28 @@ def sample_wordlist() -> WordList:
     )
 
 
+@pytest.fixture
+def created_game(clean_redis: AsyncRedis, sample_wordlist: WordList):
+    """
+    Crée une partie dans Redis (joueurs p1 et p2, scores à 0).
+    Usage : `store, puzzle = await created_game("game-1")`.
+    """
+    async def create(game_id: str = "game-1"):
+        puzzle = build_puzzle(sample_wordlist)
+        state = WordSearchState(
+            theme=puzzle.theme,
+            grid_data=puzzle.grid_data,
+            words_to_find=puzzle.words_to_find,
+            realtime_score={"p1": 0, "p2": 0},
+            game_duration=300,
+        )
+        store = WordSearchStore(game_id, clean_redis)
+        await store.create(puzzle, state)
+        return store, puzzle
+
+    return create
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_wordlist(db_session: AsyncSession) -> WordList:
     wl = WordList(
@@ -1,7 +1,53 @@
 # /backend/tests/test_wordsearch.py
 
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+
 import pytest
 
+from app.api.websocket import ACTIVE_GAMES
+from app.benchmarks.bench_generator import compare, load_seed_themes
+from app.core import json_codec
+from app.core.scheduler import DeadlineScheduler, cancel_deadline, schedule_deadline
+from app.core.settings import settings
+from app.games.constants import DeadlineKind, GameStatus
+from app.games.wordsearch import deadlines, player_connection
+from app.games.wordsearch.deadlines import (
+    DeadlineRelay,
+    on_disconnect_grace_expired,
+    on_game_timeout,
+    on_match_notification_expired,
+)
+from app.games.wordsearch.gameRoom import GameRoom
+from app.games.wordsearch.generation_service import GenerationService, build_puzzle
+from app.games.wordsearch.key_sweeper import GameKeySweeper
+from app.games.wordsearch.player_connection import Frame, PlayerConnection
+from app.games.wordsearch.puzzle_pool import PuzzlePool
+from app.games.wordsearch.results_outbox import ResultsOutbox, persist_result
+from app.games.wordsearch.segments import (
+    DIRECTIONS,
+    DIRECTION_INDEX,
+    grid_lines,
+    line_cells,
+    segment_table,
+)
+from app.games.wordsearch.solution_index import SolutionIndex
+from app.games.wordsearch.theme_index import Difficulty, ThemeIndex
+from app.games.wordsearch.wordsearch_engine import WordSearchEngine
+from app.games.wordsearch.wordsearch_generator import (
+    GENERATOR_VERSION,
+    GeneratorMode,
+    WordSearchGenerator,
+)
+from app.games.wordsearch.wordsearch_live_state import LiveGameState
+from app.games.wordsearch.wordsearch_occurrences import WordAutomaton
+from app.games.wordsearch.wordsearch_store import PuzzleCache, WordSearchStore, evict_games
+from app.models.schemas import GameResult, WordSolution
+from app.models.tables import GameSession, User, WordList
+
 
 class TestWordSearchGenerator:
     """Tests pour le générateur de grille."""
@@ -21,4 +67,874 @@ class TestWordSearchGenerator:
         _, grid, words, solutions = word_generator.generate()
         
         for solution in solutions.solutions:
-            assert solution.word in words
\ No newline at end of file
+            assert solution.word in words
+
+class TestPuzzlePool:
+    """Tests pour la réserve de grilles pré-générées."""
+
+    def test_target_size_is_bounded(self):
+        """La taille cible reste entre MIN_SIZE et MAX_SIZE."""
+        pool = PuzzlePool(redis_client=None)
+
+        assert pool.target_size(0, theme_count=10) == PuzzlePool.MIN_SIZE
+        assert pool.target_size(10_000, theme_count=1) == PuzzlePool.MAX_SIZE
+        assert pool.target_size(30, theme_count=4) == 15
+
+    @pytest.mark.asyncio
+    async def test_pop_returns_pushed_puzzle(self, clean_redis, sample_wordlist):
+        """Une grille poussée est restituée, puis la réserve est vide (miss)."""
+        pool = PuzzlePool(clean_redis)
+        puzzle = build_puzzle(sample_wordlist)
+        await pool.push(puzzle)
+
+        assert await pool.pop() == puzzle
+        assert await pool.pop() is None
+
+        metrics = await pool.get_metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pop_skips_empty_themes(self, clean_redis, sample_wordlist):
+        """Sans thème imposé, une réserve vide ne compte pas comme un miss."""
+        pool = PuzzlePool(clean_redis)
+        await clean_redis.sadd("puzzle_pool:themes", *(f"Vide{i}" for i in range(5)))
+        puzzles = [build_puzzle(sample_wordlist) for _ in range(3)]
+        for puzzle in puzzles:
+            await pool.push(puzzle)
+
+        assert [await pool.pop() for _ in puzzles] == puzzles
+        assert (await pool.get_metrics())["misses"] == 0
+
+
+class TestVectorizedGenerator:
+    """Tests pour le moteur de placement NumPy."""
+
+    def test_numpy_mode_places_words_correctly(self, sample_wordlist):
+        """Chaque solution se relit correctement dans la grille."""
+        generator = WordSearchGenerator(sample_wordlist, grid_size=10, mode=GeneratorMode.NUMPY)
+        theme, grid, words, solutions = generator.generate()
+
+        assert theme == "Test"
+        assert len(grid) == 10 and all(len(row) == 10 for row in grid)
+        assert len(solutions.solutions) == len(words) > 0
+        for solution in solutions.solutions:
+            assert WordSearchEngine.reconstruct_word(grid, solution) == solution.word
+
+    def test_numpy_mode_skips_words_longer_than_grid(self, sample_wordlist):
+        """Un mot plus long que la grille n'est jamais placé."""
+        generator = WordSearchGenerator(sample_wordlist, grid_size=5, mode=GeneratorMode.NUMPY)
+        _, grid, words, _ = generator.generate()
+
+        assert len(grid) == 5
+        assert "FASTAPI" not in words and "PYTHON" not in words
+
+
+class TestGenerationService:
+    """Tests pour le pool de processus de génération."""
+
+    @pytest.mark.asyncio
+    async def test_generate_many_returns_requested_count(self, sample_wordlist):
+        """generate_many répartit le lot et renvoie n grilles valides."""
+        index = ThemeIndex(sample_wordlist.theme, sample_wordlist.words)
+        service = GenerationService(max_workers=2, max_concurrency=2)
+        service.start()
+        try:
+            puzzles = await service.generate_many(index, 3)
+        finally:
+            service.shutdown()
+
+        assert len(puzzles) == 3
+        assert all(p.theme == "Test" and len(p.grid_data) == 10 for p in puzzles)
+
+        metrics = service.get_metrics()
+        assert metrics["completed"] == 3
+        assert metrics["queue_depth"] == 0 and metrics["running"] == 0
+
+
+class TestSeededGeneration:
+    """Tests pour la génération déterministe à partir d'un descripteur."""
+
+    @pytest.mark.parametrize("mode", ["python", "numpy"])
+    def test_descriptor_rebuilds_identical_grid(self, sample_wordlist, mode):
+        """Rejouer le descripteur redonne la même grille et les mêmes solutions."""
+        generator = WordSearchGenerator(sample_wordlist, grid_size=10, mode=mode)
+        _, grid, words, solutions = generator.generate()
+        descriptor = generator.describe()
+
+        assert descriptor.words == words
+
+        rebuilt = WordSearchGenerator.from_descriptor(descriptor)
+        _, grid_2, words_2, solutions_2 = rebuilt.generate()
+
+        assert grid_2 == grid
+        assert words_2 == words
+        assert solutions_2 == solutions
+
+    def test_same_seed_same_grid(self, sample_wordlist):
+        """Deux générateurs de même graine produisent la même grille."""
+        first = WordSearchGenerator(sample_wordlist, seed=42).generate()
+        second = WordSearchGenerator(sample_wordlist, seed=42).generate()
+
+        assert first == second
+
+    def test_descriptor_from_other_version_is_refused(self, sample_wordlist):
+        """Un descripteur d'une autre version du générateur n'est jamais rejoué."""
+        generator = WordSearchGenerator(sample_wordlist, seed=42)
+        generator.generate()
+        descriptor = generator.describe()
+        assert descriptor.version == GENERATOR_VERSION
+
+        stale = descriptor.model_copy(update={"version": GENERATOR_VERSION - 1})
+        with pytest.raises(ValueError):
+            WordSearchGenerator.from_descriptor(stale)
+        with pytest.raises(ValueError):
+            PuzzleCache().get(stale)
+        assert f"v{GENERATOR_VERSION}:" in PuzzlePool._pool_key("Test")
+
+
+class TestBacktrackingGenerator:
+    """Tests pour le générateur à placement garanti."""
+
+    def test_places_requested_word_count(self, sample_wordlist):
+        """Le nombre de mots demandé est atteint et le bilan est renseigné."""
+        generator = WordSearchGenerator(
+            sample_wordlist, grid_size=10, mode=GeneratorMode.BACKTRACK, word_count=6
+        )
+        _, grid, words, solutions = generator.generate()
+
+        assert len(words) == 6
+        assert generator.report.success_rate == 1.0
+        coverage = Counter()
+        for solution in solutions.solutions:
+            assert WordSearchEngine.reconstruct_word(grid, solution) == solution.word
+            start, end = solution.start_index, solution.end_index
+            dr = (end.row > start.row) - (end.row < start.row)
+            dc = (end.col > start.col) - (end.col < start.col)
+            coverage.update((start.row + i * dr, start.col + i * dc) for i in range(len(solution.word)))
+        # Cases partagées, et non lettres superposées en trop
+        assert generator.report.overlap_count == sum(1 for n in coverage.values() if n >= 2)
+
+    def test_descriptor_replays_placements(self, sample_wordlist):
+        """Le descripteur rejoue les placements sans refaire la recherche."""
+        generator = WordSearchGenerator(
+            sample_wordlist, grid_size=10, mode=GeneratorMode.BACKTRACK, word_count=5
+        )
+        _, grid, words, _ = generator.generate()
+        descriptor = generator.describe()
+
+        assert len(descriptor.placements) == len(words)
+        assert WordSearchGenerator.from_descriptor(descriptor).generate()[1] == grid
+
+        # Dernière case, vers le bas à droite : hors de la grille
+        broken = descriptor.model_copy(update={"placements": [99 * 8 + 7, *descriptor.placements[1:]]})
+        with pytest.raises(ValueError):
+            WordSearchGenerator.from_descriptor(broken).generate()
+        with pytest.raises(ValueError):
+            WordSearchGenerator.from_descriptor(
+                descriptor.model_copy(update={"placements": descriptor.placements[1:]})
+            ).generate()
+
+
+class TestThemeIndex:
+    """Tests pour l'index de mots par longueur."""
+
+    def test_words_are_normalized_and_bucketed(self):
+        """Mots en majuscules, dédoublonnés, trop courts écartés."""
+        index = ThemeIndex("Test", ["code", "CODE", " api ", "go", "python"])
+
+        assert index.word_count == 3
+        assert index.lengths() == [3, 4, 6]
+
+    def test_selection_fits_grid(self):
+        """Seuls des mots qui tiennent dans la grille sont tirés, sans doublon."""
+        words = ["a" * n + str(i) for n in range(2, 14) for i in range(5)]
+        index = ThemeIndex("Test", words)
+        selected = index.select(grid_size=8, count=6, difficulty=Difficulty.HARD)
+
+        assert len(selected) == 6
+        assert len(set(selected)) == 6
+        assert all(3 <= len(word) <= 8 for word in selected)
+        assert sum(len(word) for word in selected) <= 8 * 8
+
+
+class TestSegmentTables:
+    """Tests pour les tables de segments partagées."""
+
+    def test_segments_stay_in_grid(self):
+        """Chaque segment est une ligne droite de `length` cases dans la grille."""
+        table = segment_table(6, 4)
+
+        for start, direction, cells in zip(table.starts, table.directions, table.cells):
+            dr, dc = DIRECTIONS[direction]
+            r, c = divmod(int(start), 6)
+            assert list(cells) == [(r + i * dr) * 6 + c + i * dc for i in range(4)]
+            assert all(0 <= cell < 36 for cell in cells)
+
+    def test_line_cells_rejects_out_of_grid(self):
+        """Un segment qui sort de la grille n'existe pas dans la table."""
+        assert line_cells(5, 0, DIRECTION_INDEX[(0, 1)], 5) == (0, 1, 2, 3, 4)
+        assert line_cells(5, 1, DIRECTION_INDEX[(0, 1)], 5) is None
+
+    @pytest.mark.parametrize("mode", ["python", "numpy", "backtrack"])
+    def test_solutions_match_grid(self, sample_wordlist, mode):
+        """Les mots reconstruits depuis les solutions correspondent à la grille."""
+        generator = WordSearchGenerator(sample_wordlist, grid_size=10, mode=mode, seed=7)
+        _, grid, words, solutions = generator.generate()
+
+        assert words
+        for solution in solutions.solutions:
+            assert WordSearchEngine.reconstruct_word(grid, solution) == solution.word
+
+
+class TestAccidentalOccurrences:
+    """Tests pour la détection des mots apparus par hasard dans le remplissage."""
+
+    def test_automaton_finds_reversed_words(self):
+        """Un mot écrit à l'envers sur une diagonale est détecté."""
+        cells = list("XXT" "XAX" "RXX")  # "RAT" en diagonale montante, lu à l'envers
+        automaton = WordAutomaton(["RAT", "CAT"])
+        lines, _ = grid_lines(3)
+
+        found = [occ for line in lines for occ in automaton.scan(cells, line)]
+
+        assert [(word_id, sorted(cells)) for word_id, cells in found] == [(0, [2, 4, 6])]
+
+    def test_generated_grid_has_no_accidental_copies(self):
+        """Seules les cases des mots placés peuvent former un mot à trouver."""
+        words = ["SEA", "SUN", "TEA", "EAR", "CAT", "DOG", "ANT", "OAT"]
+        for seed in range(10):
+            generator = WordSearchGenerator(WordList(theme="Test", words=words), grid_size=8, seed=seed)
+            _, grid, placed, _ = generator.generate()
+            cells = [letter for row in grid for letter in row]
+
+            placed_cells = {
+                cell
+                for word, start, direction in generator._placements
+                for cell in line_cells(8, start, direction, len(word))
+            }
+            lines, _ = grid_lines(8)
+            automaton = WordAutomaton(placed)
+            for line in lines:
+                for _, occ_cells in automaton.scan(cells, line):
+                    assert set(occ_cells) <= placed_cells
+
+
+class TestGeneratorBenchmark:
+    """Tests pour l'outillage du benchmark du générateur."""
+
+    def test_seed_themes_are_loaded(self):
+        """Tous les thèmes du script d'initialisation sont lus."""
+        themes = load_seed_themes()
+
+        assert len(themes) >= 10
+        assert all(index.word_count > 100 for index in themes)
+
+    def test_compare_flags_regressions(self):
+        """Latence hors tolérance ou placement en baisse = régression."""
+        reference = {"p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 3.0, "peak_alloc_kib": 10.0, "placed_ratio": 1.0}
+        current = dict(reference, p95_ms=3.0, placed_ratio=0.8)
+
+        regressions = compare({"python/10x10/12": current}, {"python/10x10/12": reference}, 0.25)
+
+        assert len(regressions) == 2
+
+
+class TestSolutionIndex:
+    """Tests pour l'index des solutions par extrémités."""
+
+    def test_lookup_in_both_orientations(self, sample_wordlist):
+        """Une solution est retrouvée quel que soit le sens de la sélection."""
+        _, _, _, solutions = WordSearchGenerator(sample_wordlist, grid_size=10, seed=3).generate()
+        index = SolutionIndex(solutions.solutions, 10)
+
+        for solution_id, solution in enumerate(solutions.solutions):
+            start = solution.start_index.row * 10 + solution.start_index.col
+            end = solution.end_index.row * 10 + solution.end_index.col
+            assert index.lookup(start, end) == solution_id
+            assert index.lookup(end, start) == solution_id
+            assert index.word(solution_id) == solution.word
+
+    def test_found_mask_resyncs_from_state(self, sample_wordlist):
+        """Le masque se recale par identifiant, même si un mot figure deux fois."""
+        _, _, _, solutions = WordSearchGenerator(sample_wordlist, grid_size=10, seed=3).generate()
+        # Le même mot une seconde fois parmi les solutions
+        twice = [*solutions.solutions, solutions.solutions[0].model_copy()]
+        index = SolutionIndex(twice, 10)
+
+        index.sync([0, len(twice) - 1])
+
+        assert index.found_count == 2
+        assert index.is_found(0) and index.is_found(len(twice) - 1)
+        assert not index.is_found(1)
+
+
+class TestAtomicClaim:
+    """Tests pour la validation atomique des sélections (script Lua)."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_claims_award_word_once(self, clean_redis, created_game):
+        """Deux joueurs qui soumettent le même mot en même temps : un seul gagne."""
+        _, puzzle = await created_game("game-1")
+        target = puzzle.solutions.solutions[0]
+
+        results = await asyncio.gather(
+            *(
+                WordSearchEngine("game-1", None, clean_redis).validate_selection(
+                    player, WordSolution(word="", start_index=target.start_index, end_index=target.end_index)
+                )
+                for player in ("p1", "p2")
+            )
+        )
+
+        assert sorted(r["success"] for r in results) == [False, True]
+        final = await WordSearchStore("game-1", clean_redis).load()
+        assert len(final.words_found) == 1
+        assert sum(final.realtime_score.values()) == next(r["score_update"] for r in results if r["success"])
+
+
+class TestFieldLevelStore:
+    """Tests pour la répartition de l'état d'une partie par champ."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_assembled_from_fields(self, clean_redis, created_game):
+        """La durée et les scores sont écrits à part ; l'instantané les réunit."""
+        store, puzzle = await created_game("game-1")
+        state = await store.load()
+
+        await clean_redis.hincrby("game:scores:game-1", "p2", 15)
+        state.game_duration = 42
+        await store.save(state)
+
+        snapshot = await WordSearchStore("game-1", clean_redis).load()
+        assert snapshot.grid_data == puzzle.grid_data
+        assert snapshot.realtime_score == {"p1": 0, "p2": 15}
+        assert list(snapshot.realtime_score) == ["p1", "p2"]
+        assert snapshot.game_duration == 42
+        assert await clean_redis.exists("game:state:game-1") == 0
+
+    @pytest.mark.asyncio
+    async def test_completion_check_does_not_load_snapshot(self, clean_redis, created_game, monkeypatch):
+        """La fin de partie se décide sur le nombre de mots trouvés, sans relire l'état."""
+        store, puzzle = await created_game("game-1")
+        engine = WordSearchEngine("game-1", None, clean_redis)
+
+        async def finalize_game(**kwargs):
+            return {"reason": kwargs["reason"]}
+
+        async def load():
+            raise AssertionError("état complet relu")
+
+        monkeypatch.setattr(engine, "finalize_game", finalize_game)
+        monkeypatch.setattr(engine._store, "load", load)
+
+        *rest, last = puzzle.solutions.solutions
+        for solution in rest:
+            start = solution.start_index.row * 10 + solution.start_index.col
+            end = solution.end_index.row * 10 + solution.end_index.col
+            assert (await store.claim("p1", start, end, 5)).success
+        assert await engine.check_all_solutions_found() is None
+
+        start = last.start_index.row * 10 + last.start_index.col
+        end = last.end_index.row * 10 + last.end_index.col
+        assert (await store.claim("p2", start, end, 5)).success
+        assert await engine.check_all_solutions_found() == {"reason": "completed"}
+
+
+    @pytest.mark.asyncio
+    async def test_game_from_other_generator_version_is_not_loaded(self, clean_redis, created_game):
+        """Après un changement de version du générateur, une partie en cours est illisible (None)."""
+        _, puzzle = await created_game("game-1")
+        stale = puzzle.descriptor.model_copy(update={"version": GENERATOR_VERSION - 1})
+        await clean_redis.set("game:puzzle:game-1", stale.model_dump_json())
+
+        store = WordSearchStore("game-1", clean_redis)
+        assert await store.load() is None
+        assert await store.solutions() is None
+        with pytest.raises(ValueError):
+            await WordSearchEngine("game-1", None, clean_redis)._get_game_state()
+
+
+class TestKeyLifecycle:
+    """Tests pour la durée de vie des clés Redis d'une partie."""
+
+    @pytest.mark.asyncio
+    async def test_ttl_follows_game_phase(self, clean_redis, created_game):
+        """TTL long à la création (mots trouvés compris), court une fois finie, suppression ensuite."""
+        store, puzzle = await created_game("game-ttl")
+        size = puzzle.descriptor.grid_size
+        solution = puzzle.solutions.solutions[0]
+        start = solution.start_index.row * size + solution.start_index.col
+        end = solution.end_index.row * size + solution.end_index.col
+        assert (await store.claim("p1", start, end, 10)).success
+
+        ttls = [await clean_redis.ttl(key) for key in store.keys]
+        assert all(0 < ttl <= settings.GAME_KEYS_ACTIVE_TTL_SECONDS for ttl in ttls)
+
+        await store.expire(settings.GAME_KEYS_FINISHED_TTL_SECONDS)
+        ttls = [await clean_redis.ttl(key) for key in store.keys]
+        assert all(0 < ttl <= settings.GAME_KEYS_FINISHED_TTL_SECONDS for ttl in ttls)
+
+        assert await evict_games(clean_redis, ["game-ttl"]) == len(store.keys)
+        assert await clean_redis.exists(*store.keys) == 0
+
+    @pytest.mark.asyncio
+    async def test_sweeper_reclaims_orphans_only(self, clean_redis, created_game):
+        """Clés sans TTL et parties jamais finalisées trop anciennes sont supprimées."""
+        fresh, _ = await created_game("game-fresh")
+        stale, _ = await created_game("game-stale")
+        await clean_redis.hset("game:meta:game-stale", "created_at", 0)
+        await clean_redis.set("game:state:legacy", "{}")
+
+        sweeper = GameKeySweeper(clean_redis, orphan_age_seconds=60)
+        report = await sweeper.sweep_once()
+
+        assert report["games_scanned"] == 3
+        assert report["keys_reclaimed"] == 1 + await clean_redis.exists(*fresh.keys)
+        assert await clean_redis.exists(*stale.keys, "game:state:legacy") == 0
+        assert (await sweeper.sweep_once())["keys_reclaimed"] == 0
+
+
+class TestDeadlineScheduler:
+    """Tests pour les échéances partagées (sorted set Redis + roue hachée)."""
+
+    @pytest.mark.asyncio
+    async def test_deadline_fires_once_across_workers(self, clean_redis):
+        """Deux workers : une seule exécution ; une échéance annulée ou repoussée ne part pas."""
+        fired = []
+
+        async def handler(key, payload):
+            fired.append((key, payload))
+
+        workers = [DeadlineScheduler(clean_redis) for _ in range(2)]
+        for worker in workers:
+            worker.register(DeadlineKind.GAME_TIMEOUT, handler)
+
+        await schedule_deadline(clean_redis, DeadlineKind.GAME_TIMEOUT, "game-1", 0, {"n": 1})
+        await schedule_deadline(clean_redis, DeadlineKind.GAME_TIMEOUT, "game-2", 0)
+        await schedule_deadline(clean_redis, DeadlineKind.GAME_TIMEOUT, "game-3", 0)
+        assert await cancel_deadline(clean_redis, DeadlineKind.GAME_TIMEOUT, "game-2")
+
+        for worker in workers:
+            await worker.tick()
+        # Repoussée après le chargement dans la roue : la réclamation échoue
+        await schedule_deadline(clean_redis, DeadlineKind.GAME_TIMEOUT, "game-3", 60)
+
+        await asyncio.sleep(DeadlineScheduler.TICK_MS * 2 / 1000)
+        for worker in workers:
+            await worker.tick(refill=False)
+            await asyncio.gather(*worker._running)
+
+        assert fired == [("game-1", {"n": 1})]
+        assert await clean_redis.zcard("scheduler:deadlines") == 1
+        # game-1 perdu par le second worker, game-3 repoussé pour les deux
+        assert sum(worker.claimed_elsewhere for worker in workers) == 3
+
+    @pytest.mark.asyncio
+    async def test_unread_match_notifications_evict_game(self, clean_redis, sample_wordlist):
+        """Notifications jamais lues : elles expirent et la partie est libérée."""
+        await clean_redis.set("game:meta:game-x", "{}")
+        for player_id in ("p1", "p2"):
+            await clean_redis.set(f"match_notification:{player_id}", json.dumps({"game_id": "game-x"}))
+
+        await on_match_notification_expired(clean_redis, "game-x", {"players": ["p1", "p2"]})
+        assert await clean_redis.exists("match_notification:p1", "match_notification:p2", "game:meta:game-x") == 0
+
+    @pytest.mark.asyncio
+    async def test_grace_expiry_announces_abandoning_player(self, clean_redis, db_session, monkeypatch):
+        """Le nom du joueur parti est gardé dans l'échéance et annoncé à la fin de partie."""
+        room = GameRoom("game-grace", clean_redis, db_session)
+        leaving, staying = TestRoomBroadcast.FakeSocket(), TestRoomBroadcast.FakeSocket()
+        room.add_player("p1", leaving, "alice")
+        room.add_player("p2", staying, "bob")
+        room._state = GameStatus.GAME_IN_PROGRESS
+
+        async def handle_abandon(player_id):
+            return {"status": GameStatus.GAME_FINISHED, "winner_id": "p2", "loser_id": player_id, "reason": "abandon"}
+
+        async def cancel_timeout():
+            pass
+
+        monkeypatch.setattr(room._controller, "handle_abandon", handle_abandon)
+        monkeypatch.setattr(room._controller, "cancel_timeout", cancel_timeout)
+        monkeypatch.setitem(ACTIVE_GAMES, "game-grace", room)
+
+        await room.handle_player_disconnect("p1", "game-grace")
+        payload = json.loads(await clean_redis.hget("scheduler:payloads", "disconnect_grace|game-grace:p1"))
+        assert payload["username"] == "alice"
+
+        await on_disconnect_grace_expired(clean_redis, "game-grace:p1", payload)
+        await asyncio.sleep(0.05)
+
+        finished = [m for m in staying.sent if m["type"] == "game_finished"]
+        assert finished and finished[0]["abandon_player_id"] == "p1"
+        assert finished[0]["abandon_username"] == "alice"
+        await room.close_all_connections()
+
+    @pytest.mark.asyncio
+    async def test_deadline_is_relayed_to_room_holder(self, clean_redis, monkeypatch):
+        """Sans la salle, l'échéance est relayée au worker qui la tient ; sinon finalisée depuis Redis."""
+        finalized, announced = [], []
+
+        async def with_controller(redis_client, game_id, action):
+            finalized.append(game_id)
+
+        class Room:
+            async def on_game_timeout(self):
+                announced.append("game-relay")
+
+        monkeypatch.setattr(deadlines, "_with_controller", with_controller)
+        relay = DeadlineRelay(clean_redis)
+        relay.follow("game-relay")
+        await asyncio.sleep(0.05)
+
+        # Worker qui réclame l'échéance sans tenir la salle
+        await on_game_timeout(clean_redis, "game-relay", {})
+        assert finalized == []
+
+        # Worker qui tient la salle
+        monkeypatch.setitem(ACTIVE_GAMES, "game-relay", Room())
+        for _ in range(10):
+            if await relay.poll(timeout=0.1):
+                break
+        await asyncio.sleep(0.01)
+        assert announced == ["game-relay"] and relay.delivered == 1
+
+        # Plus personne n'écoute : le résultat est enregistré depuis Redis
+        relay.unfollow("game-relay")
+        await relay.poll(timeout=0.1)
+        monkeypatch.delitem(ACTIVE_GAMES, "game-relay")
+        await on_game_timeout(clean_redis, "game-relay", {})
+        assert finalized == ["game-relay"]
+        await relay.close()
+
+
+class TestRoomPhases:
+    """Tests pour l'enchaînement des phases d'une salle."""
+
+    @pytest.mark.asyncio
+    async def test_countdown_does_not_block_handlers(self, clean_redis, db_session):
+        """Le compte à rebours est programmé : le handler rend la main aussitôt."""
+        class FakeSocket:
+            def __init__(self):
+                self.sent = []
+
+            async def send_text(self, text):
+                self.sent.append(json.loads(text))
+
+        room = GameRoom("game-phases", clean_redis, db_session)
+        sockets = {"p1": FakeSocket(), "p2": FakeSocket()}
+        for player_id, socket in sockets.items():
+            room.add_player(player_id, socket, player_id)
+
+        started = time.perf_counter()
+        await room._start_countdown_phase(countdown_seconds=1)
+        assert time.perf_counter() - started < 0.5
+        assert room.state == GameStatus.STARTING_COUNTDOWN
+
+        await asyncio.sleep(1.3)
+        assert room.state == GameStatus.GAME_IN_PROGRESS
+        assert [m["type"] for m in sockets["p1"].sent] == ["starting_countdown", "game_start"]
+        assert await clean_redis.zscore("scheduler:deadlines", "game_timeout|game-phases") is not None
+
+
+class TestRoomBroadcast:
+    """Tests pour les files d'envoi par connexion."""
+
+    class FakeSocket:
+        def __init__(self, stalled=False, delay=0.0):
+            self.stalled = stalled
+            self.delay = delay
+            self.sent = []
+            self.closed = False
+
+        async def send_text(self, text):
+            while self.stalled:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(self.delay)
+            self.sent.append(json.loads(text))
+
+        async def close(self):
+            self.closed = True
+
+    @pytest.mark.asyncio
+    async def test_slow_socket_does_not_delay_others(self, clean_redis, db_session, monkeypatch):
+        """La diffusion n'attend pas le réseau ; un socket bloqué finit coupé."""
+        monkeypatch.setattr(PlayerConnection, "SEND_TIMEOUT_SECONDS", 0.05)
+        room = GameRoom("game-broadcast", clean_redis, db_session)
+        fast, slow = self.FakeSocket(), self.FakeSocket(stalled=True)
+        room.add_player("fast", fast, "fast")
+        room.add_player("slow", slow, "slow")
+
+        started = time.perf_counter()
+        for _ in range(room._connection("slow").MAX_SLOW_STRIKES):
+            assert await room.broadcast({"type": "score_update"}) == []
+        assert time.perf_counter() - started < 0.05
+
+        await asyncio.sleep(0.3)
+        assert fast.sent == [{"type": "score_update"}] * 3
+        assert slow.closed and room.player_ids == ["fast"]
+        assert room.get_send_metrics()["disconnected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_previews_coalesce_and_queue_is_bounded(self, clean_redis, db_session):
+        """Aperçus fusionnés par émetteur ; un message fiable refusé coupe la connexion."""
+        dead = []
+        socket = self.FakeSocket(stalled=True)
+        connection = PlayerConnection("p1", socket, dead.append, max_queue=4)
+        await asyncio.sleep(0)  # l'écrivain reste bloqué sur le premier envoi
+
+        assert connection.send({"type": "score_update"})
+        await asyncio.sleep(0)
+        for col in range(5):
+            assert connection.send({"type": "selection_update", "from": "p2", "col": col})
+        assert (connection.depth, connection.coalesced) == (1, 4)
+
+        for _ in range(3):
+            assert connection.send({"type": "score_update"})
+        assert connection.send({"type": "chat_message"})  # file pleine : perdu
+        assert connection.dropped == 1
+        assert not connection.send({"type": "game_finished"})
+        assert dead == ["p1"]
+
+    @pytest.mark.asyncio
+    async def test_reliable_message_is_retried_after_timeout(self, monkeypatch):
+        """Un message fiable hors délai est renvoyé, pas perdu ; un aperçu l'est."""
+        monkeypatch.setattr(PlayerConnection, "SEND_TIMEOUT_SECONDS", 0.1)
+        dead = []
+        socket = self.FakeSocket(stalled=True)
+        connection = PlayerConnection("p1", socket, dead.append)
+
+        assert connection.send({"type": "selection_update", "from": "p2"})
+        assert connection.send({"type": "score_update"})
+        await asyncio.sleep(0.25)  # aperçu puis score hors délai
+        socket.stalled = False
+        await connection.drain(1.0)
+
+        assert socket.sent == [{"type": "score_update"}]
+        assert (connection.timeouts, connection.dropped, dead) == (2, 1, [])
+        connection.close()
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_message_in_flight(self):
+        """drain() attend aussi le message en cours d'envoi, pas seulement la file."""
+        socket = self.FakeSocket(delay=0.05)
+        connection = PlayerConnection("p1", socket, lambda player_id: None)
+
+        assert connection.send({"type": "game_finished"})
+        await asyncio.sleep(0)  # l'écrivain a retiré le message de la file
+        assert connection.depth == 0
+
+        await connection.drain(1.0)
+        assert socket.sent == [{"type": "game_finished"}]
+        connection.close()
+
+    @pytest.mark.asyncio
+    async def test_broadcast_frame_is_encoded_once(self, clean_redis, db_session, monkeypatch):
+        """Un seul encodage par diffusion ; la grille pré-encodée est insérée telle quelle."""
+        room = GameRoom("game-frames", clean_redis, db_session, max_players=3)
+        sockets = [self.FakeSocket() for _ in range(3)]
+        for i, socket in enumerate(sockets):
+            room.add_player(f"p{i}", socket, f"p{i}")
+
+        calls = []
+        encode = player_connection.encode
+        monkeypatch.setattr(player_connection, "encode", lambda m: calls.append(m) or encode(m))
+        await room.broadcast({"type": "score_update", "scores": {"p0": 1}})
+        await asyncio.sleep(0.05)
+        assert len(calls) == 1
+        assert all(s.sent == [{"type": "score_update", "scores": {"p0": 1}}] for s in sockets)
+
+        grid = {"grid": [["A", "B"], ["C", "D"]]}
+        frame = Frame({"type": "prepare_game", "opponent": {"score": 0}}, game_data=encode(grid))
+        assert json.loads(frame.text) == {"type": "prepare_game", "opponent": {"score": 0}, "game_data": grid}
+        assert json.loads(Frame({}, game_data="[]").text) == {"game_data": []}
+        await room.close_all_connections()
+
+    @pytest.mark.asyncio
+    async def test_selection_previews_are_rate_limited(self, clean_redis, db_session):
+        """Rafale d'aperçus : seul le dernier part, une fois par intervalle ; les doublons sont ignorés."""
+        room = GameRoom("game-previews", clean_redis, db_session)
+        sender, opponent = self.FakeSocket(), self.FakeSocket()
+        room.add_player("p1", sender, "alice")
+        room.add_player("p2", opponent, "bob")
+
+        def preview(col):
+            return {"type": "selection_update", "position": {"start_point": [0, 0], "end_point": [0, col]}}
+
+        for col in range(10):
+            room._queue_preview("p1", preview(col))
+        await asyncio.sleep(room._preview_interval * 2)
+        assert opponent.sent == [{**preview(9), "from": "alice"}]
+
+        room._queue_preview("p1", preview(9))
+        await asyncio.sleep(room._preview_interval * 2)
+        assert len(opponent.sent) == 1 and sender.sent == []
+
+        previews = room.get_send_metrics()["previews"]
+        assert previews == {"received": 11, "coalesced": 9, "identical": 1, "sent": 1}
+        await room.close_all_connections()
+
+
+class TestLiveGameState:
+    """Tests pour l'état en mémoire recopié dans Redis en différé."""
+
+    @pytest.mark.asyncio
+    async def test_claims_are_flushed_on_close(self, clean_redis, created_game):
+        """Un coup n'écrit rien dans Redis avant la recopie ; close() recopie tout."""
+        store, puzzle = await created_game("game-1")
+
+        live = LiveGameState(store, flush_interval=60)
+        await live.state()
+        new_score = live.claim(0, "p1", 12, puzzle.solutions.solutions[0])
+
+        assert new_score == 12
+        assert await clean_redis.hget("game:scores:game-1", "p1") == "0"
+
+        await live.close()
+
+        snapshot = await WordSearchStore("game-1", clean_redis).load()
+        assert snapshot.realtime_score == {"p1": 12, "p2": 0}
+        assert [found.word for found in snapshot.words_found] == [puzzle.solutions.solutions[0].word]
+
+    @pytest.mark.asyncio
+    async def test_claim_on_missing_state_reports_game_not_found(self, clean_redis, created_game, monkeypatch):
+        """Sans état en mémoire ni dans Redis, un coup échoue comme une partie introuvable."""
+        monkeypatch.setattr(settings, "WORDSEARCH_IN_MEMORY_STATE", True)
+        _, puzzle = await created_game("game-1")
+        await clean_redis.delete("game:meta:game-1")
+
+        engine = WordSearchEngine("game-1", None, clean_redis)
+        solution = puzzle.solutions.solutions[0].model_copy()
+        with pytest.raises(ValueError, match="non trouvé"):
+            await engine.validate_selection("p1", solution)
+        await engine.close()
+
+        with pytest.raises(ValueError):
+            LiveGameState(engine._store).claim(0, "p1", 12, solution)
+
+
+class TestResultsOutbox:
+    """Tests pour l'écriture différée et idempotente des résultats."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_results_are_counted_once(self, clean_redis, db_session, test_game_session):
+        """Un même résultat livré deux fois ne compte qu'une victoire."""
+        result = GameResult(
+            game_id=test_game_session.game_id,
+            player_a_id=test_game_session.player1_id,
+            player_b_id=test_game_session.player2_id,
+            winner_id=test_game_session.player1_id,
+            loser_id=test_game_session.player2_id,
+        )
+        outbox = ResultsOutbox(clean_redis, consumer_name="test")
+        await outbox.ensure_group()
+        await outbox.enqueue(result)
+        await outbox.enqueue(result)
+
+        async def session_factory():
+            return db_session
+
+        assert await outbox.process_once(session_factory, block_ms=10) == 2
+        assert (outbox.applied, outbox.duplicates) == (1, 1)
+
+        winner = await db_session.get(User, test_game_session.player1_id)
+        await db_session.refresh(winner)
+        assert winner.victories == 1
+        assert (await outbox.get_metrics())["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_applies_counters_in_one_flush(self, clean_redis, db_session):
+        """Plusieurs résultats du même lot : une seule écriture, compteurs cumulés."""
+        winner, loser = (User(user_id=str(uuid.uuid4()), username=f"batch_{uuid.uuid4().hex[:8]}") for _ in range(2))
+        games = [
+            GameSession(
+                game_id=str(uuid.uuid4()), game_name="wordsearch",
+                player1_id=winner.user_id, player2_id=loser.user_id, game_data={},
+            )
+            for _ in range(2)
+        ]
+        db_session.add_all([winner, loser, *games])
+        await db_session.commit()
+
+        outbox = ResultsOutbox(clean_redis, consumer_name="test")
+        await outbox.ensure_group()
+        for game in games:
+            await outbox.enqueue(GameResult(
+                game_id=game.game_id, player_a_id=winner.user_id, player_b_id=loser.user_id,
+                winner_id=winner.user_id, loser_id=loser.user_id, game_data={"theme": game.game_id},
+            ))
+
+        async def session_factory():
+            return db_session
+
+        assert await outbox.process_once(session_factory, block_ms=10) == 2
+        metrics = await outbox.get_metrics()
+        assert (metrics["applied"], metrics["batches"], metrics["max_batch_size"]) == (2, 1, 2)
+        # Acquittés puis supprimés : le stream ne garde pas les résultats écrits
+        assert await clean_redis.xlen("results:outbox") == 0
+
+        winner = await db_session.get(User, winner.user_id)
+        loser = await db_session.get(User, loser.user_id)
+        assert (winner.victories, loser.defeats) == (2, 2)
+        for game in games:
+            game = await db_session.get(GameSession, game.game_id)
+            assert game.status == GameStatus.GAME_FINISHED
+            assert game.game_data == {"theme": game.game_id}
+
+    @pytest.mark.asyncio
+    async def test_persist_result_updates_counters_in_sql(self, db_session):
+        """Écriture unitaire : compteurs incrémentés une fois, partie inconnue refusée."""
+        winner, loser = (User(user_id=str(uuid.uuid4()), username=f"single_{uuid.uuid4().hex[:8]}") for _ in range(2))
+        game = GameSession(
+            game_id=str(uuid.uuid4()), game_name="wordsearch",
+            player1_id=winner.user_id, player2_id=loser.user_id, game_data={},
+        )
+        db_session.add_all([winner, loser, game])
+        await db_session.commit()
+
+        result = GameResult(
+            game_id=game.game_id, player_a_id=winner.user_id, player_b_id=loser.user_id,
+            winner_id=winner.user_id, loser_id=loser.user_id, game_data={"theme": "Test"},
+        )
+        assert await persist_result(db_session, result) is True
+        assert await persist_result(db_session, result) is False
+
+        for row in (winner, loser, game):
+            await db_session.refresh(row)
+        assert (winner.victories, winner.defeats, loser.victories, loser.defeats) == (1, 0, 0, 1)
+        assert (game.winner_id, game.game_data) == (winner.user_id, {"theme": "Test"})
+
+        with pytest.raises(ValueError):
+            await persist_result(db_session, result.model_copy(update={"game_id": "inconnue"}))
+
+    @pytest.mark.asyncio
+    async def test_refused_finalization_does_not_mark_game(self, clean_redis, created_game):
+        """Une finalisation refusée ne marque pas la partie : la suivante aboutit, une seule fois."""
+        await created_game("game-1")
+        await clean_redis.hset("game:meta:game-1", "players", '["p1"]')
+        engine = WordSearchEngine("game-1", None, clean_redis)
+
+        assert (await engine.finalize_game())["status"] == "error"
+        assert await clean_redis.hget("game:meta:game-1", "finalized") is None
+
+        await clean_redis.hset("game:meta:game-1", "players", '["p1", "p2"]')
+        assert (await engine.finalize_game())["reason"] == "timeout"
+        assert await engine.finalize_game() is None
+
+
+class TestJsonCodec:
+    """Tests pour le codec JSON de l'application."""
+
+    def test_codec_matches_stdlib_format(self):
+        """Même sortie compacte que send_json, décodable dans les deux sens."""
+        message = {"type": "score_update", "status": GameStatus.GAME_IN_PROGRESS, "scores": {"p1": 10}, 3: "é"}
+        text = json_codec.dumps(message)
+
+        assert json.loads(text) == json_codec.loads(text.encode()) == {
+            "type": "score_update", "status": GameStatus.GAME_IN_PROGRESS.value, "scores": {"p1": 10}, "3": "é",
+        }
+        assert json_codec.dumps_bytes(message).decode() == text
+        assert json_codec.CodecJSONResponse({"ok": True}).body == b'{"ok":true}'
+        with pytest.raises(json.JSONDecodeError):
+            json_codec.loads("{invalide")